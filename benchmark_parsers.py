@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the blog post parsers
+
+Compares the html.parser based song extractor with the old regex implementation
+on the saved posts in blogs/ and wordpress_posts/, then times both on large
+synthetic posts to check that extraction time grows linearly. Also times the
+memoized playlist name cleaning in utils/parsing.py against inline re.sub and
+patched Elementor updates against re-serializing the whole tree.
+
+Usage: python benchmark_parsers.py [--sizes 0.25 0.5 1] [--legacy-limit 0.5]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import glob
+import json
+import logging
+import re
+import time
+
+from utils.song_extractor import extract_songs_from_html
+from utils.parsing import normalize_playlist_name
+from utils.elementor_handler import ElementorHandler
+from utils import json_codec
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The regex extractor this module replaced, kept here as the reference implementation
+LEGACY_SONG_PATTERN = r'<a[^>]*?href="([^"]*?)"[^>]*?>((?:[^<]|<(?!/a>))*?)(?:–|&ndash;|&#8211;|\s*-\s*)((?:[^<]|<(?!/a>))*?)</a>|(?:<p>|<li>)((?:[^<–&\s-]|[^<–&\s-][^–&\s-]*?[^<–&\s-]){1,100})(?:–|&ndash;|&#8211;|\s*-\s*)((?:[^<]|<(?!/p>|/li>))*?)(?:</p>|</li>)'
+LEGACY_PLAIN_PATTERN = r'<p>([^<]{2,50}?)\s+by\s+([^<]{2,50}?)<\/p>'
+
+
+def legacy_extract_songs(html_content):
+    """Regex based song extraction as it was before the streaming parser"""
+    songs = []
+    for match in re.finditer(LEGACY_SONG_PATTERN, html_content, re.IGNORECASE | re.DOTALL):
+        if match.group(1):
+            link = match.group(1).strip()
+            songs.append({
+                'Song': match.group(2).strip(),
+                'Artist': match.group(3).strip(),
+                'YouTube_Link': link if ('youtube.com' in link or 'youtu.be' in link) else ''
+            })
+        elif match.group(4):
+            songs.append({'Song': match.group(4).strip(), 'Artist': match.group(5).strip(), 'YouTube_Link': ''})
+
+    seen = {(s['Song'].lower(), s['Artist'].lower()) for s in songs}
+    for match in re.finditer(LEGACY_PLAIN_PATTERN, html_content, re.IGNORECASE | re.DOTALL):
+        song, artist = match.group(1).strip(), match.group(2).strip()
+        if (song.lower(), artist.lower()) not in seen:
+            seen.add((song.lower(), artist.lower()))
+            songs.append({'Song': song, 'Artist': artist, 'YouTube_Link': ''})
+
+    return [s for s in songs if len(s['Song']) > 2 and len(s['Artist']) > 2]
+
+
+def load_corpus():
+    """Load saved blog posts as (name, html) pairs"""
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(BASE_DIR, 'blogs', '*.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            corpus.append((os.path.basename(path), f.read()))
+    for path in sorted(glob.glob(os.path.join(BASE_DIR, 'wordpress_posts', '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        corpus.append((os.path.basename(path), data.get('content', '')))
+    return corpus
+
+
+def build_synthetic_post(target_bytes):
+    """Build a post of roughly target_bytes mixing song links, song lines and prose"""
+    chunks = ['<h1>Synthetic Wedding Cocktail Hour</h1>']
+    size = 0
+    i = 0
+    while size < target_bytes:
+        i += 1
+        chunk = (
+            f'<h2>Section {i}</h2>'
+            f'<p>The set keeps a warm, easy-going feel with a mid-tempo groove - guests drift between conversations '
+            f'and the bar while the band sets up for the reception.</p>'
+            f'<p><a href="https://www.youtube.com/watch?v=vid{i}">Song {i} &ndash; Artist {i}</a></p>'
+            f'<li>Track {i} - Band {i}</li>'
+            f'<p>Ballad {i} by Singer {i}</p>'
+        )
+        chunks.append(chunk)
+        size += len(chunk)
+    return ''.join(chunks)
+
+
+def time_call(func, content, repeat=3):
+    """Return the best of `repeat` runs in seconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def compare_corpus():
+    """Print per-post song counts for both extractors and whether they agree"""
+    print("\nCorpus comparison (legacy regex vs streaming parser)")
+    print("-" * 60)
+    same = 0
+    corpus = load_corpus()
+    for name, content in corpus:
+        old = legacy_extract_songs(content)
+        new = extract_songs_from_html(content)
+        match = old == new
+        same += match
+        print(f"{'SAME' if match else 'DIFF'}  {len(old):3d} / {len(new):3d}  {name}")
+    print(f"\n{same} of {len(corpus)} posts produce identical results")
+
+
+def benchmark_sizes(sizes_mb, legacy_limit_mb):
+    """Time both extractors on synthetic posts of the given sizes"""
+    print("\nSynthetic posts (best of 3)")
+    print("-" * 60)
+    print(f"{'size':>8}  {'parser':>10}  {'per MB':>10}  {'legacy':>10}")
+    for size_mb in sizes_mb:
+        content = build_synthetic_post(int(size_mb * 1024 * 1024))
+        parser_time = time_call(extract_songs_from_html, content)
+        if size_mb <= legacy_limit_mb:
+            legacy_time = f"{time_call(legacy_extract_songs, content, repeat=1):9.3f}s"
+        else:
+            legacy_time = "skipped"
+        print(f"{size_mb:6.2f}MB  {parser_time:9.3f}s  {parser_time / size_mb:9.3f}s  {legacy_time:>10}")
+
+
+def benchmark_unclosed_anchor(repeats):
+    """Time both extractors on an unclosed link full of hyphens, which backtracks in the regex"""
+    print("\nUnclosed <a> with repeated ' -' (legacy regex is quadratic here)")
+    print("-" * 60)
+    print(f"{'repeats':>8}  {'parser':>10}  {'legacy':>10}")
+    for count in repeats:
+        content = '<a href="https://www.youtube.com/watch?v=x">' + 'a -' * count
+        parser_time = time_call(extract_songs_from_html, content)
+        legacy_time = time_call(legacy_extract_songs, content, repeat=1)
+        print(f"{count:8d}  {parser_time:9.4f}s  {legacy_time:9.3f}s")
+
+
+def benchmark_name_cleaning(playlist_count=300, reruns=200):
+    """Time inline re.sub name cleaning against the memoized normalizer"""
+    print(f"\nPlaylist name cleaning ({playlist_count} names x {reruns} reruns)")
+    print("-" * 60)
+    playlists = [f"{i:03d} The Theme {i} Wedding Cocktail Hour" for i in range(1, playlist_count + 1)]
+
+    def inline():
+        for _ in range(reruns):
+            {p: re.sub(r'^\d{3}\s+', '', p) for p in playlists}
+
+    def memoized():
+        for _ in range(reruns):
+            {p: normalize_playlist_name(p) for p in playlists}
+
+    for label, func in (("inline re.sub", inline), ("normalize_playlist_name", memoized)):
+        start = time.perf_counter()
+        func()
+        print(f"{label:>24}  {time.perf_counter() - start:9.4f}s")
+
+
+def build_elementor_page(section_count):
+    """Build Elementor data with one text-editor widget halfway down the page"""
+    sections = []
+    for i in range(section_count):
+        widgets = [{"id": f"h{i}", "elType": "widget", "settings": {"title": f"Heading {i}"},
+                    "elements": [], "widgetType": "heading"}]
+        if i == section_count // 2:
+            widgets.append({"id": "main", "elType": "widget", "settings": {"editor": "<p>Old content</p>"},
+                            "elements": [], "widgetType": "text-editor"})
+        sections.append({"id": f"s{i}", "elType": "section", "settings": {},
+                         "elements": [{"id": f"c{i}", "elType": "column", "settings": {"_column_size": 100},
+                                       "elements": widgets}]})
+    return json.dumps(sections, separators=(',', ':'))
+
+
+def benchmark_elementor_update(section_count=2000, repeat=10):
+    """Time a main widget update with in-place patching against re-serializing the tree"""
+    elementor_json = build_elementor_page(section_count)
+    new_content = build_synthetic_post(32 * 1024)
+    backend = "orjson" if json_codec.orjson is not None else "stdlib json"
+    print(f"\nElementor update ({section_count} sections, {len(elementor_json) // 1024} KB, {backend})")
+    print("-" * 60)
+    for label, patch in (("patch", True), ("re-serialize", False)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            ElementorHandler.update_elementor_content(elementor_json, new_content, patch=patch)
+        print(f"{label:>24}  {(time.perf_counter() - start) / repeat * 1000:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the blog post song extractor")
+    parser.add_argument('--sizes', type=float, nargs='+', default=[0.25, 0.5, 1.0],
+                        help="Synthetic post sizes in MB")
+    parser.add_argument('--legacy-limit', type=float, default=1.0,
+                        help="Largest size (MB) to run the legacy regex on")
+    args = parser.parse_args()
+
+    # Extraction logs one line per call, which drowns out the results
+    logging.disable(logging.INFO)
+
+    compare_corpus()
+    benchmark_sizes(args.sizes, args.legacy_limit)
+    benchmark_unclosed_anchor([1000, 2000, 4000])
+    benchmark_name_cleaning()
+    benchmark_elementor_update()
+
+
+if __name__ == "__main__":
+    main()
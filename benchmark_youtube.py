@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the YouTube client
+
+Measures how long YouTubeAPI construction takes, first in a fresh process
+and then on later constructions. Sockets are blocked while it runs, so it also
+checks that building the client never touches the network.
+
+Usage: python benchmark_youtube.py [--repeat 50]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import socket
+import time
+from contextlib import contextmanager
+
+from utils import fixed_youtube_api
+from utils.fixed_youtube_api import YouTubeAPI
+
+FAKE_API_KEY = "benchmark-key"
+
+
+@contextmanager
+def no_network():
+    """Make any attempt to open a connection raise"""
+    original_connect = socket.socket.connect
+
+    def blocked_connect(*args, **kwargs):
+        raise RuntimeError("network access during benchmark")
+
+    socket.socket.connect = blocked_connect
+    try:
+        yield
+    finally:
+        socket.socket.connect = original_connect
+
+
+def benchmark_construction(repeat):
+    print("YouTube client construction")
+    with no_network():
+        fixed_youtube_api._service_cache.clear()
+        started = time.perf_counter()
+        YouTubeAPI(FAKE_API_KEY)
+        first_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            YouTubeAPI(FAKE_API_KEY)
+        cached_ms = (time.perf_counter() - started) * 1000 / repeat
+
+    print(f"  first construction (builds service):  {first_ms:8.2f} ms")
+    print(f"  later constructions (cached service): {cached_ms:8.3f} ms")
+    print("  no network access")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=50, help="Constructions to average over")
+    args = parser.parse_args()
+
+    benchmark_construction(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Command-line entry point for headless batch processing
+
+Runs the same playlist processing as the Streamlit app, without a browser, so
+it can be scheduled (e.g. nightly from cron) and timed.
+
+Usage:
+    python cli.py process --playlists 001,002 --ops youtube,spotify,blog --concurrency 4
+    python cli.py sync --dry-run
+    python cli.py duplicates --fill-links
+    python cli.py revamp --category 12 --dry-run
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import logging
+import time
+
+from utils.corrected_csv_handler import load_csv
+from utils.parsing import normalize_playlist_name
+from utils.playlist_processing import CATALOG_LOCK, PlaylistProcessor, find_latest_csv, save_processed_csv, select_playlists
+from utils.progress import ConsoleReporter
+
+logger = logging.getLogger(__name__)
+
+# --ops values and the operation names used by PlaylistProcessor
+OPERATION_NAMES = {
+    'youtube': "YouTube",
+    'spotify': "Spotify",
+    'blog': "Blog",
+}
+
+
+def build_clients(operations):
+    """
+    Create the API clients needed for the requested operations
+    Uses the same credentials as the Streamlit app.
+    :param operations: Operation names ("YouTube", "Spotify", "Blog")
+    :return: (youtube_api, spotify_api); either may be None
+    """
+    from utils.secrets_manager import get_secret
+
+    youtube_api = None
+    if "YouTube" in operations:
+        from utils.fixed_youtube_api import YouTubeAPI
+        youtube_key = get_secret("YOUTUBE_API_KEY")
+        if youtube_key:
+            youtube_api = YouTubeAPI(youtube_key)
+        else:
+            logger.warning("YOUTUBE_API_KEY is not set - skipping YouTube links")
+
+    spotify_api = None
+    if "Spotify" in operations:
+        from utils.spotify_api import SpotifyAPI
+        client_id = get_secret("SPOTIFY_CLIENT_ID")
+        client_secret = get_secret("SPOTIFY_CLIENT_SECRET")
+        if client_id and client_secret:
+            spotify_api = SpotifyAPI(client_id, client_secret)
+        else:
+            logger.warning("Spotify credentials are not set - skipping Spotify lookup")
+
+    return youtube_api, spotify_api
+
+
+def load_catalog(csv_path):
+    """
+    Load the catalog CSV, printing the problem if it can't be used
+    :return: DataFrame, or None
+    """
+    if not csv_path:
+        print("No catalog CSV found; pass --csv", file=sys.stderr)
+        return None
+    try:
+        df = load_csv(csv_path)
+    except Exception as e:
+        print(f"Could not load {csv_path}: {str(e)}", file=sys.stderr)
+        return None
+    if df is None or df.empty:
+        print(f"No songs found in {csv_path}", file=sys.stderr)
+        return None
+    return df
+
+
+def run_process(args):
+    operations = []
+    for op in args.ops.split(','):
+        op = op.strip().lower()
+        if op not in OPERATION_NAMES:
+            print(f"Unknown operation: {op} (expected {', '.join(OPERATION_NAMES)})", file=sys.stderr)
+            return 2
+        operations.append(OPERATION_NAMES[op])
+
+    csv_path = args.csv or find_latest_csv()
+    df = load_catalog(csv_path)
+    if df is None:
+        return 2
+
+    selectors = [item for item in (args.playlists or '').split(',') if item.strip()]
+    playlists = select_playlists(df, selectors)
+    if not playlists:
+        print("No matching playlists", file=sys.stderr)
+        return 2
+
+    style_options = {}
+    if args.model:
+        style_options['model'] = args.model
+    if args.temperature is not None:
+        style_options['temperature'] = args.temperature
+
+    youtube_api, spotify_api = build_clients(operations)
+    print(f"Processing {len(playlists)} playlists from {csv_path} "
+          f"({', '.join(operations)}, concurrency {args.concurrency})")
+
+    processor = PlaylistProcessor(df, youtube_api, spotify_api, style_options=style_options)
+    started = time.perf_counter()
+    outcomes = processor.process_many(
+        playlists, operations,
+        reporter_factory=lambda playlist: ConsoleReporter(prefix=normalize_playlist_name(playlist)),
+        concurrency=max(1, args.concurrency)
+    )
+    elapsed = time.perf_counter() - started
+
+    failed = 0
+    print()
+    for playlist, success, results, seconds in outcomes:
+        status = "ok" if success else "FAILED"
+        failed += 0 if success else 1
+        extra = f" -> {results['blog_file']}" if results.get('blog_file') else ""
+        print(f"  {status:6} {seconds:7.1f}s  {playlist}{extra}")
+    # Every playlist saves the whole DataFrame, so the newest file has all updates
+    saved_files = [results['updated_file'] for _, _, results, _ in outcomes if results.get('updated_file')]
+    print(f"\n{len(playlists) - failed}/{len(playlists)} playlists processed in {elapsed:.1f}s")
+    if saved_files:
+        print(f"Catalog saved to {max(saved_files)}")
+    return 0 if not failed else 1
+
+
+def run_sync(args):
+    from utils.catalog_sync import sync_catalog
+
+    csv_path = args.csv or find_latest_csv()
+    df = load_catalog(csv_path)
+    if df is None:
+        return 2
+    _, spotify_api = build_clients(["Spotify"])
+    if spotify_api is None:
+        print("Spotify credentials are required for sync", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    _, summary = sync_catalog(df, spotify_api, reporter=ConsoleReporter(),
+                              dry_run=args.dry_run, full=args.full)
+    elapsed = time.perf_counter() - started
+
+    print(f"\nChecked {summary['checked']} playlists in {elapsed:.1f}s: "
+          f"{summary['unchanged']} unchanged, {len(summary['changed'])} changed, {len(summary['new'])} new "
+          f"(+{summary['added_songs']} / -{summary['removed_songs']} songs)")
+    for name in summary['new']:
+        print(f"  new: {name}")
+    if summary['saved_file']:
+        print(f"Catalog saved to {summary['saved_file']}")
+    elif args.dry_run and (summary['changed'] or summary['new']):
+        print("Dry run - nothing saved")
+    return 0
+
+
+def run_duplicates(args):
+    from utils.song_identity import SongIndex
+
+    csv_path = args.csv or find_latest_csv()
+    df = load_catalog(csv_path)
+    if df is None:
+        return 2
+
+    index = SongIndex(df)
+    report = index.duplicates()
+    print(f"{len(df)} rows, {len(index)} distinct songs, {len(report)} songs in more than one playlist")
+    for row in report.head(args.limit).itertuples():
+        link = "linked" if row.YouTube_Link else "no link"
+        print(f"  {row.Rows:3}x  {' | '.join(row.Spellings)}  ({link})")
+
+    if args.fill_links:
+        filled = index.propagate_youtube_links()
+        if filled:
+            with CATALOG_LOCK:
+                saved_file = save_processed_csv(df, "deduped")
+            print(f"\nCopied YouTube links to {filled} rows; catalog saved to {saved_file}")
+        else:
+            print("\nNo rows could reuse a YouTube link")
+    return 0
+
+
+def run_revamp(args):
+    from utils.revamp_pipeline import main as revamp_main
+    return revamp_main(args.revamp_args)
+
+
+def main(argv=None):
+    # Shared options, accepted before or after the subcommand. SUPPRESS keeps a
+    # subcommand's unset default from overwriting a flag given before it.
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--verbose', action='store_true', default=argparse.SUPPRESS,
+                        help="Show INFO logging from the API clients")
+
+    parser = argparse.ArgumentParser(description="Batch processing for the blog generator", parents=[common])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    process = subparsers.add_parser('process', parents=[common], help="Fetch links and generate blog posts for playlists")
+    process.add_argument('--csv', help="Catalog CSV (default: most recent processed_playlists_*.csv)")
+    process.add_argument('--playlists', help="Comma-separated playlist numbers or names (default: all)")
+    process.add_argument('--ops', default='youtube,spotify,blog',
+                         help="Comma-separated operations: youtube, spotify, blog")
+    process.add_argument('--concurrency', type=int, default=4, help="Playlists processed at the same time")
+    process.add_argument('--model', help="OpenAI model for blog generation")
+    process.add_argument('--temperature', type=float, help="Sampling temperature for blog generation")
+    process.set_defaults(func=run_process)
+
+    sync = subparsers.add_parser('sync', parents=[common], help="Update the catalog CSV from the DJ's Spotify playlists")
+    sync.add_argument('--csv', help="Catalog CSV (default: most recent processed_playlists_*.csv)")
+    sync.add_argument('--dry-run', action='store_true', help="Show what would change without saving")
+    sync.add_argument('--full', action='store_true', help="Re-check every playlist, not just changed ones")
+    sync.set_defaults(func=run_sync)
+
+    duplicates = subparsers.add_parser('duplicates', parents=[common], help="Report songs that appear in several playlists")
+    duplicates.add_argument('--csv', help="Catalog CSV (default: most recent processed_playlists_*.csv)")
+    duplicates.add_argument('--limit', type=int, default=25, help="Number of duplicated songs to list")
+    duplicates.add_argument('--fill-links', action='store_true',
+                            help="Copy each song's YouTube link to its rows without one and save the catalog")
+    duplicates.set_defaults(func=run_duplicates)
+
+    revamp = subparsers.add_parser('revamp', parents=[common], help="Revamp existing WordPress posts (see utils/revamp_pipeline.py)")
+    revamp.add_argument('revamp_args', nargs=argparse.REMAINDER, help="Arguments for the revamp pipeline")
+    revamp.set_defaults(func=run_revamp)
+
+    args = parser.parse_args(argv)
+
+    # The utils modules configure INFO logging on import, so set the root level directly
+    logging.getLogger().setLevel(logging.INFO if getattr(args, 'verbose', False) else logging.WARNING)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
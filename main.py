@@ -2,15 +2,20 @@ import streamlit as st
 import pandas as pd
 import os
 import json
-import re
 import logging
 from datetime import datetime
 import traceback
 from utils.fixed_youtube_api import YouTubeAPI
 from utils.spotify_api import SpotifyAPI
-from utils.openai_api import generate_blog_post
 from utils.fixed_wordpress_api import WordPressAPI
-from utils.corrected_csv_handler import load_csv, save_csv, create_empty_playlist_df
+from utils.corrected_csv_handler import load_csv, create_empty_playlist_df
+from utils.catalog_sync import sync_catalog
+from utils.parsing import normalize_playlist_name
+from utils.job_runner import get_job_runner, FINISHED_STATES
+from utils.playlist_processing import (
+    PlaylistProcessor, find_latest_csv, save_blog_post, save_processed_csv as write_processed_csv
+)
+from utils.progress import StreamlitReporter, JobReporter
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -77,6 +82,7 @@ def init_session_state():
     defaults = {
         'df': None,
         'last_saved_csv': None,
+        'background_jobs': [],
         'auto_loaded': False,
         'api_status_checked': False,
         'youtube_api_available': False,
@@ -103,6 +109,7 @@ def init_session_state():
         'wp_post_confirmed': False,
         'wp_revamped_content': None,
         'wp_categories': [],
+        'wp_categories_loaded': False,
         'wp_selected_post_id': None,
         'wp_revamp_model': 'gpt-4o',
         'wp_revamp_temp': 0.8,
@@ -127,51 +134,16 @@ def init_session_state():
 init_session_state()
     
 # Functions for file management
-def find_latest_csv():
-    """Find the most recently modified CSV file from previous sessions"""
-    import glob
-    import os
-    
-    # Look for processed CSV files
-    csv_files = glob.glob("processed_playlists_*.csv")
-    
-    if not csv_files:
-        return None
-    
-    # Get file with the latest modification time
-    latest_file = max(csv_files, key=os.path.getmtime)
-    return latest_file
-
-def save_processed_csv(df, operation_type):
-    """Save CSV with timestamp and operation type"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"processed_playlists_{operation_type}_{timestamp}.csv"
-    save_csv(df, filename)
-    st.session_state.last_saved_csv = filename
+def save_processed_csv(df, operation_type, remember=True):
+    """
+    Save CSV with timestamp and operation type
+    :param remember: Record the file as the last saved CSV in session state
+    """
+    filename = write_processed_csv(df, operation_type)
+    if remember:
+        st.session_state.last_saved_csv = filename
     return filename
 
-def save_blog_post(playlist_name, blog_content, title):
-    """Save blog post to a file for persistence between sessions"""
-    # Create blogs directory if it doesn't exist
-    if not os.path.exists("blogs"):
-        os.makedirs("blogs")
-    
-    # Clean the playlist name for use in filename
-    clean_name = playlist_name.split('Wedding Cocktail Hour')[0].strip()
-    # Remove any digits at the start (like "001 ")
-    clean_name = re.sub(r'^\d+\s+', '', clean_name)
-    clean_name = "".join([c if c.isalnum() or c.isspace() else "_" for c in clean_name]).strip()
-    
-    # Create filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"blogs/{clean_name}_{timestamp}.html"
-    
-    # Save blog as HTML with title
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(f"<h1>{title}</h1>\n\n{blog_content}")
-    
-    return filename
-    
 def save_wordpress_post(post_data, post_content=None):
     """Save selected WordPress post for editing
     
@@ -329,215 +301,165 @@ def load_saved_blog_post(filename):
         logger.error(f"Error loading blog post {filename}: {str(e)}")
         return "Error", f"Could not load blog post: {str(e)}"
 
-def clean_playlist_name_for_blog(playlist_name):
-    """Remove the numeric prefix from playlist names when creating blog posts"""
-    import re
-    # Remove the numeric prefix (like "001 ") 
-    cleaned = re.sub(r'^\d{3}\s+', '', playlist_name)
-    return cleaned
-
-def process_playlist(playlist, youtube_api, spotify_api, operations):
-    """Process a single playlist with error handling and progress tracking"""
+def collect_style_options():
+    """Collect blog style options from session state (must run in the script thread)"""
+    style_options = {}
+    
+    # Check for standard dropdown selections
     try:
-        # Filter dataframe to get only the songs for this playlist
-        playlist_df = st.session_state.df[st.session_state.df['Playlist'] == playlist].copy()
+        if 'model' in st.session_state:
+            style_options['model'] = st.session_state.model
         
-        # Initialize an empty results dictionary
-        results = {}
+        if 'temperature' in st.session_state:
+            style_options['temperature'] = st.session_state.temperature
         
-        # Save updates flag to track if we need to save the dataframe at the end
-        save_updates = False
+        if 'tone' in st.session_state:
+            style_options['tone'] = st.session_state.tone
         
-        # Fetch YouTube links if selected
-        if "YouTube" in operations and youtube_api:
-            # Check if we need to fetch YouTube links
-            missing_links = playlist_df[
-                (playlist_df['YouTube_Link'].isna()) | 
-                (playlist_df['YouTube_Link'] == '')
-            ]
-            
-            # Only proceed if we have missing links
-            if not missing_links.empty:
-                total_songs = len(missing_links)
-                st.write(f"Fetching YouTube links for {total_songs} songs...")
-                
-                # Create progress bar
-                progress_bar = st.progress(0)
-                
-                # Fetch YouTube links for each song with missing link
-                for current_song_num, (idx, row) in enumerate(missing_links.iterrows()):
-                    try:
-                        # Create a search query combining song and artist
-                        search_query = f"{row['Song']} - {row['Artist']}"
-                        
-                        # Get YouTube link with error handling
-                        youtube_link = youtube_api.get_video_link(search_query)
-                        
-                        # Update the link in the dataframe (only if we got a valid link)
-                        if youtube_link:
-                            playlist_df.at[idx, 'YouTube_Link'] = youtube_link
-                        
-                        # Update progress bar - increment after processing each song
-                        # Using current_song_num which starts at 0, so add 1 for correct progress
-                        progress = (current_song_num + 1) / total_songs
-                        progress_bar.progress(min(1.0, progress))
-                        
-                    except Exception as e:
-                        # Handle YouTube API errors gracefully
-                        if "quota" in str(e).lower():
-                            st.warning("⚠️ YouTube API quota exceeded. Please try again tomorrow.")
-                            break
-                        else:
-                            st.warning(f"⚠️ Could not fetch YouTube link for '{search_query}': {str(e)}")
-                
-                # Update the main DataFrame with the new YouTube links
-                st.session_state.df.update(playlist_df)
-                save_updates = True
-                
-                # Note the file in results for display purposes
-                filename = save_processed_csv(st.session_state.df, "youtube")
-                results['youtube_file'] = filename
-                st.success("✅ YouTube links fetched and saved")
-            else:
-                st.info("ℹ️ All songs already have YouTube links")
+        if 'mood' in st.session_state:
+            style_options['mood'] = st.session_state.mood
+        
+        if 'intro_theme' in st.session_state:
+            style_options['intro_theme'] = st.session_state.intro_theme
+        
+        if 'conclusion_theme' in st.session_state:
+            style_options['conclusion_theme'] = st.session_state.conclusion_theme
+        
+        if 'section_count' in st.session_state:
+            style_options['section_count'] = st.session_state.section_count
+        
+        if 'title_style' in st.session_state:
+            style_options['title_style'] = st.session_state.title_style
+        
+        if 'audience' in st.session_state:
+            style_options['audience'] = st.session_state.audience
+        
+        # Free form style options
+        if 'writing_style' in st.session_state and st.session_state.writing_style:
+            style_options['writing_style'] = st.session_state.writing_style
+        
+        if 'language_style' in st.session_state and st.session_state.language_style:
+            style_options['language_style'] = st.session_state.language_style
+        
+        if 'sentence_structure' in st.session_state and st.session_state.sentence_structure:
+            style_options['sentence_structure'] = st.session_state.sentence_structure
+        
+        if 'emotional_tone' in st.session_state and st.session_state.emotional_tone:
+            style_options['emotional_tone'] = st.session_state.emotional_tone
+        
+        if 'custom_guidance' in st.session_state and st.session_state.custom_guidance:
+            style_options['custom_guidance'] = st.session_state.custom_guidance
+    except Exception as e:
+        st.warning(f"Note: Not all customization options could be applied. {str(e)}")
+        # Continue with whatever options were successfully retrieved
+    
+    return style_options
 
-        # Fetch Spotify playlist if selected
-        if "Spotify" in operations and spotify_api:
-            with st.spinner("🎧 Fetching Spotify playlist link..."):
-                try:
-                    # Use the DJ's Spotify username from environment variable or default
-                    user_id = os.getenv("SPOTIFY_USER_ID", "bm8eje5tcjj9eazftizqoikwm")
-                    
-                    # Clean the playlist name for Spotify search - just use one cleaning method
-                    # Don't clean it twice as that can cause too much difference from actual Spotify names
-                    spotify_clean_name = re.sub(r'^\d{3}\s+', '', playlist)
-                    
-                    st.info(f"Searching for Spotify playlist: '{spotify_clean_name}'")
-                    spotify_link = spotify_api.get_playlist_link(user_id, spotify_clean_name)
-                except Exception as e:
-                    st.error(f"Error with Spotify API: {str(e)}")
-                    spotify_link = None
-                
-                if spotify_link:
-                    results['spotify_link'] = spotify_link
-                    
-                    # Save Spotify link to the DataFrame for all songs in this playlist
-                    for idx in playlist_df.index:
-                        playlist_df.at[idx, 'Spotify_Link'] = spotify_link
-                    
-                    # Update the main DataFrame with the new Spotify links
-                    st.session_state.df.update(playlist_df)
-                    save_updates = True
-                    
-                    st.success(f"✅ Spotify playlist found and saved to CSV")
-                else:
-                    st.warning("⚠️ Spotify playlist not found")
+def process_playlist(playlist, youtube_api, spotify_api, operations, df=None, reporter=None, style_options=None):
+    """
+    Process a single playlist with error handling and progress tracking
+    :param df: Catalog DataFrame to update (default: st.session_state.df)
+    :param reporter: ProgressReporter (default: StreamlitReporter; JobReporter in background jobs)
+    :param style_options: Blog style options (default: read from session state)
+    """
+    # Only the Streamlit script thread may touch session state
+    in_script = reporter is None
+    if df is None:
+        df = st.session_state.df
+    if style_options is None:
+        style_options = collect_style_options()
+    
+    processor = PlaylistProcessor(df, youtube_api, spotify_api, style_options=style_options)
+    success, results = processor.process(playlist, operations, reporter or StreamlitReporter())
+    
+    saved_file = results.get('updated_file') or results.get('youtube_file')
+    if in_script and saved_file:
+        st.session_state.last_saved_csv = saved_file
+    return success, results
 
-        # Save changes to CSV if we made updates
-        if save_updates:
-            filename = save_processed_csv(st.session_state.df, "updated")
-            results['updated_file'] = filename
+def run_playlist_job(job, playlist, youtube_api, spotify_api, operations, df, style_options):
+    """Background job wrapper around process_playlist"""
+    success, results = process_playlist(
+        playlist, youtube_api, spotify_api, operations,
+        df=df, reporter=JobReporter(job), style_options=style_options
+    )
+    if not success:
+        raise RuntimeError(f"Processing failed for {playlist}")
+    return results
 
-        # Generate blog post if selected
-        if "Blog" in operations:
-            with st.spinner("✍️ Generating blog post..."):
-                # Use the Spotify link we just fetched, or look for one in the DataFrame
-                spotify_link = results.get('spotify_link')
-                
-                # If we don't have a link from the API, check if there's one in the DataFrame
-                if not spotify_link and 'Spotify_Link' in playlist_df.columns:
-                    # Get the first non-empty Spotify link
-                    spotify_links = playlist_df[
-                        (playlist_df['Spotify_Link'].notna()) & 
-                        (playlist_df['Spotify_Link'] != '')
-                    ]['Spotify_Link']
-                    
-                    if not spotify_links.empty:
-                        spotify_link = spotify_links.iloc[0]
-                
-                # Clean the playlist name for the blog post (remove numeric prefix)
-                clean_name = clean_playlist_name_for_blog(playlist)
-                
-                # Get blog customization options
-                style_options = {}
-                
-                # Check for standard dropdown selections
-                try:
-                    if 'model' in st.session_state:
-                        style_options['model'] = st.session_state.model
-                    
-                    if 'temperature' in st.session_state:
-                        style_options['temperature'] = st.session_state.temperature
-                    
-                    if 'tone' in st.session_state:
-                        style_options['tone'] = st.session_state.tone
-                    
-                    if 'mood' in st.session_state:
-                        style_options['mood'] = st.session_state.mood
-                    
-                    if 'intro_theme' in st.session_state:
-                        style_options['intro_theme'] = st.session_state.intro_theme
-                    
-                    if 'conclusion_theme' in st.session_state:
-                        style_options['conclusion_theme'] = st.session_state.conclusion_theme
-                    
-                    if 'section_count' in st.session_state:
-                        style_options['section_count'] = st.session_state.section_count
-                    
-                    if 'title_style' in st.session_state:
-                        style_options['title_style'] = st.session_state.title_style
-                    
-                    if 'audience' in st.session_state:
-                        style_options['audience'] = st.session_state.audience
-                    
-                    # Free form style options
-                    if 'writing_style' in st.session_state and st.session_state.writing_style:
-                        style_options['writing_style'] = st.session_state.writing_style
-                    
-                    if 'language_style' in st.session_state and st.session_state.language_style:
-                        style_options['language_style'] = st.session_state.language_style
-                    
-                    if 'sentence_structure' in st.session_state and st.session_state.sentence_structure:
-                        style_options['sentence_structure'] = st.session_state.sentence_structure
-                    
-                    if 'emotional_tone' in st.session_state and st.session_state.emotional_tone:
-                        style_options['emotional_tone'] = st.session_state.emotional_tone
-                    
-                    if 'custom_guidance' in st.session_state and st.session_state.custom_guidance:
-                        style_options['custom_guidance'] = st.session_state.custom_guidance
-                except Exception as e:
-                    st.warning(f"Note: Not all customization options could be applied. {str(e)}")
-                    # Continue with whatever options were successfully retrieved
-                
-                # Generate the blog post with style options
-                blog_post = generate_blog_post(
-                    playlist_name=clean_name,
-                    songs_df=playlist_df,
-                    spotify_link=spotify_link,
-                    style_options=style_options
-                )
-                results['blog_post'] = blog_post
-                
-                # Generate a default title for the blog post
-                title_base = clean_name.split('Wedding Cocktail Hour')[0].strip()
-                default_title = f"The {title_base} Wedding Cocktail Hour"
-                results['blog_title'] = default_title
-                
-                # Save the blog post to a file
-                saved_file = save_blog_post(
-                    playlist_name=playlist,
-                    blog_content=blog_post,
-                    title=default_title
-                )
-                results['blog_file'] = saved_file
-                st.success(f"✅ Blog post generated and saved")
+def render_background_jobs(job_ids):
+    """Show status, messages and results of background jobs"""
+    runner = get_job_runner()
+    jobs = runner.list_jobs(job_ids)
+    status_icons = {'queued': '⏳', 'running': '🔄', 'done': '✅', 'failed': '❌', 'cancelled': '⏹️'}
+    
+    for job in jobs:
+        snapshot = job.snapshot()
+        finished = snapshot['status'] in FINISHED_STATES
+        icon = status_icons.get(snapshot['status'], '')
+        with st.expander(f"{icon} {snapshot['name']} ({snapshot['status']})", expanded=not finished):
+            st.progress(snapshot['progress'])
+            
+            # Most recent messages from the job
+            for level, text in snapshot['messages'][-10:]:
+                getattr(st, level, st.info)(text)
+            
+            if snapshot['status'] == 'failed' and snapshot['error']:
+                st.error(snapshot['error'].splitlines()[0])
+            
+            results = snapshot['result'] or {}
+            if 'spotify_link' in results:
+                st.markdown(f"Spotify Playlist Link: [{results['spotify_link']}]({results['spotify_link']})")
+            if 'blog_file' in results:
+                st.success(f"✅ Blog post saved to {results['blog_file']}")
+            if 'blog_post' in results:
+                st.text_area("Generated Blog Post", results['blog_post'], height=300, key=f"job_blog_{snapshot['id']}")
+            
+            if not finished and st.button("Cancel", key=f"cancel_job_{snapshot['id']}"):
+                runner.cancel(snapshot['id'])
+    
+    # Once everything has finished, stop polling and rerun the whole page so
+    # tables pick up the updated DataFrame
+    if st.session_state.get('background_jobs_polling') and all(job.finished for job in jobs):
+        st.session_state.background_jobs_polling = False
+        st.rerun()
 
-        return True, results
+def show_background_jobs():
+    """Render the background job panel, polling every 2 seconds while jobs are running"""
+    job_ids = st.session_state.get('background_jobs', [])
+    if not job_ids:
+        return
+    
+    runner = get_job_runner()
+    # Jobs from before a server restart are gone from the table
+    job_ids = [job.id for job in runner.list_jobs(job_ids)]
+    st.session_state.background_jobs = job_ids
+    if not job_ids:
+        return
+    
+    st.subheader("Background Jobs")
+    running = any(not job.finished for job in runner.list_jobs(job_ids))
+    st.session_state.background_jobs_polling = running
+    st.fragment(render_background_jobs, run_every=2 if running else None)(job_ids)
+    
+    if not running and st.button("Clear finished jobs", key="clear_background_jobs"):
+        runner.clear_finished(job_ids)
+        st.session_state.background_jobs = []
+        st.rerun()
 
-    except Exception as e:
-        st.error(f"❌ Error processing playlist: {str(e)}")
-        st.error(traceback.format_exc())
-        return False, {}
+def catalog_jobs_running():
+    """
+    Check whether background jobs from this session are still updating the catalog
+    
+    Jobs update and save the DataFrame object they were started with, so
+    st.session_state.df must not be replaced (CSV upload, Spotify sync, new
+    songs or playlists) until they finish, or their results land in a stale copy.
+    :return: True while any of this session's jobs is queued or running
+    """
+    job_ids = st.session_state.get('background_jobs', [])
+    return bool(job_ids) and any(not job.finished for job in get_job_runner().list_jobs(job_ids))
+
+CATALOG_BUSY_MESSAGE = "⏳ Background jobs are still updating the catalog - wait for them to finish first."
 
 def main():
     # Initialize API clients with error handling
@@ -550,8 +472,16 @@ def main():
         youtube_key = os.getenv("YOUTUBE_API_KEY")
         if youtube_key:
             youtube_api = YouTubeAPI(youtube_key)
-            youtube_status, youtube_message = youtube_api.verify_connection()
+            # Verify once per session instead of spending a request on every rerun
+            verification = st.session_state.get('youtube_verification')
+            if verification is None:
+                verification = youtube_api.verify_connection()
+                # Transient errors are checked again on the next rerun
+                if verification[0] or "quota" in verification[1].lower():
+                    st.session_state.youtube_verification = verification
+            youtube_status, youtube_message = verification
             if not youtube_status and "quota" in youtube_message.lower():
+                youtube_api.quota_exceeded = True
                 st.sidebar.warning("⚠️ YouTube API quota exceeded. Some features may be limited.")
                 # Still allow the API client to be used, just with warnings about quota
             elif not youtube_status:
@@ -720,6 +650,8 @@ def main():
                     # Validate file type
                     if not uploaded_file.name.lower().endswith('.csv'):
                         st.error("❌ Please upload a valid CSV file.")
+                    elif catalog_jobs_running():
+                        st.warning(f"{CATALOG_BUSY_MESSAGE} The uploaded CSV will be loaded once they are done.")
                     else:
                         st.session_state.df = load_csv(uploaded_file)
                         st.success("✅ CSV file loaded successfully!")
@@ -746,6 +678,29 @@ def main():
             st.info(f"ℹ️ Auto-loaded data from {st.session_state.last_saved_csv}")
             st.session_state.auto_loaded = False
         
+        # Bring the catalog up to date with the DJ's Spotify account
+        if spotify_api and st.session_state.df is not None:
+            with st.expander("🔄 Sync Catalog from Spotify"):
+                st.write("Adds new playlists and songs from Spotify and drops songs that were removed. "
+                         "Only new or changed playlists are downloaded.")
+                sync_blocked = catalog_jobs_running()
+                if sync_blocked:
+                    st.info(CATALOG_BUSY_MESSAGE)
+                if st.button("🔄 Sync Now", key="catalog_sync_button", disabled=sync_blocked):
+                    try:
+                        new_df, summary = sync_catalog(st.session_state.df, spotify_api, reporter=StreamlitReporter())
+                        st.session_state.df = new_df
+                        if summary['saved_file']:
+                            st.session_state.last_saved_csv = summary['saved_file']
+                            st.success(f"✅ {len(summary['changed'])} playlists updated and {len(summary['new'])} added "
+                                       f"(+{summary['added_songs']} / -{summary['removed_songs']} songs). "
+                                       f"Saved to {summary['saved_file']}")
+                        else:
+                            st.success(f"✅ Catalog is up to date ({summary['checked']} playlists checked)")
+                    except Exception as e:
+                        st.error(f"❌ Spotify sync failed: {str(e)}")
+                        logger.error(traceback.format_exc())
+        
         # If we have data, display playlist processing options
         if st.session_state.df is not None:
             playlists = st.session_state.df['Playlist'].unique()
@@ -768,6 +723,13 @@ def main():
             with col3:
                 generate_blog = st.checkbox("Generate Blog Post", value=True)
             
+            # Background jobs keep running across reruns and page interactions
+            run_in_background = st.checkbox(
+                "Run in background",
+                value=False,
+                help="Process each playlist as a background job. You can keep using the app and check progress below."
+            )
+            
             # Blog customization options
             if generate_blog:
                 with st.expander("Blog Customization Options", expanded=False):
@@ -1049,6 +1011,18 @@ def main():
                     
                     if not operations:
                         st.warning("⚠️ Please select at least one operation to perform.")
+                    elif run_in_background:
+                        # Session state isn't available in worker threads, so collect what the job needs now
+                        runner = get_job_runner()
+                        style_options = collect_style_options()
+                        for playlist in selected_playlists:
+                            job_id = runner.submit(
+                                f"Process {playlist}", run_playlist_job,
+                                playlist, youtube_api, spotify_api, operations,
+                                st.session_state.df, style_options
+                            )
+                            st.session_state.background_jobs.append(job_id)
+                        st.success(f"✅ Started {len(selected_playlists)} background job(s)")
                     else:
                         # Process each playlist
                         for playlist in selected_playlists:
@@ -1108,6 +1082,9 @@ def main():
                                                             st.error(f"❌ Failed to create post: {error_msg}")
                                                     except Exception as e:
                                                         st.error(f"❌ Error posting to WordPress: {str(e)}")
+            
+            # Progress and results of background jobs started from this session
+            show_background_jobs()
                         
     # Tab 2: Edit CSV Data
     with tab2:
@@ -1118,7 +1095,7 @@ def main():
             playlists = st.session_state.df['Playlist'].unique()
             
             # Format the playlist names for display (remove numeric prefixes)
-            display_names = {p: re.sub(r'^\d{3}\s+', '', p) for p in playlists}
+            display_names = {p: normalize_playlist_name(p) for p in playlists}
             
             # Dropdown to select a playlist to edit
             selected_edit_playlist = st.selectbox(
@@ -1142,7 +1119,10 @@ def main():
                 )
                 
                 # Button to add new songs
-                if st.button("➕ Add New Song"):
+                edit_blocked = catalog_jobs_running()
+                if edit_blocked:
+                    st.info(CATALOG_BUSY_MESSAGE)
+                if st.button("➕ Add New Song", disabled=edit_blocked):
                     # Create a new row with the current playlist
                     new_row = {
                         'Playlist': selected_edit_playlist,
@@ -1175,7 +1155,7 @@ def main():
             )
             
             # Create button
-            if st.button("✨ Create New Playlist"):
+            if st.button("✨ Create New Playlist", disabled=catalog_jobs_running()):
                 if new_playlist_name:
                     # Validate playlist name
                     if len(new_playlist_name.strip()) < 3:
@@ -1185,7 +1165,7 @@ def main():
                         new_playlist_name = new_playlist_name.strip()
                         
                         # Check for duplicate names
-                        clean_existing_names = [re.sub(r'^\d{3}\s+', '', p).lower() for p in playlists]
+                        clean_existing_names = [normalize_playlist_name(p).lower() for p in playlists]
                         if new_playlist_name.lower() in clean_existing_names:
                             st.error("❌ A playlist with this name already exists.")
                         else:
@@ -1307,14 +1287,14 @@ def main():
                 # Stage 1: Post Selection
                 st.write("Find WordPress posts to revamp by searching or browsing categories.")
                 
-                # Initialize category state if needed
-                if 'wp_categories' not in st.session_state:
-                    st.session_state.wp_categories = []
+                # Load categories once per session; the on-disk taxonomy cache is used
+                # as-is so opening this tab doesn't wait on WordPress
+                if not st.session_state.get('wp_categories_loaded'):
+                    st.session_state.wp_categories_loaded = True
                     try:
-                        with st.spinner("Loading categories..."):
-                            categories = wordpress_api.get_categories()
-                            if categories:
-                                st.session_state.wp_categories = categories
+                        categories = wordpress_api.get_categories(allow_stale=True)
+                        if categories:
+                            st.session_state.wp_categories = categories
                     except Exception as e:
                         st.error(f"Could not load categories: {str(e)}")
                 
@@ -1399,13 +1379,20 @@ def main():
                                         st.session_state.wp_posts = []
                         else:
                             st.info("No categories with posts available.")
+                        
+                        # Categories come from the on-disk cache, so allow a manual refresh
+                        if st.button("Refresh Categories", key="wordpress_refresh_categories"):
+                            categories = wordpress_api.get_categories(refresh=True)
+                            if categories:
+                                st.session_state.wp_categories = categories
+                                st.rerun()
                     else:
                         st.info("No categories found. Please check your WordPress site configuration.")
                         # Reload categories button
                         if st.button("Reload Categories", key="wordpress_reload_categories"):
                             with st.spinner("Loading categories..."):
                                 try:
-                                    categories = wordpress_api.get_categories()
+                                    categories = wordpress_api.get_categories(refresh=True)
                                     if categories:
                                         st.session_state.wp_categories = categories
                                         st.success(f"Loaded {len(categories)} categories.")
@@ -1445,13 +1432,16 @@ def main():
                         key="wordpress_post_selector"
                     )
                     
-                    # Get the full post data for the selected post
-                    selected_post = None
-                    for post in st.session_state.wp_posts:
-                        if post.get('id') == selected_post_id:
-                            selected_post = post
-                            st.session_state.wp_selected_post = post  # Save to session state
-                            break
+                    # Search results only carry list fields - fetch the full post once it is selected
+                    selected_post = st.session_state.wp_selected_post
+                    if not selected_post or selected_post.get('id') != selected_post_id or not selected_post.get('content'):
+                        selected_post = None
+                        with st.spinner("Loading post..."):
+                            selected_post = wordpress_api.get_post(selected_post_id)
+                        if selected_post:
+                            st.session_state.wp_selected_post = selected_post  # Save to session state
+                        else:
+                            st.error(f"Could not load post {selected_post_id} from WordPress.")
                     
                     if selected_post:
                         # Handle post title (could be string or dict with rendered property)
@@ -2078,6 +2068,16 @@ def main():
                             3. Find the draft in WordPress Admin → Posts → Drafts
                             4. Review in Elementor and click Publish when ready
                             """)
+                            
+                            dry_run = st.checkbox(
+                                "Dry run (show what would change without updating)",
+                                value=False,
+                                key="wp_edit_dry_run"
+                            )
+                            if dry_run:
+                                button_text = "🔍 Preview Changes"
+                        else:
+                            dry_run = False
                         
                         if st.button(button_text, key="wp_edit_post_button"):
                             # Get the original post ID from post_data
@@ -2091,10 +2091,20 @@ def main():
                                             post_id=original_post_id,
                                             title=post_title,
                                             content=st.session_state.wp_edit_revamped_content,
-                                            status="draft"  # Setting as draft for review before publishing
+                                            status="draft",  # Setting as draft for review before publishing
+                                            dry_run=dry_run
                                         )
                                         
-                                        if result.get('success'):
+                                        if result.get('success') and result.get('dry_run'):
+                                            if result.get('changed'):
+                                                st.info(f"Post {original_post_id} would change"
+                                                        f"{' (including the title)' if result.get('title_changed') else ''}:")
+                                                st.code(result.get('diff') or "(title only)", language="diff")
+                                            else:
+                                                st.success("✅ No changes - the live post already has this content")
+                                        elif result.get('success') and result.get('skipped'):
+                                            st.success(f"✅ Post {original_post_id} already has this content - nothing to update")
+                                        elif result.get('success'):
                                             post_id = result.get('post_id')
                                             post_url = result.get('post_url')
                                             edit_url = result.get('edit_url')
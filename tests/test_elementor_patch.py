@@ -0,0 +1,88 @@
+import json
+
+from utils.elementor_handler import ElementorHandler
+
+
+def widget(widget_id, widget_type, settings):
+    return {"id": widget_id, "elType": "widget", "settings": settings, "elements": [], "widgetType": widget_type}
+
+
+def page(*widgets):
+    return [{"id": "sec1", "elType": "section", "settings": {},
+             "elements": [{"id": "col1", "elType": "column", "settings": {"_column_size": 100},
+                           "elements": list(widgets)}]}]
+
+
+def php_json(data):
+    # WordPress stores _elementor_data with escaped slashes and \uXXXX escapes
+    return json.dumps(data, separators=(',', ':')).replace('/', '\\/')
+
+
+PAGE = php_json(page(
+    widget("head1", "heading", {"title": "Café Classics"}),
+    widget("img1", "image", {"image": {"url": "https://example.com/a.jpg", "id": "77"}}),
+    widget("main1", "text-editor", {"editor": '<div class="intro"><p>Old</p></div>',
+                                    "_background": {"id": "bg1", "color": "#fff"}}),
+    widget("text2", "text-editor", {"editor": "<p>Second</p>"}),
+))
+
+
+def test_patch_matches_full_update():
+    patched = ElementorHandler.update_elementor_content(PAGE, "<p>New & improved</p>", patch=True)
+    rewritten = ElementorHandler.update_elementor_content(PAGE, "<p>New & improved</p>", patch=False)
+
+    assert json.loads(patched) == json.loads(rewritten)
+    main = json.loads(patched)[0]["elements"][0]["elements"][2]
+    # The wrapper div of the original widget is kept
+    assert main["settings"]["editor"] == '<div class="intro"><p>New & improved</p></div>'
+
+
+def test_patch_leaves_the_rest_untouched():
+    patched = ElementorHandler.patch_widget(PAGE, "<p>New</p>")
+
+    assert patched is not None
+    prefix = PAGE[:PAGE.index('"editor"')]
+    assert patched.startswith(prefix)
+    assert '"title":"Caf\\u00e9 Classics"' in patched
+    assert 'https:\\/\\/example.com\\/a.jpg' in patched
+    assert '"editor":"<p>Second<\\/p>"' in patched
+
+
+def test_locate_widget_skips_nested_ids():
+    start, widget_type = ElementorHandler.locate_widget(PAGE)
+
+    assert widget_type == "text-editor"
+    assert PAGE.startswith('"id":"main1"', start)
+
+
+def test_patch_by_widget_id():
+    patched = ElementorHandler.update_elementor_content(PAGE, "Fresh Title", widget_id="head1")
+
+    widgets = json.loads(patched)[0]["elements"][0]["elements"]
+    assert widgets[0]["settings"]["title"] == "Fresh Title"
+    assert widgets[2]["settings"]["editor"] == '<div class="intro"><p>Old</p></div>'
+
+
+def test_falls_back_to_first_text_widget():
+    data = php_json(page(widget("head1", "heading", {"title": "Only heading"})))
+
+    patched = ElementorHandler.update_elementor_content(data, "Replaced")
+
+    assert json.loads(patched)[0]["elements"][0]["elements"][0]["settings"]["title"] == "Replaced"
+
+
+def test_unusual_key_order_is_reserialized():
+    # widgetType before id - the text can't be patched safely, so the tree is rebuilt
+    data = json.dumps([{"widgetType": "text-editor", "id": "w1", "elType": "widget",
+                        "settings": {"editor": "<p>Old</p>"}, "elements": []}])
+
+    assert ElementorHandler.patch_widget(data, "<p>New</p>") is None
+    patched = ElementorHandler.update_elementor_content(data, "<p>New</p>")
+    assert json.loads(patched)[0]["settings"]["editor"] == "<p>New</p>"
+
+
+def test_reserialize_keeps_ascii_escapes():
+    rewritten = ElementorHandler.update_elementor_content(PAGE, "<p>Café</p>", patch=False)
+
+    assert '"title":"Caf\\u00e9 Classics"' in rewritten
+    assert "é" not in rewritten
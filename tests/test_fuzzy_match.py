@@ -0,0 +1,84 @@
+import pytest
+
+import utils.fuzzy_match as fuzzy_match
+from utils.fuzzy_match import FuzzyIndex, name_similarity, normalize_name
+from utils.spotify_api import MIN_MATCH_SCORE, SpotifyAPI
+
+# Playlist names as they appear on Spotify
+SPOTIFY_NAMES = [
+    "The Yacht Rock Wedding Cocktail Hour (Vol. 1)",
+    "The Yacht Rock Wedding Cocktail Hour (Vol. 2)",
+    "The Yacht Rock Wedding Cocktail Hour (Vol. 3)",
+    "The Indie Wedding Cocktail Hour",
+    "The Indie Folk Wedding Cocktail Hour",
+    "The Miami Vice Memories Wedding Cocktail Hour",
+    "The Surfs Up Wedding Cocktail Hour",
+    "The Boardwalk Empire and Great Gatsby Wedding Cocktail Hour",
+    "The Disco Love Wedding Cocktail Hour",
+    "The Disco Love Wedding Cocktail Hour (Volume 2)",
+]
+
+
+@pytest.fixture(params=['rapidfuzz', 'difflib'])
+def index(request, monkeypatch):
+    if request.param == 'rapidfuzz':
+        pytest.importorskip('rapidfuzz')
+    else:
+        monkeypatch.setattr(fuzzy_match, 'fuzz', None)
+    return FuzzyIndex((name, f"url:{name}") for name in SPOTIFY_NAMES)
+
+
+@pytest.mark.parametrize('variant', [
+    "The Yacht Rock Wedding Cocktail Hour (Vol. 2)",
+    "The Yacht Rock Wedding Cocktail Hour Vol 2",
+    "The Yacht Rock Wedding Cocktail Hour Volume 2",
+    "The Yacht Rock Wedding Cocktail Hour (Volume 2)",
+    "the yacht rock wedding cocktail hour vol.2",
+])
+def test_volume_spellings_normalize_alike(variant):
+    assert normalize_name(variant) == "the yacht rock wedding cocktail hour volume 2"
+
+
+def test_ampersand_accents_and_apostrophes_normalize_alike():
+    assert normalize_name("The Boardwalk Empire & Great Gatsby") == normalize_name("The Boardwalk Empire and Great Gatsby")
+    assert normalize_name("The Surf’s Up Wedding Cocktail Hour") == normalize_name("The Surfs Up Wedding Cocktail Hour")
+    assert normalize_name("The Café Wedding Cocktail Hour") == "the cafe wedding cocktail hour"
+
+
+def test_exact_lookup_ignores_spelling(index):
+    name, url = index.exact("The Yacht Rock Wedding Cocktail Hour (Volume 2)")
+    assert name == "The Yacht Rock Wedding Cocktail Hour (Vol. 2)"
+    assert url == "url:The Yacht Rock Wedding Cocktail Hour (Vol. 2)"
+    assert index.exact("The Boardwalk Empire & Great Gatsby Wedding Cocktail Hour") is not None
+    assert index.exact("The Surf’s Up Wedding Cocktail Hour") is not None
+
+
+def test_other_volumes_score_below_threshold(index):
+    results = index.search("The Yacht Rock Wedding Cocktail Hour Volume 2")
+    assert results[0][0] == "The Yacht Rock Wedding Cocktail Hour (Vol. 2)"
+    assert results[0][1] == 100
+    assert all(score < MIN_MATCH_SCORE for name, score, _ in results[1:])
+
+
+def test_volume_one_matches_unnumbered_name(index):
+    name, score, _ = index.search("The Disco Love Wedding Cocktail Hour (Volume 1)", limit=1)[0]
+    assert name == "The Disco Love Wedding Cocktail Hour"
+    assert score >= MIN_MATCH_SCORE
+
+
+def test_closest_name_wins_over_longer_name(index):
+    name, score, _ = index.search("The Indie Wedding Cocktail Hour Playlist", limit=1)[0]
+    assert name == "The Indie Wedding Cocktail Hour"
+
+
+def test_different_playlist_just_below_threshold(index):
+    # "Miami Vice" and "Miami Vice Memories" are two different catalog playlists
+    score = name_similarity(normalize_name("The Miami Vice Wedding Cocktail Hour"),
+                            normalize_name("The Miami Vice Memories Wedding Cocktail Hour"))
+    assert MIN_MATCH_SCORE - 5 <= score < MIN_MATCH_SCORE
+    assert SpotifyAPI._match_playlist(index, "The Miami Vice Wedding Cocktail Hour") is None
+
+
+def test_match_playlist_accepts_variant(index):
+    url = SpotifyAPI._match_playlist(index, "The Yacht Rock Wedding Cocktail Hour Volume 3")
+    assert url == "url:The Yacht Rock Wedding Cocktail Hour (Vol. 3)"
@@ -0,0 +1,82 @@
+import pandas as pd
+
+from utils.playlist_processing import PlaylistProcessor
+from utils.progress import RecordingReporter
+
+
+class FakeYouTube:
+    def __init__(self, quota_after=None):
+        self.queries = []
+        self.quota_after = quota_after
+
+    def get_video_links(self, queries):
+        self.queries.extend(queries)
+        links = {query: f"https://www.youtube.com/watch?v={abs(hash(query)) % 10**11:011d}" for query in queries}
+        if self.quota_after is not None:
+            error = Exception("YouTube quota exceeded")
+            error.results = dict(list(links.items())[:self.quota_after])
+            raise error
+        return links
+
+
+class FakeSpotify:
+    def get_playlist_link(self, user_id, name):
+        return f"https://open.spotify.com/playlist/{name.replace(' ', '')}"
+
+
+def catalog():
+    rows = [
+        ("001 Retro Wedding Cocktail Hour", "September", "Earth, Wind & Fire", "https://www.youtube.com/watch?v=Gs069dndIYk"),
+        ("002 Boy Bands Wedding Cocktail Hour", "September", "Earth, Wind & Fire", ""),
+        ("002 Boy Bands Wedding Cocktail Hour", "I Want It That Way", "Backstreet Boys", ""),
+        ("002 Boy Bands Wedding Cocktail Hour", "I Want It That Way - Radio Edit", "Backstreet Boys", ""),
+        ("002 Boy Bands Wedding Cocktail Hour", "Candy Girl", "New Edition", ""),
+    ]
+    df = pd.DataFrame(rows, columns=['Playlist', 'Song', 'Artist', 'YouTube_Link'])
+    df['Song_Artist'] = df['Song'] + "-" + df['Artist']
+    df['Spotify_Link'] = ""
+    return df
+
+
+def test_process_reports_each_stage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = catalog()
+    youtube = FakeYouTube()
+    processor = PlaylistProcessor(df, youtube_api=youtube, spotify_api=FakeSpotify(), spotify_user_id="dj")
+    reporter = RecordingReporter()
+
+    success, results = processor.process("002 Boy Bands Wedding Cocktail Hour", ["YouTube", "Spotify"], reporter)
+
+    assert success
+    assert reporter.messages('error') == []
+    assert "♻️ Reused 1 YouTube links from other playlists" in reporter.messages('info')
+    assert reporter.messages('success') == ["✅ YouTube links fetched and saved",
+                                            "✅ Spotify playlist found and saved to CSV"]
+    # Both spellings of "I Want It That Way" share one search
+    assert len(youtube.queries) == 2
+    assert ('stage_started', 'youtube', "Fetching YouTube links for 2 songs...", 2) in reporter.events
+    assert ('advance', 2, 2) in reporter.events
+    assert [event[1] for event in reporter.events if event[0] == 'stage_finished'] == ['youtube', 'spotify']
+
+    boy_bands = df[df['Playlist'] == "002 Boy Bands Wedding Cocktail Hour"]
+    assert (boy_bands['YouTube_Link'] != "").all()
+    assert boy_bands['YouTube_Link'].iloc[0] == "https://www.youtube.com/watch?v=Gs069dndIYk"
+    assert boy_bands['YouTube_Link'].iloc[1] == boy_bands['YouTube_Link'].iloc[2]
+    assert results['spotify_link'].startswith("https://open.spotify.com/playlist/")
+    assert (tmp_path / results['updated_file']).exists()
+
+
+def test_quota_stop_keeps_found_links_and_warns(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = catalog()
+    processor = PlaylistProcessor(df, youtube_api=FakeYouTube(quota_after=1))
+    reporter = RecordingReporter()
+
+    success, results = processor.process("002 Boy Bands Wedding Cocktail Hour", ["YouTube"], reporter)
+
+    assert success
+    assert "⚠️ YouTube API quota exceeded. Please try again tomorrow." in reporter.messages('warning')
+    # No progress is reported for the chunk the quota stopped
+    assert not any(event[0] == 'advance' for event in reporter.events)
+    boy_bands = df[df['Playlist'] == "002 Boy Bands Wedding Cocktail Hour"]
+    assert (boy_bands['YouTube_Link'] != "").sum() == 3
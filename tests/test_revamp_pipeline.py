@@ -0,0 +1,92 @@
+import sqlite3
+import threading
+
+from utils.revamp_pipeline import DONE, FAILED, RevampJobStore, RevampPipeline
+
+
+class FakeWordPress:
+    def __init__(self):
+        self.batches = []
+
+    def update_posts_batch(self, updates):
+        self.batches.append([update['post_id'] for update in updates])
+        return [{'success': True, 'post_id': update['post_id']} for update in updates]
+
+    def get_post(self, post_id, context='view'):
+        return {
+            'id': post_id,
+            'title': 'Rock &amp; Roll &#8211; Live',
+            'title_raw': 'Rock & Roll – Live',
+            'content': '<p>rendered</p>\n',
+            'content_raw': '<p>raw</p>',
+        }
+
+
+class FlakyStore(RevampJobStore):
+    """Job store whose writes for one post fail, like a locked database"""
+
+    def __init__(self, db_path, failing_post_id):
+        super().__init__(db_path)
+        self.failing_post_id = failing_post_id
+
+    def save_post(self, job_id, post_id, stage, state, data=None, error=None):
+        if post_id == self.failing_post_id and stage == 'extract':
+            raise sqlite3.OperationalError("database is locked")
+        return super().save_post(job_id, post_id, stage, state, data=data, error=error)
+
+
+def make_pipeline(store):
+    pipeline = RevampPipeline(FakeWordPress(), store=store)
+    # Only fetch and update talk to (fake) WordPress; the stages in between just pass the data on
+    for stage in ('extract', 'enrich'):
+        pipeline._stage_functions[stage] = lambda post_id, data: data
+    pipeline._stage_functions['revamp'] = lambda post_id, data: dict(data, revamped_content='<p>new</p>')
+    return pipeline
+
+
+def run_with_timeout(pipeline, job_id, timeout=20):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(counts=pipeline.run(job_id)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline run did not finish"
+    return result['counts']
+
+
+def test_fetch_keeps_raw_title_and_content(tmp_path):
+    pipeline = make_pipeline(RevampJobStore(str(tmp_path / "jobs.sqlite")))
+    data = pipeline._fetch(7, {})
+    assert data['title'] == 'Rock & Roll – Live'
+    assert data['content'] == '<p>raw</p>'
+
+
+def test_run_finishes_when_saving_progress_fails(tmp_path):
+    store = FlakyStore(str(tmp_path / "jobs.sqlite"), failing_post_id=2)
+    pipeline = make_pipeline(store)
+    job_id = store.create_job([1, 2, 3])
+
+    counts = run_with_timeout(pipeline, job_id)
+
+    assert counts.get(DONE) == 2
+    assert counts.get(FAILED) is None
+    posts = {post['post_id']: post for post in store.get_posts(job_id)}
+    assert posts[1]['state'] == DONE and posts[3]['state'] == DONE
+    # The post whose progress could not be saved is resumable, not lost
+    assert posts[2]['state'] != DONE
+
+
+def test_waiting_updates_are_written_in_one_batch(tmp_path):
+    store = RevampJobStore(str(tmp_path / "jobs.sqlite"))
+    pipeline = make_pipeline(store)
+    job_id = store.create_job(list(range(1, 31)))
+    # As if the job was resumed after every post had been revamped
+    for post_id in range(1, 31):
+        store.save_post(job_id, post_id, 'update', 'pending',
+                        data={'title': f'Post {post_id}', 'revamped_content': '<p>new</p>'})
+
+    counts = run_with_timeout(pipeline, job_id)
+
+    assert counts == {DONE: 30}
+    batches = pipeline.wordpress_api.batches
+    assert sorted(post_id for batch in batches for post_id in batch) == list(range(1, 31))
+    assert max(len(batch) for batch in batches) > 1
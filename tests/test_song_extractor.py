@@ -0,0 +1,48 @@
+from utils.song_extractor import extract_songs_from_html, split_song_artist
+
+
+def songs(html):
+    return [(song['Song'], song['Artist'], song['YouTube_Link']) for song in extract_songs_from_html(html)]
+
+
+def test_dash_variants():
+    assert split_song_artist("Candy Girl – New Edition") == ("Candy Girl", "New Edition")
+    assert split_song_artist("Candy Girl — New Edition") == ("Candy Girl", "New Edition")
+    assert split_song_artist("Empire State of Mind - Jay-Z") == ("Empire State of Mind", "Jay-Z")
+    assert split_song_artist("Wind-down", allow_bare_hyphen=False) is None
+
+
+def test_em_dash_entity_in_block():
+    assert songs("<p>Thank You &mdash; Boyz II Men</p>") == [("Thank You", "Boyz II Men", "")]
+
+
+def test_anchor_with_unclosed_target():
+    html = (
+        '<p><a href="https://www.youtube.com/watch?v=YtbFPLK-JWI" target="_blankCandy Girl – New Edition</a></p>\n'
+        '<p><a href="https://www.youtube.com/watch?v=BiEEJds8JFE" target="_blankGlad You Came – The Wanted</a></p>\n'
+    )
+    assert songs(html) == [
+        ("Candy Girl", "New Edition", "https://www.youtube.com/watch?v=YtbFPLK-JWI"),
+        ("Glad You Came", "The Wanted", "https://www.youtube.com/watch?v=BiEEJds8JFE"),
+    ]
+
+
+def test_tag_with_attribute_open_at_end_of_line():
+    html = (
+        '<div class="highlight-section\n'
+        '<h2>Songs for the Opening Phase</h2>\n'
+        '<p><a href="https://www.youtube.com/watch?v=F5LkGKJDc3Q" target="_blank">'
+        'New York State of Mind – Billy Joel</a></p>\n'
+    )
+    assert songs(html) == [("New York State of Mind", "Billy Joel", "https://www.youtube.com/watch?v=F5LkGKJDc3Q")]
+
+
+def test_well_formed_anchor_attributes_are_untouched():
+    html = ('<p><a href="https://www.youtube.com/watch?v=abc" target="_blank" rel="noopener">'
+            'Take the "A" Train – Duke Ellington</a></p>')
+    assert songs(html) == [('Take the "A" Train', "Duke Ellington", "https://www.youtube.com/watch?v=abc")]
+
+
+def test_no_markup_in_results():
+    html = '<p><a href="https://www.youtube.com/watch?v=abc" title="x <b>Song – Artist</b></a></p>'
+    assert all('<' not in song and '<' not in artist for song, artist, _ in songs(html))
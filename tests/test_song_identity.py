@@ -0,0 +1,96 @@
+import pandas as pd
+
+from utils.song_identity import SongIndex, canonical_title, query_groups, song_key
+
+
+def test_spellings_of_the_same_song_share_a_key():
+    key = song_key("Don't Stop Me Now", "Queen")
+    assert key == "dont stop me now::queen"
+    assert song_key("Dont Stop Me Now - Remastered 2011", "Queen") == key
+    assert song_key("Don’t Stop Me Now (2011 Remaster)", "Queen") == key
+    assert song_key("DON'T STOP ME NOW", "queen") == key
+
+
+def test_accents_are_folded():
+    assert song_key("Señorita", "Shawn Mendes, Camila Cabello") == song_key("Senorita", "Camila Cabello & Shawn Mendes")
+
+
+def test_artist_order_and_separators_do_not_matter():
+    key = song_key("This Is What You Came For", "Calvin Harris, Rihanna")
+    assert song_key("This Is What You Came For", "Rihanna & Calvin Harris") == key
+    assert song_key("This Is What You Came For", "Rihanna and Calvin Harris") == key
+
+
+def test_featured_artists_are_dropped():
+    key = song_key("Stay", "Zedd")
+    assert song_key("Stay (feat. Alessia Cara)", "Zedd") == key
+    assert song_key("Stay", "Zedd feat. Alessia Cara") == key
+    assert song_key("Stay ft. Alessia Cara", "Zedd") == key
+
+
+def test_live_and_edit_qualifiers_are_stripped():
+    assert canonical_title("Summer Wind - Live") == "summer wind"
+    assert canonical_title("Summer Wind (Live at the Sands)") == "summer wind"
+    assert canonical_title("Summer Wind - Radio Edit") == "summer wind"
+    assert canonical_title("Summer Wind — Mono") == "summer wind"
+
+
+def test_qualifier_words_inside_other_words_are_kept():
+    assert canonical_title("Mono (Liveliness)") == "mono liveliness"
+    assert canonical_title("Live Forever") == "live forever"
+    assert canonical_title("Live") == "live"
+
+
+def test_named_remixes_keep_their_own_key():
+    assert canonical_title("Rather Be (Clean Bandit Remix)") == "rather be clean bandit remix"
+    assert song_key("Rather Be (Clean Bandit Remix)", "Clean Bandit") != song_key("Rather Be", "Clean Bandit")
+    assert song_key("Rather Be - Clean Bandit Remix", "Clean Bandit") != song_key("Rather Be", "Clean Bandit")
+
+
+def test_inverted_article_matches():
+    assert song_key("Be My Baby", "Ronettes, The") == song_key("Be My Baby", "The Ronettes")
+    assert song_key("Be My Baby", "The Ronettes") == "be my baby::ronettes"
+
+
+def catalog(rows):
+    return pd.DataFrame(rows, columns=['Playlist', 'Song', 'Artist', 'YouTube_Link'])
+
+
+def test_propagate_copies_links_to_equivalent_rows_only():
+    df = catalog([
+        ['001 A', "Don't Stop Me Now", 'Queen', 'https://www.youtube.com/watch?v=queen'],
+        ['002 B', 'Dont Stop Me Now - Remastered 2011', 'Queen', ''],
+        ['003 C', 'Rather Be', 'Clean Bandit', 'https://www.youtube.com/watch?v=original'],
+        ['004 D', 'Rather Be (Clean Bandit Remix)', 'Clean Bandit', None],
+    ])
+    assert SongIndex(df).propagate_youtube_links() == 1
+    assert df.loc[1, 'YouTube_Link'] == 'https://www.youtube.com/watch?v=queen'
+    assert pd.isna(df.loc[3, 'YouTube_Link'])
+
+
+def test_propagate_fills_another_frame_from_the_catalog():
+    df = catalog([['001 A', 'Be My Baby', 'The Ronettes', 'https://www.youtube.com/watch?v=ronettes']])
+    playlist = catalog([['002 B', 'Be My Baby', 'Ronettes, The', '']])
+    assert SongIndex(df).propagate_youtube_links(playlist) == 1
+    assert playlist.loc[0, 'YouTube_Link'] == 'https://www.youtube.com/watch?v=ronettes'
+
+
+def test_duplicates_report():
+    df = catalog([
+        ['001 A', "Don't Stop Me Now", 'Queen', 'https://www.youtube.com/watch?v=queen'],
+        ['002 B', 'Dont Stop Me Now - Remastered 2011', 'Queen', ''],
+        ['003 C', 'Rather Be', 'Clean Bandit', ''],
+    ])
+    index = SongIndex(df)
+    report = index.duplicates()
+    assert len(index) == 2
+    assert list(report['Key']) == ['dont stop me now::queen']
+    assert report.loc[0, 'Rows'] == 2
+    assert report.loc[0, 'Spellings'] == ["Don't Stop Me Now - Queen", 'Dont Stop Me Now - Remastered 2011 - Queen']
+    assert report.loc[0, 'YouTube_Link'] == 'https://www.youtube.com/watch?v=queen'
+    assert index.rows("DON'T STOP ME NOW", 'Queen') == [0, 1]
+
+
+def test_query_groups_search_each_song_once():
+    groups = query_groups([(0, "Don't Stop Me Now", 'Queen'), (1, 'Dont Stop Me Now', 'Queen'), (2, 'Stay', 'Zedd')])
+    assert list(groups.values()) == [("Don't Stop Me Now - Queen", [0, 1]), ('Stay - Zedd', [2])]
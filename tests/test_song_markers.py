@@ -0,0 +1,46 @@
+from utils.openai_api import add_missing_song_markers, inject_song_links
+
+
+def song(name, artist, link=''):
+    return {'Song': name, 'Artist': artist, 'YouTube_Link': link}
+
+
+SONGS = [
+    song("September", "Earth, Wind & Fire", "https://www.youtube.com/watch?v=Gs069dndIYk"),
+    song("Valerie", "Amy Winehouse"),
+    song("Lovely Day", "Bill Withers"),
+]
+
+
+def test_all_markers_present():
+    content = "<h2>Warm Up</h2>\n<p>[[SONG_1]]</p>\n<p>[[SONG_2]]</p>\n<p>[[SONG_3]]</p>"
+    assert add_missing_song_markers(content, 3) == (content, [])
+    result = inject_song_links(content, SONGS)
+    assert '<a href="https://www.youtube.com/watch?v=Gs069dndIYk" target="_blank">September – Earth, Wind &amp; Fire</a>' in result
+    assert "<p>Valerie – Amy Winehouse</p>" in result
+    assert "[[SONG_" not in result
+
+
+def test_missing_markers_follow_last_song():
+    content = "<h2>Warm Up</h2>\n<p>[[SONG_1]]</p>\n<p>Great vibes.</p>\n<h2>Why This Playlist Works</h2>\n<p>Because.</p>"
+    patched, missing = add_missing_song_markers(content, 3)
+    assert missing == [2, 3]
+    assert patched == ("<h2>Warm Up</h2>\n<p>[[SONG_1]]</p>\n<p>[[SONG_2]]</p>\n<p>[[SONG_3]]</p>"
+                       "\n<p>Great vibes.</p>\n<h2>Why This Playlist Works</h2>\n<p>Because.</p>")
+
+    result = inject_song_links(content, SONGS)
+    for name in ("September", "Valerie", "Lovely Day"):
+        assert name in result
+    assert result.index("Lovely Day") < result.index("Why This Playlist Works")
+
+
+def test_no_markers_appends_every_song():
+    patched, missing = add_missing_song_markers("<p>The model wrote the songs out itself.</p>", 2)
+    assert missing == [1, 2]
+    assert patched.endswith("<p>[[SONG_1]]</p>\n<p>[[SONG_2]]</p>")
+
+
+def test_unknown_marker_does_not_count():
+    patched, missing = add_missing_song_markers("<p>[[SONG_1]]</p><p>[[SONG_9]]</p>", 2)
+    assert missing == [2]
+    assert "<p>Valerie – Amy Winehouse</p>" in inject_song_links("<p>[[SONG_1]]</p><p>[[SONG_9]]</p>", SONGS[:2])
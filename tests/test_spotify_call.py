@@ -0,0 +1,67 @@
+import time
+
+import pytest
+from spotipy.exceptions import SpotifyException
+
+import utils.spotify_api as spotify_api
+from utils.rate_limit import CircuitBreaker, RateLimiter
+
+
+class FakeSpotify:
+    """Answers each call with the next scripted response: 'ok', an HTTP status or an exception"""
+
+    def __init__(self):
+        self.responses = []
+
+    def playlist(self):
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        if response != 'ok':
+            raise SpotifyException(response, -1, "scripted error", headers={'Retry-After': '0'})
+        return response
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(spotify_api, 'SPOTIFY_BREAKER',
+                        CircuitBreaker("Spotify API", failure_threshold=1, reset_timeout=0.1))
+    monkeypatch.setattr(spotify_api, 'SPOTIFY_LIMITER', RateLimiter(rate=1000))
+    monkeypatch.setattr(spotify_api, 'backoff_delay', lambda attempt: 0)
+    client = spotify_api.SpotifyAPI.__new__(spotify_api.SpotifyAPI)
+    client.spotify = FakeSpotify()
+    return client
+
+
+def open_breaker(api):
+    api.spotify.responses = [503] * spotify_api.MAX_ATTEMPTS
+    with pytest.raises(spotify_api.SpotifyUnavailable):
+        api.call('playlist')
+    time.sleep(0.15)
+
+
+def test_rate_limited_trial_call_closes_breaker(api):
+    open_breaker(api)
+    api.spotify.responses = [429, 'ok']
+    assert api.call('playlist') == 'ok'
+    api.spotify.responses = ['ok']
+    assert api.call('playlist') == 'ok'
+
+
+def test_rate_limited_trial_call_that_gives_up_releases_trial(api, monkeypatch):
+    open_breaker(api)
+    monkeypatch.setattr(spotify_api, 'MAX_ATTEMPTS', 1)
+    api.spotify.responses = [429]
+    with pytest.raises(spotify_api.SpotifyRateLimited):
+        api.call('playlist')
+    api.spotify.responses = ['ok']
+    assert api.call('playlist') == 'ok'
+
+
+def test_unexpected_error_on_trial_call_releases_trial(api):
+    open_breaker(api)
+    api.spotify.responses = [ValueError("bad response")]
+    with pytest.raises(ValueError):
+        api.call('playlist')
+    api.spotify.responses = ['ok']
+    assert api.call('playlist') == 'ok'
@@ -0,0 +1,61 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import utils.spotify_token_cache as token_cache
+from utils.spotify_token_cache import CachedClientCredentials
+
+
+@pytest.fixture
+def token_requests(monkeypatch):
+    """Replace the token endpoint with a counter; returns the list of issued tokens"""
+    issued = []
+    lock = threading.Lock()
+
+    def request_access_token(self, expires_in=3600):
+        time.sleep(0.05)  # Give other threads time to pile up on an empty cache
+        with lock:
+            issued.append(f"token-{len(issued) + 1}")
+            return {'access_token': issued[-1], 'token_type': 'Bearer', 'expires_in': expires_in}
+
+    monkeypatch.setattr(token_cache, '_tokens', {})
+    monkeypatch.setattr(CachedClientCredentials, '_request_access_token', request_access_token)
+    return issued
+
+
+def test_concurrent_clients_fetch_one_token(tmp_path, token_requests):
+    cache_path = str(tmp_path / "tokens.json")
+
+    def use_new_client(_):
+        # Like one SpotifyAPI per Streamlit rerun or worker thread
+        auth = CachedClientCredentials("client-id", "client-secret", cache_path=cache_path)
+        return auth.get_access_token(as_dict=False)
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        tokens = list(executor.map(use_new_client, range(32)))
+
+    assert token_requests == ["token-1"]
+    assert set(tokens) == {"token-1"}
+
+
+def test_token_file_is_reused_by_a_new_process(tmp_path, token_requests, monkeypatch):
+    cache_path = str(tmp_path / "tokens.json")
+    CachedClientCredentials("client-id", "client-secret", cache_path=cache_path).get_access_token(as_dict=False)
+
+    # A new process starts with empty memory but the same file
+    monkeypatch.setattr(token_cache, '_tokens', {})
+    auth = CachedClientCredentials("client-id", "client-secret", cache_path=cache_path)
+    assert auth.get_access_token(as_dict=False) == "token-1"
+    assert len(token_requests) == 1
+    assert (tmp_path / "tokens.json").stat().st_mode & 0o777 == 0o600
+
+
+def test_token_close_to_expiry_is_renewed(tmp_path, token_requests, monkeypatch):
+    auth = CachedClientCredentials("client-id", "client-secret", cache_path=None)
+    original = CachedClientCredentials._request_access_token
+    monkeypatch.setattr(CachedClientCredentials, '_request_access_token',
+                        lambda self: original(self, expires_in=token_cache.REFRESH_MARGIN - 10))
+    assert auth.get_access_token(as_dict=False) == "token-1"
+    assert auth.get_access_token(as_dict=False) == "token-2"
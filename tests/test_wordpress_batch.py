@@ -0,0 +1,116 @@
+import json
+
+import utils.fixed_wordpress_api as wordpress_module
+from utils.fixed_wordpress_api import WordPressAPI, split_by_size
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode()
+        self.text = self.content.decode()
+
+
+def test_split_by_size():
+    assert split_by_size([10, 10, 10], 25) == [[0, 1], [2]]
+    assert split_by_size([10, 10, 10], 30) == [[0, 1, 2]]
+    # An oversized item is sent on its own rather than dropped
+    assert split_by_size([5, 40, 5], 25) == [[0], [1], [2]]
+    assert split_by_size([], 25) == []
+
+
+def test_send_batch_splits_large_bodies(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    bodies = []
+
+    def fake_post(endpoint, headers=None, data=None, timeout=None):
+        body = json.loads(data)
+        bodies.append(len(data))
+        return FakeResponse(207, {'responses': [
+            {'status': 200, 'body': {'id': int(request['path'].rsplit('/', 1)[1])}} for request in body['requests']
+        ]})
+
+    monkeypatch.setattr(wordpress_module.requests, 'post', fake_post)
+    monkeypatch.setattr(wordpress_module, 'MAX_BATCH_BYTES', 50_000)
+    api = WordPressAPI("https://example.com", "user", "secret")
+
+    # Each sub-request carries ~20 KB of Elementor data, so only two fit per HTTP request
+    elementor = json.dumps([{'elType': 'widget', 'settings': {'editor': 'x' * 20_000}}])
+    sub_requests = [
+        {'method': 'POST', 'path': f'/wp/v2/posts/{post_id}', 'body': {'meta': {'_elementor_data': elementor}}}
+        for post_id in range(1, 6)
+    ]
+
+    responses, error = api._send_batch(sub_requests)
+
+    assert error is None
+    assert [item['body']['id'] for item in responses] == [1, 2, 3, 4, 5]
+    assert len(bodies) == 3
+    assert all(size <= 50_000 + 100 for size in bodies)
+
+
+def test_update_batch_keeps_results_written_before_a_failure(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    calls = []
+
+    def fake_post(endpoint, headers=None, data=None, timeout=None):
+        calls.append(data)
+        if len(calls) == 2:
+            return FakeResponse(502, {'message': 'Bad gateway'})
+        body = json.loads(data)
+        return FakeResponse(207, {'responses': [
+            {'status': 200, 'body': {'id': int(request['path'].rsplit('/', 1)[1]), 'modified': '2026-10-18T12:00:00'}}
+            for request in body['requests']
+        ]})
+
+    monkeypatch.setattr(wordpress_module.requests, 'post', fake_post)
+    monkeypatch.setattr(wordpress_module, 'MAX_BATCH_BYTES', 50_000)
+    api = WordPressAPI("https://example.com", "user", "secret")
+
+    updates = [{'post_id': post_id, 'title': f'Post {post_id}', 'content': 'x' * 20_000} for post_id in range(1, 7)]
+    # Post 3 was written with this content before, so it is skipped without being sent
+    api.hash_store.set(3, api._update_hash(updates[2]), '2026-10-01T00:00:00')
+    monkeypatch.setattr(api, '_get_posts_for_edit', lambda post_ids: {
+        post_id: {'id': post_id, 'modified': '2026-10-01T00:00:00'} for post_id in post_ids
+    })
+
+    results = api.update_posts_batch(updates, preserve_elementor=False)
+
+    # Posts 1 and 2 went out in the first request, 4 and 5 in the failed second one, 6 never left
+    assert len(calls) == 2
+    assert [result['success'] for result in results] == [True, True, True, False, False, False]
+    assert results[2]['skipped']
+    assert [result['post_id'] for result in results] == [1, 2, 3, 4, 5, 6]
+    assert '502' in results[3]['error']
+    # The written posts are remembered, so a rerun skips them
+    assert api.hash_store.is_unchanged(1, api._update_hash(updates[0]), '2026-10-18T12:00:00')
+    assert not api.hash_store.is_unchanged(4, api._update_hash(updates[3]), '2026-10-18T12:00:00')
+
+
+def test_send_batch_reports_missing_endpoint(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(wordpress_module.requests, 'post',
+                        lambda *args, **kwargs: FakeResponse(404, {'code': 'rest_no_route'}))
+    api = WordPressAPI("https://example.com", "user", "secret")
+
+    assert api._send_batch([{'method': 'POST', 'path': '/wp/v2/posts/1', 'body': {}}]) is None
+
+
+def test_error_responses_are_logged_without_the_body(tmp_path, monkeypatch, caplog):
+    monkeypatch.chdir(tmp_path)
+    error = {'code': 'rest_invalid_param', 'message': 'Invalid parameter(s): meta',
+             'data': {'status': 400, 'params': {'meta': 'x' * 50_000}}}
+    response = FakeResponse(400, error)
+    response.headers = {}
+    response.json = lambda: error
+    monkeypatch.setattr(wordpress_module.requests, 'put', lambda *args, **kwargs: response)
+    api = WordPressAPI("https://example.com", "user", "secret")
+
+    with caplog.at_level('INFO', logger=wordpress_module.logger.name):
+        result = api.update_post(42, "Title", "<p>Body</p>", preserve_elementor=False, skip_unchanged=False)
+
+    assert result['success'] is False
+    errors = [record.getMessage() for record in caplog.records if record.levelname == 'ERROR']
+    assert any('Failed to update post 42: HTTP 400' in message for message in errors)
+    assert any("code='rest_invalid_param'" in message for message in errors)
+    assert all(len(message) < 500 for message in errors)
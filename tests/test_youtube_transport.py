@@ -0,0 +1,103 @@
+import json
+import re
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import httplib2
+import pytest
+
+import utils.fixed_youtube_api as youtube
+
+
+class OwnedHttp:
+    """httplib2.Http stand-in that records use from a foreign thread or overlapping requests"""
+
+    instances = []
+    misuse = []
+    lock = threading.Lock()
+
+    def __init__(self, timeout=None):
+        self.owner = threading.get_ident()
+        self.busy = False
+        with self.lock:
+            self.instances.append(self)
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=5, connection_type=None):
+        if self.busy or threading.get_ident() != self.owner:
+            self.misuse.append(uri)
+        self.busy = True
+        try:
+            time.sleep(0.001)
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(uri).query)['q'][0]
+            video_id = re.sub(r'\W', '', query)[:11]
+            content = json.dumps({'items': [{'id': {'videoId': video_id}}]}).encode()
+            return httplib2.Response({'status': 200, 'content-type': 'application/json'}), content
+        finally:
+            self.busy = False
+
+
+@pytest.fixture
+def fake_transport(monkeypatch):
+    OwnedHttp.instances = []
+    OwnedHttp.misuse = []
+    monkeypatch.setattr(youtube, '_new_http', OwnedHttp)
+    monkeypatch.setattr(youtube, '_transport', threading.local())
+    monkeypatch.setattr(youtube, '_service_cache', {})
+    return OwnedHttp
+
+
+def test_each_thread_gets_its_own_http(monkeypatch):
+    monkeypatch.setattr(youtube, '_transport', threading.local())
+    barrier = threading.Barrier(8)
+
+    def transports(_):
+        barrier.wait()
+        return youtube.get_http(), youtube.get_http()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(transports, range(8)))
+
+    assert all(first is second for first, second in results)
+    assert all(isinstance(first, httplib2.Http) for first, _ in results)
+    assert len({id(first) for first, _ in results}) == 8
+
+
+def test_concurrent_lookups_never_share_a_transport(fake_transport):
+    api = youtube.YouTubeAPI('test-key')
+    api.min_request_interval = 0
+
+    def lookup(i):
+        query = f"Song {i % 40} - Artist"
+        return query, api.get_video_link(query)
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(lookup, range(400)))
+
+    assert fake_transport.misuse == []
+    # One transport per worker thread (plus the service's default), not one per request
+    assert len(fake_transport.instances) <= 17
+    for query, link in results:
+        expected = re.sub(r'\W', '', youtube.YouTubeAPI._refine_query(query))[:11]
+        assert link == f"https://www.youtube.com/watch?v={expected}"
+
+
+def test_rate_limit_is_serialized_across_threads(fake_transport):
+    api = youtube.YouTubeAPI('test-key')
+    api.min_request_interval = 0.02
+    barrier = threading.Barrier(10)
+    released = []
+
+    def acquire(_):
+        barrier.wait()
+        api._rate_limit()
+        released.append(time.monotonic())
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        list(executor.map(acquire, range(10)))
+
+    released.sort()
+    gaps = [later - earlier for earlier, later in zip(released, released[1:])]
+    # Without the lock, threads read the same last_request_time and go at once
+    assert min(gaps) >= 0.015
@@ -0,0 +1,240 @@
+"""
+Incremental sync of the playlist catalog from the DJ's Spotify account.
+
+The account's playlists are listed once (50 per request) and each playlist's
+snapshot_id is compared with the snapshot last merged into the catalog, which
+the track store remembers. Tracks are only fetched for new or changed
+playlists. Their added and removed songs are merged into the catalog
+DataFrame, keeping the YouTube links of songs that are still there, and the
+result is saved through the CSV handler.
+"""
+import logging
+import os
+
+import pandas as pd
+
+from utils.parsing import NUMERIC_PREFIX_PATTERN, PLAYLIST_SUFFIX, SPOTIFY_PLAYLIST_ID_PATTERN, normalize_playlist_name
+from utils.playlist_processing import CATALOG_LOCK, DEFAULT_SPOTIFY_USER_ID, save_processed_csv
+from utils.progress import ProgressReporter
+from utils.song_identity import SongIndex, song_key
+
+logger = logging.getLogger(__name__)
+
+CATALOG_COLUMNS = ['Playlist', 'Song', 'Artist', 'Song_Artist', 'YouTube_Link', 'Spotify_Link']
+
+
+class CatalogSync:
+    """
+    Brings the catalog DataFrame up to date with the playlists on Spotify
+    """
+
+    def __init__(self, spotify_api, user_id=None, name_filter=PLAYLIST_SUFFIX):
+        """
+        :param spotify_api: SpotifyAPI instance (its track store keeps the sync state)
+        :param user_id: Spotify account to sync (default: SPOTIFY_USER_ID env var)
+        :param name_filter: Only sync playlists whose name contains this text (None for all)
+        """
+        self.spotify_api = spotify_api
+        self.track_store = spotify_api.track_store
+        self.user_id = user_id or os.getenv("SPOTIFY_USER_ID", DEFAULT_SPOTIFY_USER_ID)
+        self.name_filter = name_filter
+
+    def list_account_playlists(self):
+        """
+        Page through the playlists owned by the account
+        :return: List of dictionaries with id, name, snapshot_id and url
+        """
+        playlists = []
+        page = self.spotify_api.call('user_playlists', self.user_id, limit=50)
+        while page:
+            for item in page.get('items') or []:
+                if not item or not item.get('id'):
+                    continue
+                # Skip playlists the DJ only follows
+                if (item.get('owner') or {}).get('id') not in (None, self.user_id):
+                    continue
+                name = (item.get('name') or '').strip()
+                if self.name_filter and self.name_filter.lower() not in name.lower():
+                    continue
+                playlists.append({
+                    'id': item['id'],
+                    'name': name,
+                    'snapshot_id': item.get('snapshot_id'),
+                    'url': (item.get('external_urls') or {}).get('spotify', '')
+                })
+            page = self.spotify_api.call('next', page) if page.get('next') else None
+        return playlists
+
+    @staticmethod
+    def _match_catalog(df, playlists):
+        """
+        Find the catalog playlist for each Spotify playlist, by the playlist ID in
+        its Spotify link or else by name without the numeric prefix
+        :return: Dictionary of Spotify playlist ID -> catalog playlist name
+        """
+        by_id = {}
+        by_name = {}
+        for name, link in df.groupby('Playlist', sort=False)['Spotify_Link'].first().items():
+            match = SPOTIFY_PLAYLIST_ID_PATTERN.search(str(link or ''))
+            if match:
+                by_id.setdefault(match.group(1), name)
+            # The catalog can hold the same name twice under different numbers
+            by_name.setdefault(normalize_playlist_name(name).casefold(), []).append(name)
+
+        matches = {}
+        used = set()
+        for playlist in playlists:
+            candidates = [by_id[playlist['id']]] if playlist['id'] in by_id else []
+            candidates += by_name.get(playlist['name'].casefold(), [])
+            name = next((candidate for candidate in candidates if candidate not in used), None)
+            if name:
+                matches[playlist['id']] = name
+                used.add(name)
+        return matches
+
+    @staticmethod
+    def _merge_playlist(catalog_name, spotify_url, existing, tracks):
+        """
+        Build a playlist's catalog rows from its Spotify tracks
+        Songs already in the catalog keep their row (and YouTube link).
+        :return: (rows, added, removed)
+        """
+        existing_rows = {}
+        for row in existing.to_dict('records'):
+            existing_rows.setdefault(song_key(row.get('Song'), row.get('Artist')), row)
+
+        rows = []
+        seen = set()
+        added = 0
+        for track in tracks:
+            song = str(track.get('name', '')).strip()
+            artist = ', '.join(a.get('name', '') for a in track.get('artists', []) if a.get('name'))
+            key = song_key(song, artist)
+            if not song or key in seen:
+                continue
+            seen.add(key)
+            row = existing_rows.get(key)
+            if row is None:
+                added += 1
+                row = {
+                    'Song': song,
+                    'Artist': artist,
+                    'Song_Artist': f"{song}-{artist}",
+                    'YouTube_Link': ""
+                }
+            rows.append(dict(row, Playlist=catalog_name, Spotify_Link=spotify_url or row.get('Spotify_Link', "")))
+
+        removed = sum(1 for key in existing_rows if key not in seen)
+        return rows, added, removed
+
+    def sync(self, df, reporter=None, full=False):
+        """
+        Merge new and changed Spotify playlists into a copy of the catalog
+        :param df: Catalog DataFrame (not modified)
+        :param reporter: ProgressReporter (optional)
+        :param full: Ignore the sync state and re-check every playlist
+        :return: (new DataFrame, summary dictionary); summary['snapshots'] must be
+                 passed to mark_synced() once the new catalog has been saved
+        """
+        reporter = reporter or ProgressReporter()
+        with reporter.stage('sync', "Listing Spotify playlists..."):
+            playlists = self.list_account_playlists()
+
+        synced = {} if full else self.track_store.get_synced_snapshots()
+        todo = [p for p in playlists if not p['snapshot_id'] or synced.get(p['id']) != p['snapshot_id']]
+        matches = self._match_catalog(df, playlists)
+
+        numbers = [int(match.group(0)) for match in
+                   (NUMERIC_PREFIX_PATTERN.match(str(name)) for name in df['Playlist'].unique()) if match]
+        next_number = max(numbers, default=0) + 1
+
+        summary = {
+            'checked': len(playlists),
+            'unchanged': len(playlists) - len(todo),
+            'changed': [],
+            'new': [],
+            'added_songs': 0,
+            'removed_songs': 0,
+            'reused_links': 0,
+            'snapshots': {}
+        }
+        replaced = {}
+        with reporter.stage('sync_tracks', f"Fetching tracks for {len(todo)} new or changed playlists...",
+                            total=len(todo)):
+            for done, playlist in enumerate(todo, start=1):
+                tracks = self.spotify_api.get_playlist_tracks(playlist['id'], snapshot_id=playlist['snapshot_id'])
+                if not tracks:
+                    # Never wipe a playlist because a fetch failed
+                    reporter.warning(f"⚠️ No tracks fetched for '{playlist['name']}', skipping")
+                    reporter.advance(done, len(todo))
+                    continue
+
+                catalog_name = matches.get(playlist['id'])
+                existing = df[df['Playlist'] == catalog_name] if catalog_name else df.iloc[0:0]
+                if catalog_name is None:
+                    catalog_name = f"{next_number:03d} {playlist['name']}"
+                    next_number += 1
+
+                rows, added, removed = self._merge_playlist(catalog_name, playlist['url'], existing, tracks)
+                if playlist['snapshot_id']:
+                    summary['snapshots'][playlist['id']] = playlist['snapshot_id']
+                old_rows = existing[CATALOG_COLUMNS].fillna("").to_dict('records')
+                new_rows = [{column: row.get(column, "") for column in CATALOG_COLUMNS} for row in rows]
+                if new_rows != old_rows:
+                    replaced[catalog_name] = rows
+                    summary['new' if existing.empty else 'changed'].append(catalog_name)
+                    summary['added_songs'] += added
+                    summary['removed_songs'] += removed
+                    if added or removed:
+                        reporter.info(f"{catalog_name}: +{added} / -{removed} songs")
+                reporter.advance(done, len(todo))
+
+        if not replaced:
+            return df, summary
+
+        # Rebuild in catalog order, with new playlists at the end
+        blocks = []
+        for name in df['Playlist'].unique():
+            if name in replaced:
+                blocks.append(pd.DataFrame(replaced.pop(name)))
+            else:
+                blocks.append(df[df['Playlist'] == name])
+        blocks.extend(pd.DataFrame(rows) for rows in replaced.values())
+        new_df = pd.concat(blocks, ignore_index=True)
+        new_df = new_df.reindex(columns=list(df.columns) or CATALOG_COLUMNS).fillna("")
+        # New songs that are already linked in another playlist need no YouTube search
+        summary['reused_links'] = SongIndex(new_df).propagate_youtube_links()
+        return new_df, summary
+
+    def mark_synced(self, summary):
+        """
+        Remember the synced snapshots so unchanged playlists are skipped next time
+        :param summary: Summary returned by sync()
+        """
+        if summary.get('snapshots'):
+            self.track_store.mark_synced(summary['snapshots'])
+
+
+def sync_catalog(df, spotify_api, reporter=None, dry_run=False, full=False, user_id=None):
+    """
+    Sync the catalog from Spotify, save it and record the sync state
+    :param df: Catalog DataFrame
+    :param spotify_api: SpotifyAPI instance
+    :param reporter: ProgressReporter (optional)
+    :param dry_run: Only report the changes; save nothing
+    :param full: Re-check every playlist, not just new or changed ones
+    :param user_id: Spotify account to sync (default: SPOTIFY_USER_ID env var)
+    :return: (DataFrame, summary); summary['saved_file'] is the new CSV or None
+    """
+    syncer = CatalogSync(spotify_api, user_id=user_id)
+    new_df, summary = syncer.sync(df, reporter=reporter, full=full)
+    summary['saved_file'] = None
+    if dry_run:
+        return new_df, summary
+
+    if new_df is not df:
+        with CATALOG_LOCK:
+            summary['saved_file'] = save_processed_csv(new_df, "synced")
+        logger.info(f"Saved synced catalog to {summary['saved_file']}")
+    syncer.mark_synced(summary)
+    return new_df, summary
@@ -0,0 +1,155 @@
+"""
+Content hashes for WordPress posts, used to skip updates that would not change anything
+and to show a compact diff in dry-run mode.
+"""
+import difflib
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HASH_STORE_PATH = os.path.join(".cache", "content_hashes.json")
+
+# Whitespace runs, and whitespace between tags, don't change how a post renders
+WHITESPACE_PATTERN = re.compile(r'\s+')
+BETWEEN_TAGS_PATTERN = re.compile(r'>\s+<')
+
+# Split HTML into one line per block-level tag for diffing
+BLOCK_BREAK_PATTERN = re.compile(r'(?=<(?:h[1-6]|p|li|ul|ol|div|iframe|blockquote)\b)', re.IGNORECASE)
+
+
+def normalize_content(content):
+    """
+    Normalize post HTML so that formatting-only differences hash the same
+    :param content: Post HTML
+    :return: Normalized HTML
+    """
+    if not content:
+        return ""
+    content = BETWEEN_TAGS_PATTERN.sub('><', str(content))
+    return WHITESPACE_PATTERN.sub(' ', content).strip()
+
+
+def content_hash(title, content, **fields):
+    """
+    Hash everything a write sends: the title, the normalized content and the
+    other post fields, so a call that only changes e.g. the status is not skipped
+    :param title: Post title
+    :param content: Post HTML
+    :param fields: Other fields sent with the post (status, categories, tags,
+                   featured_media); None means the field is not sent
+    :return: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(WHITESPACE_PATTERN.sub(' ', title or '').strip().encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalize_content(content).encode('utf-8'))
+    extra = {}
+    for name, value in fields.items():
+        if value is None:
+            continue
+        # Term lists are order-independent
+        extra[name] = sorted(str(item) for item in value) if isinstance(value, (list, tuple, set)) else str(value)
+    if extra:
+        digest.update(b'\0')
+        digest.update(json.dumps(extra, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def compact_diff(old_content, new_content, context=1, max_lines=80):
+    """
+    Build a short unified diff of two versions of a post
+    :param old_content: Current post HTML
+    :param new_content: Proposed post HTML
+    :param context: Unchanged lines to show around each change
+    :param max_lines: Maximum number of diff lines to return
+    :return: Diff text, or "" if the normalized content is identical
+    """
+    old_lines = BLOCK_BREAK_PATTERN.split(normalize_content(old_content))
+    new_lines = BLOCK_BREAK_PATTERN.split(normalize_content(new_content))
+    diff = list(difflib.unified_diff(
+        [line for line in old_lines if line],
+        [line for line in new_lines if line],
+        fromfile='current', tofile='revamped', n=context, lineterm=''
+    ))
+    if len(diff) > max_lines:
+        hidden = len(diff) - max_lines
+        diff = diff[:max_lines] + [f"... {hidden} more diff lines"]
+    return "\n".join(diff)
+
+
+class ContentHashStore:
+    """
+    JSON file of site + post_id -> {'hash', 'modified'} for posts this app has written
+    """
+
+    def __init__(self, path=DEFAULT_HASH_STORE_PATH, site=None):
+        """
+        :param path: Path of the JSON file (created on first write)
+        :param site: Base URL of the WordPress site, so several sites can share one file
+        """
+        self.path = path
+        self.site = site.rstrip('/') if site else None
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except FileNotFoundError:
+                self._entries = {}
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning(f"Could not read content hash store {self.path}: {str(e)}")
+                self._entries = {}
+        return self._entries
+
+    def _key(self, post_id):
+        return f"{self.site}#{post_id}" if self.site else str(post_id)
+
+    def get(self, post_id):
+        """
+        Return the stored entry for a post
+        :param post_id: WordPress post ID
+        :return: Dictionary with 'hash' and 'modified', or None
+        """
+        with self._lock:
+            return self._load().get(self._key(post_id))
+
+    def set(self, post_id, hash_value, modified=None):
+        """
+        Record the hash of the content just written to a post
+        :param post_id: WordPress post ID
+        :param hash_value: Hash from content_hash()
+        :param modified: The post's 'modified' timestamp after the write
+        """
+        with self._lock:
+            entries = self._load()
+            entries[self._key(post_id)] = {'hash': hash_value, 'modified': modified}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Write to a temp file first so a crash never leaves a truncated store
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def is_unchanged(self, post_id, hash_value, live_modified):
+        """
+        Check whether writing content with this hash would be a no-op
+        The stored hash only counts if nobody has edited the post since we wrote it
+        :param post_id: WordPress post ID
+        :param hash_value: Hash of the content about to be written
+        :param live_modified: The post's current 'modified' timestamp on WordPress
+        :return: True if the update can be skipped
+        """
+        entry = self.get(post_id)
+        if not entry or entry.get('hash') != hash_value:
+            return False
+        return bool(live_modified) and entry.get('modified') == live_modified
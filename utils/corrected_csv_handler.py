@@ -1,7 +1,7 @@
 import pandas as pd
 import numpy as np
 import logging
-import re
+from utils.parsing import PLAYLIST_HEADER_PATTERN
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -67,9 +67,6 @@ def load_csv(file):
         current_playlist = None
         spotify_link = None
         
-        # Regular expression to identify playlist headers (start with 3 digits)
-        playlist_regex = re.compile(r'^\d{3}\s+(.+)$')
-        
         # Process each row in the CSV
         for _, row in df_raw.iterrows():
             row_values = row.tolist()
@@ -80,7 +77,7 @@ def load_csv(file):
                 
             # Check if this is a playlist header row (matches the pattern in column A)
             if pd.notna(row_values[0]) and isinstance(row_values[0], str):
-                match = playlist_regex.match(row_values[0])
+                match = PLAYLIST_HEADER_PATTERN.match(row_values[0])
                 if match:
                     # This is a playlist header row
                     current_playlist = row_values[0]
@@ -1,15 +1,29 @@
 import json
 import logging
 import re
-from typing import Dict, List, Any, Optional
+from utils import json_codec
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 
 logger = logging.getLogger(__name__)
 
+# A widget's type, e.g. "widgetType":"text-editor". Quotes inside JSON strings are
+# escaped, so this only ever matches real keys.
+WIDGET_TYPE_PATTERN = re.compile(r'"widgetType"\s*:\s*"([\w-]+)"')
+
 class ElementorHandler:
     """
     Handles parsing and updating Elementor data structures
     """
     
+    # Widgets that carry editable text
+    TEXT_WIDGET_TYPES = ['text-editor', 'heading', 'text', 'theme-post-content']
+    
+    # Widgets that hold the main post body
+    MAIN_CONTENT_WIDGETS = ('text-editor', 'theme-post-content')
+    
+    # Settings field holding the text of each widget type
+    WIDGET_CONTENT_FIELDS = {'text-editor': 'editor', 'heading': 'title', 'text': 'text'}
+    
     @staticmethod
     def parse_elementor_data(elementor_json_string: str) -> List[Dict[str, Any]]:
         """
@@ -23,7 +37,7 @@ class ElementorHandler:
                 return []
             
             # Elementor stores data as a JSON string
-            data = json.loads(elementor_json_string)
+            data = json_codec.loads(elementor_json_string)
             return data
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse Elementor data: {str(e)}")
@@ -39,37 +53,109 @@ class ElementorHandler:
         """
         try:
             # Elementor expects a JSON string with no extra spaces
-            return json.dumps(elementor_data, separators=(',', ':'))
+            return json_codec.dumps(elementor_data)
         except Exception as e:
             logger.error(f"Failed to stringify Elementor data: {str(e)}")
             return "[]"
     
+    @staticmethod
+    def iter_widgets(elements: List[Dict[str, Any]], widget_types: Optional[List[str]] = None
+                     ) -> Iterator[Tuple[Tuple[int, ...], Dict[str, Any]]]:
+        """
+        Walk the Elementor tree in document order without recursion
+        
+        Yields (path, element) pairs, where path is the tuple of indexes into the
+        nested 'elements' lists. Callers can stop iterating as soon as they have
+        what they need, so the rest of the tree is never visited.
+        
+        :param elements: List of Elementor elements
+        :param widget_types: Widget types to yield (default: TEXT_WIDGET_TYPES); pass [] to yield every element
+        :return: Iterator of (path, element) pairs
+        """
+        if widget_types is None:
+            widget_types = ElementorHandler.TEXT_WIDGET_TYPES
+        
+        # Stack of (parent path, child list, next index) so deep pages don't hit the recursion limit
+        stack = [((), elements or [], 0)]
+        while stack:
+            parent_path, children, index = stack.pop()
+            if index >= len(children):
+                continue
+            stack.append((parent_path, children, index + 1))
+            
+            element = children[index]
+            if not isinstance(element, dict):
+                continue
+            path = parent_path + (index,)
+            if not widget_types or element.get('widgetType') in widget_types:
+                yield path, element
+            
+            child_elements = element.get('elements')
+            if child_elements:
+                stack.append((path, child_elements, 0))
+    
     @staticmethod
     def find_text_widgets(elements: List[Dict[str, Any]], widget_types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
-        Recursively find all text-based widgets in Elementor structure
+        Find all text-based widgets in Elementor structure
         
         :param elements: List of Elementor elements
         :param widget_types: List of widget types to find (default: text-editor, heading, text)
         :return: List of text widget references
         """
-        if widget_types is None:
-            widget_types = ['text-editor', 'heading', 'text', 'theme-post-content']
+        return [widget for _, widget in ElementorHandler.iter_widgets(elements, widget_types)]
+    
+    @staticmethod
+    def find_main_widget(elements: List[Dict[str, Any]]) -> Tuple[Optional[Tuple[int, ...]], Optional[Dict[str, Any]]]:
+        """
+        Find the widget holding the main post content in a single pass
         
-        text_widgets = []
+        Stops at the first text-editor or theme-post-content widget and falls
+        back to the first text widget of any type.
         
-        for element in elements:
-            # Check if this element is a text widget
-            if element.get('widgetType') in widget_types:
-                text_widgets.append(element)
-            
-            # Recursively check child elements
-            if 'elements' in element:
-                text_widgets.extend(
-                    ElementorHandler.find_text_widgets(element['elements'], widget_types)
-                )
+        :param elements: List of Elementor elements
+        :return: (path, widget) tuple, or (None, None) if there are no text widgets
+        """
+        fallback = (None, None)
+        for path, widget in ElementorHandler.iter_widgets(elements):
+            if widget.get('widgetType') in ElementorHandler.MAIN_CONTENT_WIDGETS:
+                return path, widget
+            if fallback[1] is None:
+                fallback = (path, widget)
+        return fallback
+    
+    @staticmethod
+    def build_id_index(elements: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Map every element id to its node for targeted updates
         
-        return text_widgets
+        :param elements: List of Elementor elements
+        :return: Dictionary of element id -> element
+        """
+        return {
+            element['id']: element
+            for _, element in ElementorHandler.iter_widgets(elements, widget_types=[])
+            if element.get('id')
+        }
+    
+    @staticmethod
+    def get_element_by_path(elements: List[Dict[str, Any]], path: Tuple[int, ...]) -> Optional[Dict[str, Any]]:
+        """
+        Look up an element by the path yielded from iter_widgets
+        
+        :param elements: List of Elementor elements
+        :param path: Tuple of indexes into the nested 'elements' lists
+        :return: The element, or None if the path no longer exists
+        """
+        element = None
+        children = elements
+        try:
+            for index in path:
+                element = children[index]
+                children = element.get('elements', [])
+        except (IndexError, KeyError, TypeError, AttributeError):
+            return None
+        return element
     
     @staticmethod
     def update_widget_content(widget: Dict[str, Any], new_content: str, preserve_styling: bool = True) -> None:
@@ -115,16 +201,25 @@ class ElementorHandler:
     
     @staticmethod
     def update_elementor_content(elementor_json_string: str, new_content: str, 
-                               update_all_text: bool = False) -> str:
+                               update_all_text: bool = False, widget_id: Optional[str] = None,
+                               patch: bool = True) -> str:
         """
         Update Elementor content with new text
         
         :param elementor_json_string: The current Elementor data as JSON string
         :param new_content: The new content to insert
         :param update_all_text: If True, update all text widgets; if False, only update main content
+        :param widget_id: Optional Elementor element id of the widget to update
+        :param patch: Splice the new text into the original JSON instead of re-serializing the tree
         :return: Updated Elementor data as JSON string
         """
         try:
+            if patch and not update_all_text:
+                patched = ElementorHandler.patch_widget(elementor_json_string, new_content, widget_id)
+                if patched is not None:
+                    return patched
+                logger.info("Could not patch the widget in place; re-serializing")
+            
             # Parse the Elementor data
             elementor_data = ElementorHandler.parse_elementor_data(elementor_json_string)
             
@@ -132,35 +227,41 @@ class ElementorHandler:
                 logger.warning("No Elementor data to update")
                 return elementor_json_string
             
-            # Find all text widgets
-            text_widgets = ElementorHandler.find_text_widgets(elementor_data)
-            
-            if not text_widgets:
-                logger.warning("No text widgets found in Elementor data")
-                return elementor_json_string
-            
-            logger.info(f"Found {len(text_widgets)} text widgets")
+            if widget_id:
+                # Targeted update - stop walking at the matching element
+                target = next(
+                    (element for _, element in ElementorHandler.iter_widgets(elementor_data, widget_types=[])
+                     if element.get('id') == widget_id),
+                    None
+                )
+                if target is None:
+                    logger.warning(f"Elementor widget {widget_id} not found")
+                    return elementor_json_string
+                ElementorHandler.update_widget_content(target, new_content)
+                logger.info(f"Updated widget {widget_id}: {target.get('widgetType')}")
             
-            if update_all_text:
+            elif update_all_text:
                 # Update all text widgets with the same content
-                for widget in text_widgets:
+                updated = 0
+                for _, widget in ElementorHandler.iter_widgets(elementor_data):
                     ElementorHandler.update_widget_content(widget, new_content)
+                    updated += 1
+                
+                if not updated:
+                    logger.warning("No text widgets found in Elementor data")
+                    return elementor_json_string
+                logger.info(f"Updated {updated} text widgets")
+            
             else:
                 # Update only the main content widget (usually the first text-editor or theme-post-content)
-                main_widget = None
-                for widget in text_widgets:
-                    if widget.get('widgetType') in ['text-editor', 'theme-post-content']:
-                        main_widget = widget
-                        break
+                path, main_widget = ElementorHandler.find_main_widget(elementor_data)
                 
-                if main_widget:
-                    ElementorHandler.update_widget_content(main_widget, new_content)
-                    logger.info(f"Updated main content widget: {main_widget.get('widgetType')}")
-                else:
-                    # Fallback: update the first text widget
-                    if text_widgets:
-                        ElementorHandler.update_widget_content(text_widgets[0], new_content)
-                        logger.info(f"Updated first text widget: {text_widgets[0].get('widgetType')}")
+                if main_widget is None:
+                    logger.warning("No text widgets found in Elementor data")
+                    return elementor_json_string
+                
+                ElementorHandler.update_widget_content(main_widget, new_content)
+                logger.info(f"Updated main content widget: {main_widget.get('widgetType')} at {list(path)}")
             
             # Convert back to JSON string
             return ElementorHandler.stringify_elementor_data(elementor_data)
@@ -169,6 +270,129 @@ class ElementorHandler:
             logger.error(f"Failed to update Elementor content: {str(e)}")
             return elementor_json_string
     
+    @staticmethod
+    def locate_widget(elementor_json_string: str, widget_id: Optional[str] = None) -> Optional[Tuple[int, str]]:
+        """
+        Find a widget in the Elementor JSON text without parsing the document
+        
+        With a widget_id, finds the element with that "id". Otherwise picks the same
+        widget as find_main_widget: the first text-editor or theme-post-content
+        widget, or else the first text widget of any type. Elementor writes "id"
+        first and "widgetType" last in every element, and a candidate is only
+        accepted if both belong to the same object.
+        
+        :param elementor_json_string: The current Elementor data as JSON string
+        :param widget_id: Optional Elementor element id of the widget
+        :return: (offset of the widget's "id" key, widget type), or None if it can't be located safely
+        """
+        text = elementor_json_string
+        if widget_id:
+            id_pattern = re.compile(r'"id"\s*:\s*' + re.escape(json_codec.encode_string(widget_id)))
+            for id_match in id_pattern.finditer(text):
+                span = json_codec.find_string_value(text, 'widgetType', id_match.start(), level=0)
+                if span is not None:
+                    return id_match.start(), json.loads(text[span[0]:span[1]])
+            return None
+        
+        chosen = None
+        for type_match in WIDGET_TYPE_PATTERN.finditer(text):
+            widget_type = type_match.group(1)
+            if widget_type in ElementorHandler.MAIN_CONTENT_WIDGETS:
+                chosen = type_match
+                break
+            if chosen is None and widget_type in ElementorHandler.TEXT_WIDGET_TYPES:
+                chosen = type_match
+        if chosen is None:
+            return None
+        
+        # Walk back to the "id" of the object that holds this widgetType, skipping
+        # any "id" keys inside nested settings objects
+        value_start = chosen.start(1) - 1
+        position = chosen.start()
+        while True:
+            position = text.rfind('"id"', 0, position)
+            if position == -1:
+                return None
+            span = json_codec.find_string_value(text, 'widgetType', position, level=0)
+            if span is None:
+                continue
+            if span[0] != value_start:
+                return None
+            return position, chosen.group(1)
+    
+    @staticmethod
+    def patch_widget(elementor_json_string: str, new_content: str, widget_id: Optional[str] = None
+                     ) -> Optional[str]:
+        """
+        Replace the content of one widget directly in the Elementor JSON
+        
+        The widget is located by scanning the text (see locate_widget), so the
+        document is never parsed or re-serialized. The field's string literal is
+        decoded, updated like update_widget_content would, and spliced back in.
+        The rest of the document is left byte-for-byte untouched, including
+        PHP-style "\\/" and \\uXXXX escapes.
+        
+        :param elementor_json_string: The current Elementor data as JSON string
+        :param new_content: The new content to insert
+        :param widget_id: Optional Elementor element id of the widget (default: the main content widget)
+        :return: Patched JSON string, or None if the caller should parse and re-serialize instead
+        """
+        located = ElementorHandler.locate_widget(elementor_json_string, widget_id)
+        if located is None:
+            return None
+        start, widget_type = located
+        
+        field = ElementorHandler.WIDGET_CONTENT_FIELDS.get(widget_type)
+        if field is None:
+            # Nothing stored in the widget changes (e.g. theme-post-content)
+            logger.info(f"{widget_type} widget found - no stored content to update")
+            return elementor_json_string
+        
+        span = json_codec.find_string_value(elementor_json_string, field, start)
+        if span is None:
+            return None
+        value_start, value_end = span
+        try:
+            old_value = json.loads(elementor_json_string[value_start:value_end])
+        except ValueError:
+            return None
+        
+        widget = {'widgetType': widget_type, 'settings': {field: old_value}}
+        ElementorHandler.update_widget_content(widget, new_content)
+        logger.info(f"Patched '{field}' of {widget_type} widget in place")
+        return (elementor_json_string[:value_start]
+                + json_codec.encode_string(widget['settings'][field])
+                + elementor_json_string[value_end:])
+    
+    @staticmethod
+    def update_widgets_by_id(elementor_json_string: str, updates: Dict[str, str]) -> str:
+        """
+        Update several widgets by element id, parsing and indexing the tree once
+        
+        :param elementor_json_string: The current Elementor data as JSON string
+        :param updates: Dictionary of element id -> new content
+        :return: Updated Elementor data as JSON string
+        """
+        try:
+            elementor_data = ElementorHandler.parse_elementor_data(elementor_json_string)
+            if not elementor_data:
+                logger.warning("No Elementor data to update")
+                return elementor_json_string
+            
+            index = ElementorHandler.build_id_index(elementor_data)
+            for widget_id, new_content in updates.items():
+                widget = index.get(widget_id)
+                if widget is None:
+                    logger.warning(f"Elementor widget {widget_id} not found")
+                    continue
+                ElementorHandler.update_widget_content(widget, new_content)
+            
+            return ElementorHandler.stringify_elementor_data(elementor_data)
+            
+        except Exception as e:
+            logger.error(f"Failed to update Elementor widgets: {str(e)}")
+            return elementor_json_string
+    
     @staticmethod
     def create_simple_elementor_structure(content: str) -> str:
         """
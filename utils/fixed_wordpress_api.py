@@ -5,11 +5,58 @@ import logging
 import urllib.parse
 from datetime import datetime
 from .elementor_handler import ElementorHandler
+from . import json_codec
+from .content_hash import ContentHashStore, content_hash, compact_diff
+from .log_utils import LogSampler, log_payload, log_response, redact_headers
+from .taxonomy_cache import TaxonomyCache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Read requests repeat on every Streamlit rerun and for every post in a batch,
+# so their INFO lines are sampled
+read_log_sampler = LogSampler(every=20)
+
+# WordPress caps batch requests at 25 sub-requests by default
+BATCH_SIZE = 25
+
+# Each update sub-request carries the post's full _elementor_data, so batches are
+# also capped by body size to stay well under typical PHP post_max_size limits
+MAX_BATCH_BYTES = 2 * 1024 * 1024
+
+# Fields requested for post lists (search results, category browsing)
+LIST_FIELDS = ['id', 'title', 'date', 'modified', 'link', 'categories']
+
+# Fields requested when a single post is opened, previewed or updated
+DETAIL_FIELDS = LIST_FIELDS + ['content', 'excerpt', 'slug', 'tags', 'status', 'meta', 'featured_media']
+
+
+def split_by_size(sizes, max_bytes):
+    """
+    Group consecutive items so the sizes in each group add up to at most max_bytes
+    An item larger than max_bytes on its own still gets a group of its own
+    :param sizes: Size in bytes of each item
+    :param max_bytes: Size limit per group
+    :return: List of lists of item indexes
+    """
+    groups = []
+    current = []
+    current_size = 0
+    for i, size in enumerate(sizes):
+        if current and current_size + size > max_bytes:
+            groups.append(current)
+            current = []
+            current_size = 0
+        if size > max_bytes:
+            logger.warning(f"Batch sub-request {i} is {size} bytes, over the {max_bytes} byte batch limit")
+        current.append(i)
+        current_size += size
+    if current:
+        groups.append(current)
+    return groups
+
+
 class WordPressAPI:
     def __init__(self, api_url, username, password):
         """
@@ -22,9 +69,8 @@ class WordPressAPI:
             raise ValueError("WordPress API URL, username, and password are required")
         
         # Log the initialization (without credentials)
-        logger.info(f"Initializing WordPress API with URL: {api_url}")
-        logger.info(f"Username length: {len(username)}")
-        logger.info(f"Password available: {'Yes' if password else 'No'}")
+        logger.debug(f"Initializing WordPress API with URL: {api_url}")
+        logger.debug(f"Username length: {len(username)}")
         
         # Verify that the credentials look correct
         if len(username) < 1:
@@ -56,6 +102,12 @@ class WordPressAPI:
         # Set up authentication header
         self.auth_header = self._get_auth_header()
         
+        # Hashes of content we have written, used to skip no-op updates
+        self.hash_store = ContentHashStore(site=self.base_url)
+        
+        # Categories and tags, persisted to disk and revalidated with ETags
+        self.taxonomies = TaxonomyCache(self)
+        
         # Standard headers that should be included in all requests
         self.standard_headers = {
             'User-Agent': 'WordPress API Client/1.0',
@@ -64,8 +116,8 @@ class WordPressAPI:
         }
         
         # Log the endpoint and headers
-        logger.info(f"WordPress API endpoint: {self.api_url}")
-        logger.info(f"Using standard headers: {json.dumps(self.standard_headers)}")
+        logger.debug(f"WordPress API endpoint: {self.api_url}")
+        logger.debug(f"Using standard headers: {json.dumps(self.standard_headers)}")
         
     def _get_auth_header(self):
         """Create authorization header using WordPress application password format"""
@@ -74,12 +126,12 @@ class WordPressAPI:
             is_app_password = ' ' in self.password
             
             if is_app_password:
-                logger.info("Password appears to be a WordPress Application Password (contains spaces)")
+                logger.debug("Password appears to be a WordPress Application Password (contains spaces)")
                 # For application passwords, we need to handle the format correctly
                 # The spaces need to be preserved in the encoding
                 
                 # Log credential format (without exposing the actual values)
-                logger.info(f"Using application password auth with username length: {len(self.username)}")
+                logger.debug(f"Using application password auth with username length: {len(self.username)}")
                 
                 # WordPress application passwords use the username in full and the application password as provided
                 auth_string = f"{self.username}:{self.password}"
@@ -93,23 +145,23 @@ class WordPressAPI:
                 
                 # Log first few characters to help with debugging (without exposing the whole token)
                 token_preview = encoded[:5] + "..." if len(encoded) > 5 else encoded
-                logger.info(f"Auth token preview (first 5 chars): {token_preview}")
+                logger.debug(f"Auth token preview (first 5 chars): {token_preview}")
                 
                 # Return WordPress application password format
                 return {'Authorization': f'Basic {encoded}'}
             else:
                 # For regular passwords (not application passwords)
-                logger.info("Using standard WordPress authentication (no spaces in password)")
+                logger.debug("Using standard WordPress authentication (no spaces in password)")
                 
                 # Log credential format (without exposing the actual values)
-                logger.info(f"Using basic auth credentials with username length: {len(self.username)}")
+                logger.debug(f"Using basic auth credentials with username length: {len(self.username)}")
                 
                 # Standard Basic Auth encoding with base64
                 auth_string = f"{self.username}:{self.password}"
                 encoded = base64.b64encode(auth_string.encode('utf-8')).decode('utf-8')
                 
                 # Log auth header format (without exposing the actual token)
-                logger.info(f"Auth header format: Authorization: Basic [base64 token]")
+                logger.debug(f"Auth header format: Authorization: Basic [base64 token]")
                 
                 # Check if the token seems unusual or problematic
                 if len(encoded) < 10:
@@ -117,7 +169,7 @@ class WordPressAPI:
                 
                 # Log first few characters to help with debugging (without exposing the whole token)
                 token_preview = encoded[:5] + "..." if len(encoded) > 5 else encoded
-                logger.info(f"Auth token preview (first 5 chars): {token_preview}")
+                logger.debug(f"Auth token preview (first 5 chars): {token_preview}")
                 
                 return {'Authorization': f'Basic {encoded}'}
             
@@ -154,22 +206,19 @@ class WordPressAPI:
                 timeout=10
             )
             
-            # Log complete response details
-            logger.info(f"Response status: {response.status_code}")
-            logger.info(f"Response headers: {dict(response.headers)}")
+            # Status and size at INFO; (redacted) headers and body only at DEBUG
+            log_response(logger, "Connection test response", response)
             
             if response.status_code == 200:
                 logger.info("WordPress API connection successful!")
                 return True
             else:
-                # Log the full error response
-                logger.error(f"WordPress API connection failed with status code: {response.status_code}")
-                logger.error(f"Response content: {response.text}")
+                # Status and size of the error response; the body is only logged at DEBUG
+                log_response(logger, "WordPress API connection failed", response, level=logging.ERROR)
                 
-                # Try to parse JSON error if available
+                # Summarize the JSON error if available; the full body is only logged at DEBUG
                 try:
-                    error_json = response.json()
-                    logger.error(f"Error details: {json.dumps(error_json, indent=2)}")
+                    log_payload(logger, "Error details", response.json(), level=logging.ERROR)
                 except Exception as parse_error:
                     logger.error(f"Could not parse error response as JSON: {str(parse_error)}")
                 
@@ -180,6 +229,32 @@ class WordPressAPI:
             logger.exception("Full exception traceback:")
             return False
     
+    def _build_create_payload(self, title, content, status='draft', featured_media=None, categories=None, tags=None):
+        """
+        Build the request body for creating a post
+        :return: Dictionary to send as the request body
+        """
+        # Prepare post data with proper formatting based on the WordPress response format
+        # We can see from the sample data that WordPress expects title and content in this format
+        post_data = {
+            'title': {'raw': title},
+            'content': {'raw': content},
+            'status': status,
+        }
+        
+        # Add optional fields if provided
+        if featured_media:
+            post_data['featured_media'] = featured_media
+        
+        # Names are resolved to IDs through the taxonomy cache
+        if categories:
+            post_data['categories'] = self.taxonomies.resolve_ids('categories', categories)
+        
+        if tags:
+            post_data['tags'] = self.taxonomies.resolve_ids('tags', tags)
+        
+        return post_data
+    
     def create_post(self, title, content, status='draft', featured_media=None, categories=None, tags=None):
         """
         Create a new post in WordPress
@@ -187,7 +262,7 @@ class WordPressAPI:
         :param content: Post content (can include HTML)
         :param status: Post status (draft, publish, pending, private)
         :param featured_media: Featured image ID (optional)
-        :param categories: List of category IDs (optional)
+        :param categories: List of category IDs or names (optional)
         :param tags: List of tag IDs or names (optional)
         :return: Post details if successful, error message if failed
         """
@@ -196,50 +271,24 @@ class WordPressAPI:
             endpoint = f"{self.api_url}/posts"
             logger.info(f"Creating post at: {endpoint}")
             
-            # Prepare post data with proper formatting based on the WordPress response format
-            # We can see from the sample data that WordPress expects title and content in this format
-            post_data = {
-                'title': {'raw': title},
-                'content': {'raw': content},
-                'status': status,
-            }
-            
-            # Add optional fields if provided
-            if featured_media:
-                post_data['featured_media'] = featured_media
-            
-            if categories:
-                post_data['categories'] = categories
-            
-            if tags:
-                post_data['tags'] = tags
+            post_data = self._build_create_payload(title, content, status, featured_media, categories, tags)
             
-            # Log what we're sending
-            logger.info(f"Title: {title[:50] + '...' if len(title) > 50 else title}")
-            logger.info(f"Content length: {len(content)} characters")
-            logger.info(f"Status: {status}")
+            # Log field sizes; the full body is only serialized at DEBUG
+            log_payload(logger, "Create request", post_data)
             
             # Prepare headers with all required fields
             headers = self.standard_headers.copy()
             headers.update(self.auth_header)
-            
-            # Log request details (redact auth token)
-            safe_headers = headers.copy()
-            if 'Authorization' in safe_headers:
-                safe_headers['Authorization'] = 'Basic [REDACTED]'
-            logger.info(f"Request headers: {json.dumps(safe_headers)}")
+            logger.debug(f"Request headers: {redact_headers(headers)}")
             
             # Make the request
             response = requests.post(
                 endpoint,
                 headers=headers,
-                json=post_data,
+                data=json_codec.dumps_bytes(post_data),
                 timeout=20
             )
-            
-            # Log complete response details
-            logger.info(f"Response status: {response.status_code}")
-            logger.info(f"Response headers: {dict(response.headers)}")
+            log_response(logger, "Create response", response)
             
             # Check if successful
             if response.status_code in (200, 201):
@@ -257,14 +306,12 @@ class WordPressAPI:
                     'edit_url': edit_url
                 }
             else:
-                # Log the full error response
-                logger.error(f"Failed to create post. Status code: {response.status_code}")
-                logger.error(f"Response content: {response.text}")
+                # Status and size of the error response; the body is only logged at DEBUG
+                log_response(logger, "Failed to create post", response, level=logging.ERROR)
                 
-                # Try to parse JSON error if available
+                # Summarize the JSON error if available; the full body is only logged at DEBUG
                 try:
-                    error_json = response.json()
-                    logger.error(f"Error details: {json.dumps(error_json, indent=2)}")
+                    log_payload(logger, "Error details", response.json(), level=logging.ERROR)
                 except Exception as parse_error:
                     logger.error(f"Could not parse error response as JSON: {str(parse_error)}")
                 
@@ -327,7 +374,89 @@ class WordPressAPI:
                 'error': f"Error creating WordPress post: {str(e)}"
             }
     
-    def update_post(self, post_id, title, content, status=None, featured_media=None, categories=None, tags=None, preserve_elementor=True):
+    def _build_update_payload(self, post_id, title, content, current_post=None, preserve_elementor=True,
+                              status=None, featured_media=None, categories=None, tags=None):
+        """
+        Build the request body for updating a post, carrying the new content into Elementor data
+        :param post_id: ID of the post to update
+        :param title: New post title
+        :param content: New post content (can include HTML)
+        :param current_post: The post as fetched with context='edit' (needed for its Elementor data)
+        :param preserve_elementor: Whether to carry the new content into the Elementor data
+        :param status: Post status (draft, publish, pending, private)
+        :param featured_media: Featured image ID (optional)
+        :param categories: List of category IDs or names (optional)
+        :param tags: List of tag IDs or names (optional)
+        :return: Dictionary to send as the request body
+        """
+        elementor_data = None
+        elementor_edit_mode = None
+        
+        # If preserving Elementor, use the current post's meta fields
+        if preserve_elementor:
+            if current_post:
+                logger.info(f"Current post status: {current_post.get('status')}")
+                if current_post.get('meta'):
+                    logger.debug(f"Meta fields found: {list(current_post['meta'].keys())}")
+                    elementor_data = current_post['meta'].get('_elementor_data')
+                    elementor_edit_mode = current_post['meta'].get('_elementor_edit_mode')
+                    if elementor_data:
+                        logger.info(f"Found Elementor data (length: {len(elementor_data)})")
+                        logger.info(f"Elementor edit mode: {elementor_edit_mode}")
+        
+                        # Update the Elementor content with the new content
+                        logger.info("Updating Elementor widget content...")
+                        updated_elementor_data = ElementorHandler.update_elementor_content(
+                            elementor_data,
+                            content,  # The new content to insert
+                            update_all_text=False  # Only update main content widget
+                        )
+                        elementor_data = updated_elementor_data
+                        logger.info("Elementor content updated successfully")
+                    else:
+                        logger.warning("No Elementor data found in post meta")
+                        # Optionally create a simple Elementor structure
+                        if current_post.get('meta', {}).get('_elementor_edit_mode') == 'builder':
+                            logger.info("Creating new Elementor structure...")
+                            elementor_data = ElementorHandler.create_simple_elementor_structure(content)
+                            elementor_edit_mode = 'builder'
+                else:
+                    logger.warning("No meta fields returned from WordPress")
+            else:
+                logger.error(f"Failed to fetch current post {post_id}")
+        
+        # Prepare post data with proper formatting based on the WordPress response format
+        post_data = {
+            'title': {'raw': title},
+            'content': {'raw': content},
+        }
+        
+        # If we have Elementor data, include it in the update
+        if elementor_data:
+            post_data['meta'] = {
+                '_elementor_data': elementor_data,
+                '_elementor_edit_mode': elementor_edit_mode or 'builder'
+            }
+            logger.info("Including Elementor metadata in update")
+        
+        # Add optional fields if provided
+        if status:
+            post_data['status'] = status
+        
+        if featured_media:
+            post_data['featured_media'] = featured_media
+        
+        # Names are resolved to IDs through the taxonomy cache
+        if categories:
+            post_data['categories'] = self.taxonomies.resolve_ids('categories', categories)
+        
+        if tags:
+            post_data['tags'] = self.taxonomies.resolve_ids('tags', tags)
+        
+        return post_data
+    
+    def update_post(self, post_id, title, content, status=None, featured_media=None, categories=None, tags=None,
+                    preserve_elementor=True, skip_unchanged=True, dry_run=False):
         """
         Update an existing post in WordPress
         :param post_id: ID of the post to update
@@ -335,124 +464,80 @@ class WordPressAPI:
         :param content: New post content (can include HTML)
         :param status: Post status (draft, publish, pending, private)
         :param featured_media: Featured image ID (optional)
-        :param categories: List of category IDs (optional)
+        :param categories: List of category IDs or names (optional)
         :param tags: List of tag IDs or names (optional)
         :param preserve_elementor: Whether to preserve Elementor metadata (default: True)
+        :param skip_unchanged: Skip the write if this exact content was the last thing we wrote (default: True)
+        :param dry_run: Only compute a diff against the live post, don't write anything
         :return: Post details if successful, error message if failed
         """
         try:
-            # If preserving Elementor, fetch the current post with meta fields
-            elementor_data = None
-            elementor_edit_mode = None
+            current_post = None
+            new_hash = content_hash(title, content, status=status, featured_media=featured_media,
+                                    categories=categories, tags=tags)
             
-            if preserve_elementor:
-                logger.info(f"Fetching current post to handle Elementor data...")
+            if preserve_elementor or skip_unchanged or dry_run:
+                logger.info(f"Fetching current post {post_id}...")
                 current_post = self.get_post(post_id, context='edit')
-                if current_post:
-                    logger.info(f"Current post status: {current_post.get('status')}")
-                    if current_post.get('meta'):
-                        logger.info(f"Meta fields found: {list(current_post['meta'].keys())}")
-                        elementor_data = current_post['meta'].get('_elementor_data')
-                        elementor_edit_mode = current_post['meta'].get('_elementor_edit_mode')
-                        if elementor_data:
-                            logger.info(f"Found Elementor data (length: {len(elementor_data)})")
-                            logger.info(f"Elementor edit mode: {elementor_edit_mode}")
-                            
-                            # Update the Elementor content with the new content
-                            logger.info("Updating Elementor widget content...")
-                            updated_elementor_data = ElementorHandler.update_elementor_content(
-                                elementor_data,
-                                content,  # The new content to insert
-                                update_all_text=False  # Only update main content widget
-                            )
-                            elementor_data = updated_elementor_data
-                            logger.info("Elementor content updated successfully")
-                        else:
-                            logger.warning("No Elementor data found in post meta")
-                            # Optionally create a simple Elementor structure
-                            if current_post.get('meta', {}).get('_elementor_edit_mode') == 'builder':
-                                logger.info("Creating new Elementor structure...")
-                                elementor_data = ElementorHandler.create_simple_elementor_structure(content)
-                                elementor_edit_mode = 'builder'
-                    else:
-                        logger.warning("No meta fields returned from WordPress")
-                else:
-                    logger.error(f"Failed to fetch current post {post_id}")
-                    
-            # Prepare endpoint URL with post ID
-            endpoint = f"{self.api_url}/posts/{post_id}"
-            logger.info(f"Updating post at: {endpoint}")
-            
-            # Prepare post data with proper formatting based on the WordPress response format
-            post_data = {
-                'title': {'raw': title},
-                'content': {'raw': content},
-            }
             
-            # If we have Elementor data, include it in the update
-            if preserve_elementor and elementor_data:
-                post_data['meta'] = {
-                    '_elementor_data': elementor_data,
-                    '_elementor_edit_mode': elementor_edit_mode or 'builder'
+            if dry_run:
+                if not current_post:
+                    return {'success': False, 'error': f"Could not fetch post {post_id} for dry run"}
+                live_content = current_post.get('content_raw') or current_post.get('content', '')
+                diff = compact_diff(live_content, content)
+                title_changed = title != (current_post.get('title_raw') or current_post.get('title'))
+                return {
+                    'success': True,
+                    'dry_run': True,
+                    'post_id': post_id,
+                    'changed': bool(diff) or title_changed,
+                    'title_changed': title_changed,
+                    'diff': diff
                 }
-                logger.info("Including Elementor metadata in update")
             
-            # Add optional fields if provided
-            if status:
-                post_data['status'] = status
-                
-            if featured_media:
-                post_data['featured_media'] = featured_media
+            if skip_unchanged and current_post and self.hash_store.is_unchanged(
+                    post_id, new_hash, current_post.get('modified')):
+                logger.info(f"Post {post_id} already has this content - skipping update")
+                return {
+                    'success': True,
+                    'skipped': True,
+                    'post_id': post_id,
+                    'post_url': current_post.get('link'),
+                    'edit_url': f"{self.base_url}/wp-admin/post.php?post={post_id}&action=edit",
+                    'modified': current_post.get('modified'),
+                    'status': current_post.get('status')
+                }
             
-            if categories:
-                post_data['categories'] = categories
+            post_data = self._build_update_payload(
+                post_id, title, content, current_post, preserve_elementor=preserve_elementor,
+                status=status, featured_media=featured_media, categories=categories, tags=tags
+            )
             
-            if tags:
-                post_data['tags'] = tags
+            # Prepare endpoint URL with post ID
+            endpoint = f"{self.api_url}/posts/{post_id}"
+            logger.info(f"Updating post at: {endpoint}")
             
-            # Log what we're sending
-            logger.info(f"Updating post ID: {post_id}")
-            logger.info(f"Title: {title[:50] + '...' if len(title) > 50 else title}")
-            logger.info(f"Content length: {len(content)} characters")
-            if status:
-                logger.info(f"Status: {status}")
+            # Log field sizes; the full body is only serialized at DEBUG
+            log_payload(logger, f"Update request for post {post_id}", post_data)
             
             # Prepare headers with all required fields
             headers = self.standard_headers.copy()
             headers.update(self.auth_header)
-            
-            # Log request details (redact auth token)
-            safe_headers = headers.copy()
-            if 'Authorization' in safe_headers:
-                safe_headers['Authorization'] = 'Basic [REDACTED]'
-            logger.info(f"Request headers: {json.dumps(safe_headers)}")
-            
-            # Log the complete request data for debugging
-            logger.info(f"Request data: {json.dumps(post_data, indent=2)}")
+            logger.debug(f"Request headers: {redact_headers(headers)}")
             
             # Make the request (PUT is used for updates)
             response = requests.put(
                 endpoint,
                 headers=headers,
-                json=post_data,
+                data=json_codec.dumps_bytes(post_data),
                 timeout=20
             )
-            
-            # Log complete response details
-            logger.info(f"Response status: {response.status_code}")
-            logger.info(f"Response headers: {dict(response.headers)}")
-            
-            # Log response body for debugging
-            try:
-                response_json = response.json()
-                logger.info(f"Response body: {json.dumps(response_json, indent=2)}")
-            except:
-                logger.info(f"Response text: {response.text[:500]}")
+            log_response(logger, f"Update response for post {post_id}", response)
             
             # Check if successful
             if response.status_code in (200, 201):
                 logger.info(f"Post updated successfully!")
-                json_data = response_json if 'response_json' in locals() else response.json()
+                json_data = json_codec.loads(response.content)
                 
                 post_id = json_data.get('id')
                 post_url = json_data.get('link')
@@ -460,10 +545,13 @@ class WordPressAPI:
                 
                 # Verify the update by fetching the post again
                 logger.info("Verifying post update...")
-                updated_post = self.get_post(post_id)
+                updated_post = self.get_post(post_id, fields=['id', 'status', 'modified'])
                 if updated_post:
-                    logger.info(f"Verified post status: {updated_post.get('status')}")
-                    logger.info(f"Verified post modified date: {updated_post.get('modified')}")
+                    logger.info(f"Verified post status: {updated_post.get('status')}, "
+                                f"modified: {updated_post.get('modified')}")
+                
+                # Remember what we wrote so an identical rerun can be skipped
+                self.hash_store.set(post_id, new_hash, json_data.get('modified'))
                 
                 return {
                     'success': True,
@@ -474,14 +562,12 @@ class WordPressAPI:
                     'status': json_data.get('status')
                 }
             else:
-                # Log the full error response
-                logger.error(f"Failed to update post. Status code: {response.status_code}")
-                logger.error(f"Response content: {response.text}")
+                # Status and size of the error response; the body is only logged at DEBUG
+                log_response(logger, f"Failed to update post {post_id}", response, level=logging.ERROR)
                 
-                # Try to parse JSON error if available
+                # Summarize the JSON error if available; the full body is only logged at DEBUG
                 try:
-                    error_json = response.json()
-                    logger.error(f"Error details: {json.dumps(error_json, indent=2)}")
+                    log_payload(logger, "Error details", response.json(), level=logging.ERROR)
                 except Exception as parse_error:
                     logger.error(f"Could not parse error response as JSON: {str(parse_error)}")
                 
@@ -498,6 +584,269 @@ class WordPressAPI:
                 'error': f"Error updating WordPress post: {str(e)}"
             }
     
+    def _send_batch(self, sub_requests):
+        """
+        Send up to BATCH_SIZE sub-requests through the REST batch endpoint (WordPress 5.6+)
+        Sub-requests are split over several HTTP requests when one body would exceed MAX_BATCH_BYTES
+        If one of those HTTP requests fails, the ones before it have already been
+        written, so their responses are returned together with the error instead
+        of being thrown away.
+        :param sub_requests: List of {'method', 'path', 'body'} dictionaries
+        :return: (responses, error) tuple, or None if batching is unavailable. responses are the
+                 {'status', 'body'} responses for the first len(responses) sub-requests; error is
+                 None when every sub-request was sent, otherwise why the rest were not
+        """
+        encoded = [json_codec.dumps_bytes(sub_request) for sub_request in sub_requests]
+        responses = []
+        for group in split_by_size([len(part) for part in encoded], MAX_BATCH_BYTES):
+            try:
+                group_responses = self._post_batch([encoded[i] for i in group])
+            except Exception as e:
+                logger.error(f"Batch stopped after {len(responses)} of {len(sub_requests)} requests: {str(e)}")
+                return responses, str(e)
+            if group_responses is None:
+                if responses:
+                    error = "WordPress batch endpoint stopped responding part way through a batch"
+                    logger.error(f"Batch stopped after {len(responses)} of {len(sub_requests)} requests: {error}")
+                    return responses, error
+                return None
+            responses.extend(group_responses)
+        return responses, None
+    
+    def _post_batch(self, encoded_requests):
+        """
+        Send one HTTP request to the batch endpoint
+        :param encoded_requests: Sub-requests already encoded as JSON bytes
+        :return: List of {'status', 'body'} responses, or None if batching is unavailable
+        """
+        endpoint = f"{self.base_url}/wp-json/batch/v1"
+        headers = self.standard_headers.copy()
+        headers.update(self.auth_header)
+        
+        # The sub-requests are encoded once, both for sizing and for the body
+        body = b'{"validation":"normal","requests":[' + b','.join(encoded_requests) + b']}'
+        logger.info(f"Sending batch of {len(encoded_requests)} requests ({len(body)} bytes) to: {endpoint}")
+        response = requests.post(endpoint, headers=headers, data=body, timeout=60)
+        logger.info(f"Batch response status: {response.status_code}")
+        
+        # 404 means the batch route doesn't exist (WordPress < 5.6 or the REST route is blocked)
+        if response.status_code in (404, 405, 501):
+            logger.warning("WordPress batch endpoint not available - falling back to single requests")
+            return None
+        if response.status_code not in (200, 207):
+            raise Exception(f"Batch request failed with status code {response.status_code}: {response.text[:500]}")
+        
+        responses = json_codec.loads(response.content).get('responses', [])
+        if len(responses) != len(encoded_requests):
+            raise Exception(f"Batch returned {len(responses)} responses for {len(encoded_requests)} requests")
+        return responses
+    
+    def _batch_item_result(self, item, fallback_post_id=None):
+        """Map one batch sub-response onto the result shape used by create_post/update_post"""
+        status_code = item.get('status')
+        body = item.get('body') or {}
+        if status_code in (200, 201):
+            post_id = body.get('id', fallback_post_id)
+            return {
+                'success': True,
+                'post_id': post_id,
+                'post_url': body.get('link'),
+                'edit_url': f"{self.base_url}/wp-admin/post.php?post={post_id}&action=edit",
+                'modified': body.get('modified'),
+                'status': body.get('status')
+            }
+        message = body.get('message') if isinstance(body, dict) else None
+        return {
+            'success': False,
+            'post_id': fallback_post_id,
+            'error': f"Failed with status code: {status_code}. {message or ''}".strip()
+        }
+    
+    def _get_posts_for_edit(self, post_ids):
+        """
+        Fetch several posts with context='edit' in one request (at most BATCH_SIZE)
+        :param post_ids: List of WordPress post IDs
+        :return: Dictionary of post ID -> processed post
+        """
+        params = {
+            'include': ','.join(str(post_id) for post_id in post_ids),
+            'per_page': len(post_ids),
+            'context': 'edit',
+            'status': 'any',
+            '_fields': ','.join(DETAIL_FIELDS)
+        }
+        query_string = "&".join([f"{k}={urllib.parse.quote(str(v))}" for k, v in params.items()])
+        headers = self.standard_headers.copy()
+        headers.update(self.auth_header)
+        
+        response = requests.get(f"{self.api_url}/posts?{query_string}", headers=headers, timeout=30)
+        if response.status_code != 200:
+            logger.error(f"Failed to fetch posts {post_ids}. Status code: {response.status_code}")
+            return {}
+        return {post.get('id'): self._process_post(post) for post in json_codec.loads(response.content)}
+    
+    def create_posts_batch(self, posts, status='draft'):
+        """
+        Create many posts using as few HTTP requests as possible
+        :param posts: List of dictionaries with 'title' and 'content', and optionally
+                      'status', 'featured_media', 'categories' and 'tags'
+        :param status: Default status for posts that don't set one
+        :return: List of create_post-style results in the same order as posts
+        """
+        results = []
+        use_batch = True
+        for start in range(0, len(posts), BATCH_SIZE):
+            chunk = posts[start:start + BATCH_SIZE]
+            
+            responses = None
+            if use_batch:
+                sub_requests = [
+                    {
+                        'method': 'POST',
+                        'path': '/wp/v2/posts',
+                        'body': self._build_create_payload(
+                            post['title'], post['content'], post.get('status', status),
+                            post.get('featured_media'), post.get('categories'), post.get('tags')
+                        )
+                    }
+                    for post in chunk
+                ]
+                try:
+                    sent = self._send_batch(sub_requests)
+                except Exception as e:
+                    logger.error(f"Error sending create batch: {str(e)}")
+                    results.extend({'success': False, 'error': f"Error creating WordPress post: {str(e)}"}
+                                   for _ in chunk)
+                    continue
+                use_batch = sent is not None
+            
+            if not use_batch:
+                results.extend(
+                    self.create_post(post['title'], post['content'], post.get('status', status),
+                                     post.get('featured_media'), post.get('categories'), post.get('tags'))
+                    for post in chunk
+                )
+                continue
+            
+            responses, error = sent
+            for post, item in zip(chunk, responses):
+                result = self._batch_item_result(item)
+                if result['success']:
+                    self.hash_store.set(result['post_id'], self._update_hash(post, status), result.get('modified'))
+                results.append(result)
+            # Posts after the point where the batch stopped were never sent
+            results.extend({'success': False, 'error': f"Error creating WordPress post: {error}"}
+                           for _ in chunk[len(responses):])
+        
+        created = sum(1 for result in results if result.get('success'))
+        logger.info(f"Created {created} of {len(posts)} posts")
+        return results
+    
+    def update_posts_batch(self, updates, preserve_elementor=True, skip_unchanged=True):
+        """
+        Update many posts using as few HTTP requests as possible
+        :param updates: List of dictionaries with 'post_id', 'title' and 'content', and optionally
+                        'status', 'featured_media', 'categories' and 'tags'
+        :param preserve_elementor: Whether to carry the new content into each post's Elementor data
+        :param skip_unchanged: Skip posts whose content matches what we last wrote
+        :return: List of update_post-style results in the same order as updates
+        """
+        results = []
+        use_batch = True
+        for start in range(0, len(updates), BATCH_SIZE):
+            chunk = updates[start:start + BATCH_SIZE]
+            
+            if not use_batch:
+                results.extend(self._update_single(update, preserve_elementor, skip_unchanged) for update in chunk)
+                continue
+            
+            try:
+                # One list request fetches the Elementor data and modified dates for the whole chunk
+                current_posts = {}
+                if preserve_elementor or skip_unchanged:
+                    current_posts = self._get_posts_for_edit([update['post_id'] for update in chunk])
+                
+                chunk_results = [None] * len(chunk)
+                sub_requests = []
+                request_indexes = []
+                for i, update in enumerate(chunk):
+                    post_id = update['post_id']
+                    current_post = current_posts.get(int(post_id))
+                    new_hash = self._update_hash(update)
+                    if skip_unchanged and current_post and self.hash_store.is_unchanged(
+                            post_id, new_hash, current_post.get('modified')):
+                        logger.info(f"Post {post_id} already has this content - skipping update")
+                        chunk_results[i] = {
+                            'success': True,
+                            'skipped': True,
+                            'post_id': post_id,
+                            'post_url': current_post.get('link'),
+                            'edit_url': f"{self.base_url}/wp-admin/post.php?post={post_id}&action=edit",
+                            'modified': current_post.get('modified'),
+                            'status': current_post.get('status')
+                        }
+                        continue
+                    
+                    sub_requests.append({
+                        'method': 'POST',
+                        'path': f'/wp/v2/posts/{post_id}',
+                        'body': self._build_update_payload(
+                            post_id, update['title'], update['content'], current_post,
+                            preserve_elementor=preserve_elementor,
+                            status=update.get('status'), featured_media=update.get('featured_media'),
+                            categories=update.get('categories'), tags=update.get('tags')
+                        )
+                    })
+                    request_indexes.append(i)
+                
+                sent = self._send_batch(sub_requests) if sub_requests else ([], None)
+            except Exception as e:
+                logger.error(f"Error sending update batch: {str(e)}")
+                results.extend({'success': False, 'post_id': update['post_id'],
+                                'error': f"Error updating WordPress post: {str(e)}"} for update in chunk)
+                continue
+            
+            if sent is None:
+                use_batch = False
+                results.extend(self._update_single(update, preserve_elementor, skip_unchanged) for update in chunk)
+                continue
+            
+            responses, error = sent
+            for i, item in zip(request_indexes, responses):
+                update = chunk[i]
+                result = self._batch_item_result(item, fallback_post_id=update['post_id'])
+                if result['success']:
+                    self.hash_store.set(update['post_id'], self._update_hash(update), result.get('modified'))
+                chunk_results[i] = result
+            # Updates after the point where the batch stopped were never sent;
+            # the ones already written and the skipped ones keep their results
+            for i in request_indexes[len(responses):]:
+                chunk_results[i] = {'success': False, 'post_id': chunk[i]['post_id'],
+                                    'error': f"Error updating WordPress post: {error}"}
+            results.extend(chunk_results)
+        
+        updated = sum(1 for result in results if result.get('success') and not result.get('skipped'))
+        skipped = sum(1 for result in results if result.get('skipped'))
+        logger.info(f"Updated {updated} of {len(updates)} posts ({skipped} unchanged)")
+        return results
+    
+    @staticmethod
+    def _update_hash(post, default_status=None):
+        """Hash of everything a batch create/update sends for one post"""
+        return content_hash(
+            post['title'], post['content'], status=post.get('status', default_status),
+            featured_media=post.get('featured_media'), categories=post.get('categories'), tags=post.get('tags')
+        )
+    
+    def _update_single(self, update, preserve_elementor, skip_unchanged):
+        """Fallback for update_posts_batch when the batch endpoint is not available"""
+        return self.update_post(
+            update['post_id'], update['title'], update['content'],
+            status=update.get('status'), featured_media=update.get('featured_media'),
+            categories=update.get('categories'), tags=update.get('tags'),
+            preserve_elementor=preserve_elementor, skip_unchanged=skip_unchanged
+        )
+    
     def create_test_post(self):
         """Simple function to test WordPress POST capability with minimal content"""
         test_title = "Test Post from Blog Generator"
@@ -517,7 +866,27 @@ class WordPressAPI:
         
         return result
     
-    def get_posts(self, search_term=None, category=None, per_page=10, page=1, status='publish'):
+    @staticmethod
+    def _projection_params(fields=None, embed=False):
+        """
+        Build the _fields/_embed query parameters for a request
+        :param fields: List of top-level fields to return, or None for the full object
+        :param embed: Whether to embed linked objects (only needed for the featured image)
+        :return: Dictionary of query parameters
+        """
+        params = {}
+        if fields:
+            fields = list(fields)
+            if embed:
+                # _embed only works with _fields when the links and embedded objects are kept
+                fields += ['_links', '_embedded']
+            params['_fields'] = ','.join(fields)
+        if embed:
+            params['_embed'] = 'wp:featuredmedia'
+        return params
+    
+    def get_posts(self, search_term=None, category=None, per_page=10, page=1, status='publish',
+                  fields=LIST_FIELDS, embed=False):
         """
         Get posts from WordPress with filtering options
         :param search_term: Optional search term to filter posts
@@ -525,6 +894,8 @@ class WordPressAPI:
         :param per_page: Number of posts per page (default 10)
         :param page: Page number (default 1)
         :param status: Post status to filter by (default 'publish')
+        :param fields: Fields to return (default LIST_FIELDS; None for full posts)
+        :param embed: Include the featured image (default False)
         :return: List of posts if successful, empty list if failed
         """
         try:
@@ -533,8 +904,8 @@ class WordPressAPI:
                 'per_page': per_page,
                 'page': page,
                 'status': status,
-                '_embed': 'true'  # Include featured images and other embedded content
             }
+            params.update(self._projection_params(fields, embed))
             
             # Add optional filters
             if search_term:
@@ -548,7 +919,7 @@ class WordPressAPI:
             query_string = "&".join([f"{k}={urllib.parse.quote(str(v))}" for k, v in params.items()])
             full_url = f"{endpoint}?{query_string}"
             
-            logger.info(f"Getting posts from: {full_url}")
+            read_log_sampler.log(logger, 'get_posts', f"Getting posts from: {full_url}")
             
             # Prepare headers with auth and standard headers
             headers = self.standard_headers.copy()
@@ -562,7 +933,7 @@ class WordPressAPI:
             )
             
             # Log response details
-            logger.info(f"Posts response code: {response.status_code}")
+            logger.debug(f"Posts response code: {response.status_code}")
             
             if response.status_code == 200:
                 posts = response.json()
@@ -573,36 +944,7 @@ class WordPressAPI:
                 logger.info(f"Found {len(posts)} posts (page {page} of {total_pages}, total: {total_posts})")
                 
                 # Process and clean posts for easier handling
-                processed_posts = []
-                for post in posts:
-                    # Extract the needed information
-                    processed_post = {
-                        'id': post.get('id'),
-                        'title': post.get('title', {}).get('rendered', ''),
-                        'content': post.get('content', {}).get('rendered', ''),
-                        'excerpt': post.get('excerpt', {}).get('rendered', ''),
-                        'date': post.get('date'),
-                        'modified': post.get('modified'),
-                        'slug': post.get('slug'),
-                        'link': post.get('link'),
-                        'categories': post.get('categories', []),
-                        'tags': post.get('tags', []),
-                    }
-                    
-                    # Add featured image if available
-                    if ('_embedded' in post and 
-                        'wp:featuredmedia' in post['_embedded'] and 
-                        isinstance(post['_embedded']['wp:featuredmedia'], list) and 
-                        len(post['_embedded']['wp:featuredmedia']) > 0 and
-                        post['_embedded']['wp:featuredmedia'][0] is not None):
-                        featured_media = post['_embedded']['wp:featuredmedia'][0]
-                        processed_post['featured_image'] = {
-                            'id': featured_media.get('id'),
-                            'url': featured_media.get('source_url', ''),
-                            'alt': featured_media.get('alt_text', '')
-                        }
-                    
-                    processed_posts.append(processed_post)
+                processed_posts = [self._process_post(post) for post in posts]
                 
                 return {
                     'posts': processed_posts,
@@ -611,9 +953,8 @@ class WordPressAPI:
                     'current_page': page
                 }
             else:
-                # Log the full error response
-                logger.error(f"Failed to get posts. Status code: {response.status_code}")
-                logger.error(f"Response content: {response.text}")
+                # Status and size of the error response; the body is only logged at DEBUG
+                log_response(logger, "Failed to get posts", response, level=logging.ERROR)
                 return {'posts': [], 'total': 0, 'pages': 0, 'current_page': page}
             
         except Exception as e:
@@ -621,16 +962,65 @@ class WordPressAPI:
             logger.exception("Full exception traceback:")
             return {'posts': [], 'total': 0, 'pages': 0, 'current_page': page}
     
-    def get_post(self, post_id, context='view'):
+    def _process_post(self, post):
+        """
+        Flatten a post from the REST API into the dictionary used throughout the app
+        :param post: Post JSON as returned by WordPress
+        :return: Processed post dictionary
+        """
+        # Process the post for easier handling
+        processed_post = {
+            'id': post.get('id'),
+            'title': post.get('title', {}).get('rendered', ''),
+            'content': post.get('content', {}).get('rendered', ''),
+            'excerpt': post.get('excerpt', {}).get('rendered', ''),
+            'date': post.get('date'),
+            'modified': post.get('modified'),
+            'slug': post.get('slug'),
+            'link': post.get('link'),
+            'categories': post.get('categories', []),
+            'tags': post.get('tags', []),
+            'status': post.get('status'),
+            'meta': post.get('meta', {})  # Include meta fields when context=edit
+        }
+        
+        # Raw (unrendered) values are only returned with context=edit
+        if 'raw' in post.get('content', {}):
+            processed_post['content_raw'] = post['content']['raw']
+        if 'raw' in post.get('title', {}):
+            processed_post['title_raw'] = post['title']['raw']
+        
+        # Add featured image if available
+        if ('_embedded' in post and 
+            'wp:featuredmedia' in post['_embedded'] and 
+            isinstance(post['_embedded']['wp:featuredmedia'], list) and 
+            len(post['_embedded']['wp:featuredmedia']) > 0 and
+            post['_embedded']['wp:featuredmedia'][0] is not None):
+            featured_media = post['_embedded']['wp:featuredmedia'][0]
+            processed_post['featured_image'] = {
+                'id': featured_media.get('id'),
+                'url': featured_media.get('source_url', ''),
+                'alt': featured_media.get('alt_text', '')
+            }
+        
+        return processed_post
+    
+    def get_post(self, post_id, context='view', fields=DETAIL_FIELDS, embed=False):
         """
         Get a specific post by ID
         :param post_id: WordPress post ID
         :param context: Context for the request ('view' or 'edit'). 'edit' includes meta fields
+        :param fields: Fields to return (default DETAIL_FIELDS; None for the full post)
+        :param embed: Include the featured image (default False)
         :return: Post details if successful, None if failed
         """
         try:
-            endpoint = f"{self.api_url}/posts/{post_id}?_embed=true&context={context}"
-            logger.info(f"Getting post from: {endpoint} (context: {context})")
+            params = {'context': context}
+            params.update(self._projection_params(fields, embed))
+            query_string = "&".join([f"{k}={urllib.parse.quote(str(v))}" for k, v in params.items()])
+            endpoint = f"{self.api_url}/posts/{post_id}?{query_string}"
+            read_log_sampler.log(logger, 'get_post', f"Getting post {post_id} (context: {context})")
+            logger.debug(f"Getting post from: {endpoint}")
             
             # Prepare headers with auth and standard headers
             headers = self.standard_headers.copy()
@@ -643,46 +1033,12 @@ class WordPressAPI:
                 timeout=20
             )
             
-            # Log response details
-            logger.info(f"Post response code: {response.status_code}")
-            
             if response.status_code == 200:
-                post = response.json()
-                
-                # Process the post for easier handling
-                processed_post = {
-                    'id': post.get('id'),
-                    'title': post.get('title', {}).get('rendered', ''),
-                    'content': post.get('content', {}).get('rendered', ''),
-                    'excerpt': post.get('excerpt', {}).get('rendered', ''),
-                    'date': post.get('date'),
-                    'modified': post.get('modified'),
-                    'slug': post.get('slug'),
-                    'link': post.get('link'),
-                    'categories': post.get('categories', []),
-                    'tags': post.get('tags', []),
-                    'status': post.get('status'),
-                    'meta': post.get('meta', {})  # Include meta fields when context=edit
-                }
-                
-                # Add featured image if available
-                if ('_embedded' in post and 
-                    'wp:featuredmedia' in post['_embedded'] and 
-                    isinstance(post['_embedded']['wp:featuredmedia'], list) and 
-                    len(post['_embedded']['wp:featuredmedia']) > 0 and
-                    post['_embedded']['wp:featuredmedia'][0] is not None):
-                    featured_media = post['_embedded']['wp:featuredmedia'][0]
-                    processed_post['featured_image'] = {
-                        'id': featured_media.get('id'),
-                        'url': featured_media.get('source_url', ''),
-                        'alt': featured_media.get('alt_text', '')
-                    }
-                
-                return processed_post
+                post = json_codec.loads(response.content)
+                return self._process_post(post)
             else:
-                # Log the full error response
-                logger.error(f"Failed to get post. Status code: {response.status_code}")
-                logger.error(f"Response content: {response.text}")
+                # Status and size of the error response; the body is only logged at DEBUG
+                log_response(logger, f"Failed to get post {post_id}", response, level=logging.ERROR)
                 return None
             
         except Exception as e:
@@ -690,40 +1046,82 @@ class WordPressAPI:
             logger.exception("Full exception traceback:")
             return None
     
-    def get_categories(self):
-        """Get available categories from WordPress"""
+    def get_terms_page(self, taxonomy, page=1, per_page=100, etag=None, last_modified=None):
+        """
+        Get one page of categories or tags, as a conditional request when validators are given
+        :param taxonomy: 'categories' or 'tags'
+        :param page: Page number
+        :param per_page: Terms per page (WordPress allows up to 100)
+        :param etag: ETag from the last time this page was fetched
+        :param last_modified: Last-Modified value from the last time this page was fetched
+        :return: Dictionary with 'terms', 'total_pages', 'etag', 'last_modified', or
+                 {'not_modified': True} on 304, {'past_end': True} past the last page, None on error
+        """
         try:
-            endpoint = f"{self.api_url}/categories"
-            logger.info(f"Getting categories from: {endpoint}")
+            endpoint = f"{self.api_url}/{taxonomy}"
+            params = {
+                'per_page': per_page,
+                'page': page,
+                '_fields': 'id,name,slug,count,parent'
+            }
             
-            # Prepare headers with auth and standard headers
             headers = self.standard_headers.copy()
             headers.update(self.auth_header)
-            
-            # Make the request
-            response = requests.get(
-                endpoint,
-                headers=headers,
-                timeout=10
-            )
-            
-            # Log response details
-            logger.info(f"Categories response code: {response.status_code}")
-            
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+            
+            response = requests.get(endpoint, headers=headers, params=params, timeout=10)
+            logger.debug(f"{taxonomy} page {page} response code: {response.status_code}")
+            
+            if response.status_code == 304:
+                return {'not_modified': True}
+            if response.status_code == 400 and page > 1:
+                # WordPress answers rest_post_invalid_page_number past the last page
+                return {'past_end': True}
             if response.status_code == 200:
-                categories = response.json()
-                logger.info(f"Found {len(categories)} categories")
-                return categories
-            else:
-                # Log the full error response
-                logger.error(f"Failed to get categories. Status code: {response.status_code}")
-                logger.error(f"Response content: {response.text}")
-                return []
+                return {
+                    'terms': json_codec.loads(response.content),
+                    'total_pages': int(response.headers.get('X-WP-TotalPages', 1)),
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }
+            
+            log_response(logger, f"Failed to get {taxonomy}", response, level=logging.ERROR)
+            return None
             
+        except Exception as e:
+            logger.error(f"Error getting {taxonomy}: {str(e)}")
+            return None
+    
+    def get_categories(self, refresh=False, allow_stale=False):
+        """
+        Get all categories from WordPress, served from the taxonomy cache
+        :param refresh: Revalidate with the server even if the cache is fresh
+        :param allow_stale: Return cached categories of any age without a network call
+        :return: List of categories, empty list on error
+        """
+        try:
+            return self.taxonomies.get_terms('categories', refresh=refresh, allow_stale=allow_stale)
         except Exception as e:
             logger.error(f"Error getting categories: {str(e)}")
             logger.exception("Full exception traceback:")
             return []
+    
+    def get_tags(self, refresh=False, allow_stale=False):
+        """
+        Get all tags from WordPress, served from the taxonomy cache
+        :param refresh: Revalidate with the server even if the cache is fresh
+        :param allow_stale: Return cached tags of any age without a network call
+        :return: List of tags, empty list on error
+        """
+        try:
+            return self.taxonomies.get_terms('tags', refresh=refresh, allow_stale=allow_stale)
+        except Exception as e:
+            logger.error(f"Error getting tags: {str(e)}")
+            logger.exception("Full exception traceback:")
+            return []
             
     def test_meta_fields(self, post_id):
         """
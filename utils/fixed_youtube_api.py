@@ -2,6 +2,7 @@ from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import httplib2
 import logging
+import threading
 import time
 import random
 
@@ -9,6 +10,82 @@ import random
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Google recommends at most 50 calls per batch HTTP request
+BATCH_SIZE = 50
+
+QUOTA_MESSAGE = "YouTube API quota exceeded. Please try again tomorrow."
+
+HTTP_TIMEOUT = 30  # seconds
+
+# Partial-response masks: ask only for the fields we read
+SEARCH_FIELDS = 'items/id/videoId'
+VIDEO_STATUS_FIELDS = 'items(id,status(embeddable,privacyStatus))'
+
+# Built service objects, one per API key for the whole process
+_service_cache = {}
+_service_cache_lock = threading.Lock()
+
+# httplib2.Http is not thread-safe, so every thread gets its own connection pool
+_transport = threading.local()
+
+
+def _new_http():
+    return httplib2.Http(timeout=HTTP_TIMEOUT)
+
+
+def get_http():
+    """
+    Return the calling thread's HTTP transport, creating it on first use
+    The service object is shared between threads but its requests are always
+    executed with this per-thread transport, so concurrent lookups never share
+    a connection.
+    :return: httplib2.Http
+    """
+    http = getattr(_transport, 'http', None)
+    if http is None:
+        http = _new_http()
+        _transport.http = http
+    return http
+
+
+def get_youtube_service(api_key):
+    """
+    Return the YouTube service object for an API key, building it on first use
+    The client is built from the discovery document bundled with
+    google-api-python-client, so construction never goes to the network, and
+    the built service is reused by every YouTubeAPI instance in the process.
+    :param api_key: YouTube Data API v3 key
+    :return: googleapiclient Resource for youtube v3
+    """
+    with _service_cache_lock:
+        service = _service_cache.get(api_key)
+        if service is None:
+            started = time.perf_counter()
+            # Requests pass their own transport (see get_http), this one is only the default
+            http = _new_http()
+            service = build('youtube', 'v3', developerKey=api_key, http=http,
+                            static_discovery=True, cache_discovery=False)
+            _service_cache[api_key] = service
+            logger.info(f"Built YouTube client in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return service
+
+
+class YouTubeQuotaExceeded(Exception):
+    """
+    The daily quota ran out during a bulk lookup.
+    `results` holds the links found before that (query -> URL).
+    """
+
+    def __init__(self, results=None):
+        super().__init__(QUOTA_MESSAGE)
+        self.results = results or {}
+
+
+def _is_quota_error(error):
+    message = str(error)
+    return "quotaExceeded" in message or "quota exceeded" in message.lower()
+
+
 class YouTubeAPI:
     def __init__(self, api_key):
         """
@@ -19,23 +96,31 @@ class YouTubeAPI:
             raise ValueError("YouTube API key is required")
         
         self.api_key = api_key
-        # Create HTTP object with timeout
-        http = httplib2.Http(timeout=30)  # 30 second timeout
-        self.youtube = build('youtube', 'v3', developerKey=api_key, http=http)
+        self.youtube = get_youtube_service(api_key)
         self.quota_exceeded = False
+        # Cleared if the batch endpoint turns out to be unavailable
+        self.batch_supported = True
         self.last_request_time = 0
         self.min_request_interval = 0.1  # 100ms between requests
+        self._rate_limit_lock = threading.Lock()
     
     def _rate_limit(self):
         """Implement basic rate limiting to avoid hitting API limits"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+        # Threads sharing this client queue up here, keeping requests spaced out
+        with self._rate_limit_lock:
+            current_time = time.time()
+            time_since_last_request = current_time - self.last_request_time
+            
+            if time_since_last_request < self.min_request_interval:
+                sleep_time = self.min_request_interval - time_since_last_request
+                time.sleep(sleep_time)
+            
+            self.last_request_time = time.time()
+    
+    @staticmethod
+    def _execute(request):
+        """Execute an API request (or batch) on the calling thread's transport"""
+        return request.execute(http=get_http())
     
     def _retry_request(self, request_func, max_retries=3):
         """Retry API requests with exponential backoff"""
@@ -75,12 +160,14 @@ class YouTubeAPI:
         """
         try:
             def _make_test_request():
-                return self.youtube.videos().list(
-                    part='snippet',
+                # Cheapest possible call: one video ID and nothing else
+                return self._execute(self.youtube.videos().list(
+                    part='id',
                     chart='mostPopular',
                     maxResults=1,
-                    regionCode='US'
-                ).execute()
+                    regionCode='US',
+                    fields='items/id'
+                ))
             
             # Use retry logic for the API call
             response = self._retry_request(_make_test_request)
@@ -105,6 +192,43 @@ class YouTubeAPI:
             
             return False, f"API error: {error_message}"
 
+    @staticmethod
+    def _refine_query(search_query):
+        """Add context to a search query to get better matches for songs"""
+        if " - " in search_query or " – " in search_query:
+            # The search query already contains artist, just add "official music video"
+            return f"{search_query} official music video"
+        # Add some context for better results
+        return f"{search_query} music song"
+
+    def _search_request(self, query, relaxed=False):
+        """
+        Build (but don't execute) a search for the best matching video
+        Only the video ID is requested: the first result is used as is, so
+        the snippet (title, description, thumbnails) is never fetched.
+        :param query: Search text
+        :param relaxed: Drop the embeddable/high definition filters (fallback search)
+        :return: googleapiclient HttpRequest
+        """
+        if relaxed:
+            return self.youtube.search().list(
+                q=query,
+                part='id',
+                maxResults=1,
+                type='video',
+                fields=SEARCH_FIELDS
+            )
+        return self.youtube.search().list(
+            q=query,
+            part='id',
+            maxResults=1,
+            type='video',
+            videoEmbeddable='true',
+            safeSearch='moderate',
+            videoDefinition='high',
+            fields=SEARCH_FIELDS
+        )
+
     def get_video_link(self, search_query):
         """
         Search for a video and return its link with more specific search terms
@@ -115,43 +239,18 @@ class YouTubeAPI:
         if self.quota_exceeded:
             raise Exception("YouTube API quota exceeded. Please try again tomorrow.")
             
-        # Refine search query to get better matches for songs
-        if " - " in search_query or " – " in search_query:
-            # The search query already contains artist, just add "official music video"
-            refined_query = f"{search_query} official music video"
-        else:
-            # Add some context for better results
-            refined_query = f"{search_query} music song"
-
+        refined_query = self._refine_query(search_query)
         logger.info(f"Searching YouTube for: {refined_query}")
         
         try:
-            def _make_search_request():
-                return self.youtube.search().list(
-                    q=refined_query,
-                    part='id,snippet',
-                    maxResults=1,
-                    type='video',
-                    videoEmbeddable='true',
-                    safeSearch='moderate',
-                    videoDefinition='high'
-                ).execute()
-
-            search_response = self._retry_request(_make_search_request)
+            search_response = self._retry_request(lambda: self._execute(self._search_request(refined_query)))
 
             if not search_response.get('items'):
                 # Try a more relaxed search if no results found
                 logger.info(f"No results with refined query, trying original query: {search_query}")
-                
-                def _make_fallback_request():
-                    return self.youtube.search().list(
-                        q=search_query,  # Use original query
-                        part='id',
-                        maxResults=1,
-                        type='video'
-                    ).execute()
-                
-                search_response = self._retry_request(_make_fallback_request)
+                search_response = self._retry_request(
+                    lambda: self._execute(self._search_request(search_query, relaxed=True))
+                )
                 
                 if not search_response.get('items'):
                     logger.warning(f"No YouTube results found for: {search_query}")
@@ -172,4 +271,147 @@ class YouTubeAPI:
                 raise Exception("YouTube API quota exceeded. Please try again tomorrow.")
             
             # For other API errors, return empty string instead of failing
-            return ""
\ No newline at end of file
+            return ""
+    
+    def _execute_batch(self, requests):
+        """
+        Send several API calls in one batch HTTP request
+        :param requests: Dictionary of key -> HttpRequest
+        :return: Dictionary of key -> (response, exception) for every request
+        """
+        responses = {}
+        keys = {}
+        
+        def _callback(request_id, response, exception):
+            responses[keys[request_id]] = (response, exception)
+        
+        batch = self.youtube.new_batch_http_request(callback=_callback)
+        for number, (key, request) in enumerate(requests.items()):
+            keys[str(number)] = key
+            batch.add(request, request_id=str(number))
+        self._retry_request(lambda: self._execute(batch))
+        return responses
+
+    def _search_batch(self, queries, relaxed=False):
+        """
+        Run one search per query in a single batch request
+        :param queries: Up to BATCH_SIZE search queries
+        :param relaxed: Use the fallback search without filters
+        :return: (links, failed) - query -> URL for queries with a result ("" for none),
+                 and the queries whose individual call failed
+        :raises YouTubeQuotaExceeded: with the links found in this batch
+        """
+        requests = {
+            query: self._search_request(query if relaxed else self._refine_query(query), relaxed=relaxed)
+            for query in queries
+        }
+        responses = self._execute_batch(requests)
+        
+        links = {}
+        failed = []
+        quota_hit = False
+        for query in queries:
+            response, exception = responses.get(query, (None, None))
+            if exception is not None:
+                if _is_quota_error(exception):
+                    quota_hit = True
+                else:
+                    logger.warning(f"Batched YouTube search failed for '{query}': {str(exception)}")
+                    failed.append(query)
+                continue
+            items = (response or {}).get('items') or []
+            links[query] = f"https://www.youtube.com/watch?v={items[0]['id']['videoId']}" if items else ""
+        
+        if quota_hit:
+            self.quota_exceeded = True
+            raise YouTubeQuotaExceeded({query: link for query, link in links.items() if link})
+        return links, failed
+
+    def _verify_links(self, links):
+        """
+        Check found videos with videos.list (up to 50 IDs per call) and drop
+        ones that are gone or can't be embedded
+        :param links: Dictionary of query -> URL
+        :return: The same dictionary with unavailable videos replaced by ""
+        """
+        video_ids = {url.rsplit('v=', 1)[-1]: query for query, url in links.items() if url}
+        ids = list(video_ids)
+        available = set()
+        for start in range(0, len(ids), BATCH_SIZE):
+            chunk = ids[start:start + BATCH_SIZE]
+            response = self._retry_request(lambda: self._execute(self.youtube.videos().list(
+                id=",".join(chunk),
+                part='status',
+                maxResults=len(chunk),
+                fields=VIDEO_STATUS_FIELDS
+            )))
+            for item in response.get('items', []):
+                status = item.get('status', {})
+                if status.get('embeddable', True) and status.get('privacyStatus', 'public') != 'private':
+                    available.add(item['id'])
+        
+        verified = dict(links)
+        for video_id, query in video_ids.items():
+            if video_id not in available:
+                logger.info(f"YouTube video for '{query}' is no longer available")
+                verified[query] = ""
+        return verified
+
+    def get_video_links(self, search_queries, verify=False):
+        """
+        Look up videos for many songs, batching up to BATCH_SIZE searches per HTTP request
+        Falls back to one get_video_link call per song if batching is unavailable.
+        :param search_queries: Song and artist strings to search for
+        :param verify: Also confirm each video still exists and is embeddable
+        :return: Dictionary of query -> YouTube URL ("" if nothing was found)
+        :raises YouTubeQuotaExceeded: when the quota runs out; carries the links found so far
+        """
+        if self.quota_exceeded:
+            raise YouTubeQuotaExceeded()
+        
+        queries = list(dict.fromkeys(query for query in search_queries if query))
+        links = {}
+        try:
+            for start in range(0, len(queries), BATCH_SIZE):
+                chunk = queries[start:start + BATCH_SIZE]
+                retry_singly = []
+                
+                if self.batch_supported:
+                    try:
+                        found, retry_singly = self._search_batch(chunk)
+                        links.update(found)
+                        
+                        # Relaxed search for the songs the filtered search didn't match
+                        no_match = [query for query, link in found.items() if not link]
+                        if no_match:
+                            logger.info(f"No results for {len(no_match)} songs, trying original queries")
+                            relaxed, relaxed_failed = self._search_batch(no_match, relaxed=True)
+                            links.update(relaxed)
+                            retry_singly.extend(relaxed_failed)
+                    except YouTubeQuotaExceeded as e:
+                        links.update(e.results)
+                        raise
+                    except Exception as e:
+                        if _is_quota_error(e):
+                            raise
+                        if isinstance(e, HttpError):
+                            # The batch endpoint rejected the request - use single requests from now on
+                            self.batch_supported = False
+                        logger.warning(f"YouTube batch request failed, falling back to single requests: {str(e)}")
+                        retry_singly = [query for query in chunk if not links.get(query)]
+                else:
+                    retry_singly = chunk
+                
+                for query in retry_singly:
+                    links[query] = self.get_video_link(query)
+            
+            if verify:
+                links = self._verify_links(links)
+        except Exception as e:
+            if _is_quota_error(e):
+                self.quota_exceeded = True
+                raise YouTubeQuotaExceeded({query: link for query, link in links.items() if link})
+            raise
+        
+        logger.info(f"Found {sum(1 for link in links.values() if link)} of {len(queries)} YouTube videos")
+        return {query: links.get(query, "") for query in search_queries if query}
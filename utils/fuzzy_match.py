@@ -0,0 +1,183 @@
+"""
+Fuzzy matching of playlist names.
+Uses rapidfuzz (declared in pyproject.toml) and falls back to difflib when it is
+not installed. The fallback is slower and scores dissimilar names differently,
+but gives the same accept/reject decisions on the catalog's names.
+
+FuzzyIndex is built once over a list of names. Names are normalized so
+spelling variants compare equal ("Vol. 2", "Vol 2" and "(Volume 2)"; "&" and
+"and"), an inverted index of distinctive tokens narrows each lookup to the
+names sharing a word with the query, and candidates are ranked by a blend of
+token-set and token-sort similarity of their distinctive words.
+"""
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+logger = logging.getLogger(__name__)
+
+try:
+    from rapidfuzz import fuzz
+except ImportError:  # rapidfuzz is a dependency, but matching still works (slower) with difflib
+    fuzz = None
+
+# Words shared by (nearly) every playlist name; not used to find candidates
+COMMON_TOKENS = frozenset({'the', 'a', 'an', 'and', 'of', 'wedding', 'cocktail', 'hour', 'volume'})
+
+# Spellings of "volume" in playlist names
+VOLUME_TOKEN_PATTERN = re.compile(r'\b(?:vol|volume)\b\.?\s*(?=\d)')
+
+# "Surf’s" and "Surfs" are the same word
+APOSTROPHE_PATTERN = re.compile(r"['’‘`´]")
+
+NON_WORD_PATTERN = re.compile(r'[^\w\s]+')
+
+# Scores are lowered by this factor when the names carry different numbers,
+# so "Volume 2" never matches "Volume 3" however similar the rest is
+NUMBER_MISMATCH_FACTOR = 0.6
+
+
+def normalize_name(name):
+    """
+    Reduce a name to lowercase words without accents or punctuation
+    Example: 'The Yacht Rock Wedding Cocktail Hour (Vol. 2)' -> 'the yacht rock wedding cocktail hour volume 2'
+    :param name: Playlist name
+    :return: Normalized name
+    """
+    text = unicodedata.normalize('NFKD', str(name or ''))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+    text = APOSTROPHE_PATTERN.sub('', text).replace('&', ' and ')
+    text = VOLUME_TOKEN_PATTERN.sub('volume ', text)
+    text = NON_WORD_PATTERN.sub(' ', text)
+    return ' '.join(text.split())
+
+
+def distinctive_part(normalized):
+    """
+    Drop the words every playlist name shares
+    Example: 'the yacht rock wedding cocktail hour volume 2' -> 'yacht rock 2'
+    :param normalized: Normalized name
+    :return: Remaining words, or the whole name if nothing remains
+    """
+    return ' '.join(token for token in normalized.split() if token not in COMMON_TOKENS) or normalized
+
+
+def _ratio(a, b):
+    if fuzz is not None:
+        return fuzz.ratio(a, b)
+    return SequenceMatcher(None, a, b).ratio() * 100
+
+
+def token_sort_ratio(a, b):
+    """Similarity (0-100) of two normalized names with their words sorted"""
+    return _ratio(' '.join(sorted(a.split())), ' '.join(sorted(b.split())))
+
+
+def token_set_ratio(a, b):
+    """
+    Similarity (0-100) of two normalized names ignoring word order and duplicates;
+    100 when all words of one name appear in the other
+    """
+    if fuzz is not None:
+        return fuzz.token_set_ratio(a, b)
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    common = ' '.join(sorted(tokens_a & tokens_b))
+    rest_a = ' '.join(sorted(tokens_a - tokens_b))
+    rest_b = ' '.join(sorted(tokens_b - tokens_a))
+    combined_a = f"{common} {rest_a}".strip()
+    combined_b = f"{common} {rest_b}".strip()
+    scores = [_ratio(combined_a, combined_b)]
+    if common:
+        scores += [_ratio(common, combined_a), _ratio(common, combined_b)]
+    return max(scores)
+
+
+def _numbers(normalized):
+    # "Volume 1" is often left out of the first playlist's name, so 1 doesn't count
+    return {token for token in normalized.split() if token.isdigit()} - {'1'}
+
+
+def name_similarity(a, b):
+    """
+    Score (0-100) for how likely two normalized names are the same playlist
+    :param a: Normalized name
+    :param b: Normalized name
+    :return: Score; 100 for identical names
+    """
+    if a == b:
+        return 100.0
+    # Compare only the distinctive words: the shared "the ... wedding cocktail
+    # hour" would otherwise make every pair of names look alike
+    distinct_a, distinct_b = distinctive_part(a), distinctive_part(b)
+    # token_set alone scores 100 for "Indie" vs "Indie Volume 2", so blend in token_sort
+    score = (token_set_ratio(distinct_a, distinct_b) + token_sort_ratio(distinct_a, distinct_b)) / 2
+    if _numbers(a) != _numbers(b):
+        score *= NUMBER_MISMATCH_FACTOR
+    return score
+
+
+class FuzzyIndex:
+    """
+    Index over names for ranked fuzzy lookups
+    """
+
+    def __init__(self, entries):
+        """
+        :param entries: Iterable of (name, value) pairs; value is returned with matches
+        """
+        self.entries = []
+        self._exact = {}
+        self._postings = defaultdict(list)
+        for name, value in entries:
+            normalized = normalize_name(name)
+            position = len(self.entries)
+            self.entries.append((name, normalized, value))
+            self._exact.setdefault(normalized, position)
+            for token in set(normalized.split()) - COMMON_TOKENS:
+                self._postings[token].append(position)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def names(self):
+        """:return: Indexed names in insertion order"""
+        return [name for name, _, _ in self.entries]
+
+    def exact(self, query):
+        """
+        Look up a name that is equal after normalization
+        :param query: Name to look up
+        :return: (name, value), or None
+        """
+        position = self._exact.get(normalize_name(query))
+        if position is None:
+            return None
+        name, _, value = self.entries[position]
+        return name, value
+
+    def search(self, query, limit=5, min_score=0):
+        """
+        Rank indexed names by similarity to the query
+        :param query: Name to look up
+        :param limit: Maximum number of results
+        :param min_score: Drop results scoring below this (0-100)
+        :return: List of (name, score, value), best first
+        """
+        normalized = normalize_name(query)
+        candidates = set()
+        for token in set(normalized.split()) - COMMON_TOKENS:
+            candidates.update(self._postings.get(token, ()))
+        if not candidates:
+            # The query shares no distinctive word with any name: compare against all
+            candidates = range(len(self.entries))
+
+        results = []
+        for position in candidates:
+            name, entry_normalized, value = self.entries[position]
+            score = name_similarity(normalized, entry_normalized)
+            if score >= min_score:
+                results.append((name, score, value, position))
+        results.sort(key=lambda result: (-result[1], result[3]))
+        return [(name, score, value) for name, score, value, _ in results[:limit]]
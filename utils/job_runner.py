@@ -0,0 +1,232 @@
+"""
+In-process background job runner.
+
+Long operations (YouTube lookups, Spotify search, blog generation) are submitted
+as jobs to a shared thread pool. Jobs live in a process-wide table, so the
+Streamlit UI can rerun freely and reattach to a job by its ID.
+"""
+import logging
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+# Keep at most this many messages per job
+MAX_JOB_MESSAGES = 200
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class JobCancelled(BaseException):
+    """
+    Raised inside a job when it has been cancelled.
+    Derives from BaseException so the broad `except Exception` handlers in
+    processing code don't swallow it.
+    """
+
+
+class Job:
+    """
+    State of one background job. Updated by the worker thread, read by the UI.
+    """
+
+    def __init__(self, name):
+        """
+        :param name: Human readable job name
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.status = JOB_QUEUED
+        self.progress = 0.0
+        self.messages = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def add_message(self, level, text):
+        """
+        Record a message for the UI
+        :param level: 'info', 'success', 'warning' or 'error'
+        :param text: Message text
+        """
+        with self._lock:
+            self.messages.append((level, str(text)))
+            if len(self.messages) > MAX_JOB_MESSAGES:
+                del self.messages[:len(self.messages) - MAX_JOB_MESSAGES]
+
+    def set_progress(self, value):
+        """
+        Set job progress
+        :param value: Fraction between 0 and 1
+        """
+        self.progress = max(0.0, min(1.0, float(value)))
+
+    def cancel(self):
+        """Ask the job to stop at its next progress update"""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job has been cancelled"""
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    def snapshot(self):
+        """
+        Copy of the job state that is safe to render while the worker runs
+        :return: Dictionary of job fields
+        """
+        with self._lock:
+            messages = list(self.messages)
+        return {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'progress': self.progress,
+            'messages': messages,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class JobRunner:
+    """
+    Thread pool plus a table of submitted jobs
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        :param max_workers: Number of jobs that can run at the same time
+        """
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name, func, *args, **kwargs):
+        """
+        Run func(job, *args, **kwargs) in the background
+        :param name: Human readable job name
+        :param func: Callable taking the Job as its first argument; its return value becomes job.result
+        :return: Job ID
+        """
+        job = Job(name)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, func, args, kwargs)
+        logger.info(f"Submitted job {job.id}: {name}")
+        return job.id
+
+    def _run(self, job, func, args, kwargs):
+        if job.cancelled:
+            job.status = JOB_CANCELLED
+            job.finished_at = time.time()
+            return
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = func(job, *args, **kwargs)
+            job.set_progress(1.0)
+            job.status = JOB_DONE
+        except JobCancelled:
+            job.status = JOB_CANCELLED
+            job.add_message('warning', "Job cancelled")
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.name}) failed: {str(e)}")
+            job.error = f"{str(e)}\n{traceback.format_exc()}"
+            job.status = JOB_FAILED
+        finally:
+            job.finished_at = time.time()
+            logger.info(f"Job {job.id} finished with status {job.status}")
+
+    def get(self, job_id):
+        """
+        Look up a job
+        :param job_id: Job ID returned by submit()
+        :return: Job, or None if unknown
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self, job_ids=None):
+        """
+        List jobs, newest first
+        :param job_ids: Only return these jobs (optional)
+        :return: List of Job objects
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if job_ids is not None:
+            wanted = set(job_ids)
+            jobs = [job for job in jobs if job.id in wanted]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id):
+        """
+        Cancel a job; a running job stops at its next progress update
+        :param job_id: Job ID
+        :return: True if the job exists and was not finished
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel()
+        return True
+
+    def clear_finished(self, job_ids=None):
+        """
+        Drop finished jobs from the table
+        :param job_ids: Only consider these jobs (optional)
+        :return: Number of jobs removed
+        """
+        with self._lock:
+            finished = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished and (job_ids is None or job_id in job_ids)
+            ]
+            for job_id in finished:
+                del self._jobs[job_id]
+        return len(finished)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner(max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Return the process-wide job runner, creating it on first use
+    The runner outlives Streamlit reruns and sessions.
+    :param max_workers: Pool size used when the runner is first created
+    :return: JobRunner
+    """
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner(max_workers=max_workers)
+        return _runner
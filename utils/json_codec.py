@@ -0,0 +1,101 @@
+"""
+JSON encoding and decoding with orjson (declared in pyproject.toml).
+Falls back to the standard library json module when orjson is not installed.
+"""
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # orjson is a dependency, but the stdlib encoder still works without it
+    orjson = None
+
+# A complete JSON string literal, including escaped quotes
+STRING_TOKEN_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+
+
+def loads(data):
+    """
+    Decode a JSON document
+    :param data: JSON text as str or bytes
+    :return: Decoded Python object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj):
+    """
+    Encode an object as compact JSON text (no spaces after separators)
+    Non-ASCII characters are escaped like encode_string, so stored meta JSON
+    keeps its \\uXXXX form. orjson can only write raw UTF-8, so this always
+    uses the stdlib encoder.
+    :param obj: Object to encode
+    :return: JSON string
+    """
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def dumps_bytes(obj):
+    """
+    Encode an object as compact UTF-8 JSON, ready to send as a request body
+    :param obj: Object to encode
+    :return: JSON bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def encode_string(value):
+    """
+    Encode a single string as a JSON string literal for splicing into JSON text
+    Non-ASCII characters are escaped, matching how WordPress stores meta JSON
+    :param value: String to encode
+    :return: JSON string literal including the surrounding quotes
+    """
+    return json.dumps(value)
+
+
+def find_string_value(json_text, key, start=0, level=1):
+    """
+    Find the string value of the first `key` that belongs to the object open at `start`
+
+    Scans string tokens from `start`, tracking bracket depth between them, and
+    only accepts the key `level` levels below the starting object (for Elementor
+    widgets, level 1 is the "settings" object and level 0 the widget itself).
+    Scanning stops when the starting object closes.
+
+    :param json_text: JSON text to scan
+    :param key: Object key to look for
+    :param start: Offset of a token inside the object to search
+    :param level: Nesting depth of the key relative to the starting object
+    :return: (start, end) span of the value's string literal, or None if not found
+    """
+    depth = 0
+    pos = start
+    expect_value = False
+    for match in STRING_TOKEN_PATTERN.finditer(json_text, start):
+        gap = json_text[pos:match.start()]
+        for char in gap:
+            if char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+                if depth < 0:
+                    return None
+        pos = match.end()
+
+        if expect_value:
+            # The key was followed by ':' and this token is its value
+            if gap.strip() == ':':
+                return match.start(), match.end()
+            expect_value = False
+
+        if depth == level and match.group(0)[1:-1] == key:
+            expect_value = True
+    return None
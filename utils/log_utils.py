@@ -0,0 +1,150 @@
+"""
+Logging helpers for request/response payloads.
+
+Hot paths log a one-line size summary at INFO. The full pretty-printed body is
+only serialized when DEBUG is enabled for the logger, so large Elementor
+payloads cost nothing to log in normal runs.
+"""
+import json
+import logging
+import threading
+
+# Strings up to this length are logged as-is in summaries, longer ones by size
+MAX_INLINE_CHARS = 60
+
+# Header values that must never reach the logs
+REDACTED_HEADERS = ('authorization', 'cookie', 'set-cookie')
+
+
+def format_size(num_chars):
+    """
+    Format a character or byte count for humans
+    :param num_chars: Count to format
+    :return: String like '512 B', '12.3 KB' or '1.4 MB'
+    """
+    if num_chars < 1024:
+        return f"{num_chars} B"
+    if num_chars < 1024 * 1024:
+        return f"{num_chars / 1024:.1f} KB"
+    return f"{num_chars / (1024 * 1024):.1f} MB"
+
+
+def _summarize_value(value):
+    if isinstance(value, str):
+        if len(value) <= MAX_INLINE_CHARS:
+            return repr(value)
+        return format_size(len(value))
+    if isinstance(value, (list, tuple)):
+        return f"{len(value)} items"
+    if isinstance(value, dict):
+        return f"{len(value)} keys"
+    return repr(value)
+
+
+def payload_summary(payload):
+    """
+    Summarize a JSON payload by field size instead of content
+    Nested dictionaries (e.g. 'meta') are summarized one level deep.
+    :param payload: Dictionary about to be sent or just received
+    :return: String like "title='...', content=12.3 KB, meta._elementor_data=210.5 KB"
+    """
+    if not isinstance(payload, dict):
+        return _summarize_value(payload)
+    parts = []
+    for key, value in payload.items():
+        if isinstance(value, dict) and value:
+            for sub_key, sub_value in value.items():
+                parts.append(f"{key}.{sub_key}={_summarize_value(sub_value)}")
+        else:
+            parts.append(f"{key}={_summarize_value(value)}")
+    return ", ".join(parts)
+
+
+def redact_headers(headers):
+    """
+    Copy headers with credentials replaced
+    :param headers: Request or response headers
+    :return: Dictionary safe to log
+    """
+    return {
+        key: '[REDACTED]' if key.lower() in REDACTED_HEADERS else value
+        for key, value in dict(headers or {}).items()
+    }
+
+
+def log_payload(log, label, payload, level=logging.INFO):
+    """
+    Log a size summary of a payload, and the full body only at DEBUG
+    :param log: Logger to write to
+    :param label: Short description, e.g. 'Update request for post 42'
+    :param payload: Dictionary being sent or received
+    :param level: Level for the summary line
+    """
+    if log.isEnabledFor(level):
+        log.log(level, f"{label}: {payload_summary(payload)}")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(f"{label} body: {json.dumps(payload, indent=2, default=str)}")
+
+
+def log_response(log, label, response, level=logging.INFO):
+    """
+    Log status and body size of an HTTP response; headers and body only at DEBUG
+    :param log: Logger to write to
+    :param label: Short description of the request
+    :param response: requests.Response object
+    :param level: Level for the summary line
+    """
+    if log.isEnabledFor(level):
+        size = len(response.content) if response.content is not None else 0
+        elapsed = getattr(response, 'elapsed', None)
+        timing = f" in {elapsed.total_seconds():.2f}s" if elapsed is not None else ""
+        log.log(level, f"{label}: HTTP {response.status_code}, {format_size(size)}{timing}")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(f"{label} headers: {redact_headers(response.headers)}")
+        log.debug(f"{label} body: {response.text[:2000]}")
+
+
+class LogSampler:
+    """
+    Let through the first occurrence of a message key and then every Nth one.
+    Used for messages that repeat per post or per rerun.
+    """
+
+    def __init__(self, every=20):
+        """
+        :param every: Log one in this many occurrences after the first
+        """
+        self.every = max(1, every)
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def should_log(self, key):
+        """
+        Count an occurrence of key and decide whether to log it
+        :param key: Message identifier
+        :return: True for the first occurrence and every Nth after it
+        """
+        return (self._increment(key) - 1) % self.every == 0
+
+    def _increment(self, key):
+        with self._lock:
+            count = self._counts.get(key, 0) + 1
+            self._counts[key] = count
+        return count
+
+    def log(self, log, key, message, level=logging.INFO):
+        """
+        Log a message if the sampler lets it through, noting how many were suppressed
+        :param log: Logger to write to
+        :param key: Message identifier used for counting
+        :param message: Message text
+        :param level: Log level
+        """
+        if not log.isEnabledFor(level):
+            return
+        count = self._increment(key)
+        if (count - 1) % self.every:
+            return
+        if count > 1:
+            message = f"{message} (seen {count} times)"
+        log.log(level, message)
@@ -1,10 +1,16 @@
 import os
 import re
+import html
 from openai import OpenAI
 import trafilatura
 import logging
 import streamlit as st
 from utils.secrets_manager import get_secret
+from utils.token_budget import count_tokens, truncate_to_tokens
+from utils.song_extractor import extract_songs_from_html
+from utils.song_identity import query_groups
+from utils.parsing import (SPOTIFY_IFRAME_PATTERN, SPOTIFY_ANCHOR_PATTERN, SPOTIFY_URL_PATTERN,
+                           SPOTIFY_PLAYLIST_ID_PATTERN, is_youtube_url)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -13,81 +19,13 @@ logger = logging.getLogger(__name__)
 # Updated to use standard OpenAI API with GPT-4o (since Gemini integration is having issues)
 # This is a temporary fallback to ensure functionality
 
-def extract_songs_from_html(html_content):
-    """
-    Extract song information from an existing blog post HTML content
-    Returns a list of dictionaries with song and artist information
-    """
-    try:
-        # First, attempt to find linked songs with safer regex (limit backtracking)
-        # Using possessive quantifiers and atomic groups to prevent ReDoS
-        song_pattern = r'<a[^>]*?href="([^"]*?)"[^>]*?>((?:[^<]|<(?!/a>))*?)(?:–|&ndash;|&#8211;|\s*-\s*)((?:[^<]|<(?!/a>))*?)</a>|(?:<p>|<li>)((?:[^<–&\s-]|[^<–&\s-][^–&\s-]*?[^<–&\s-]){1,100})(?:–|&ndash;|&#8211;|\s*-\s*)((?:[^<]|<(?!/p>|/li>))*?)(?:</p>|</li>)'
-        matches = list(re.finditer(song_pattern, html_content, re.IGNORECASE | re.DOTALL))
-        
-        # Second pattern to look for song names in plain paragraphs (not in links)
-        # Limit string length to prevent excessive backtracking
-        plain_pattern = r'<p>([^<]{2,50}?)\s+by\s+([^<]{2,50}?)<\/p>'
-        plain_matches = list(re.finditer(plain_pattern, html_content, re.IGNORECASE | re.DOTALL))
-        
-        songs = []
-        for match in matches:
-            if match.group(1):  # Link match
-                youtube_link = match.group(1).strip()
-                song = match.group(2).strip()
-                artist = match.group(3).strip()
-                songs.append({
-                    'Song': song,
-                    'Artist': artist,
-                    'YouTube_Link': youtube_link if ('youtube.com' in youtube_link or 'youtu.be' in youtube_link) else ''
-                })
-            elif match.group(4):  # Text-only match
-                song = match.group(4).strip()
-                artist = match.group(5).strip()
-                songs.append({
-                    'Song': song, 
-                    'Artist': artist,
-                    'YouTube_Link': ''
-                })
-        
-        # Process additional "song by artist" mentions
-        for match in plain_matches:
-            if match.group(1) and match.group(2):
-                song = match.group(1).strip()
-                artist = match.group(2).strip()
-                
-                # Check if this song is already in our list
-                exists = False
-                for existing in songs:
-                    if existing['Song'].lower() == song.lower() and existing['Artist'].lower() == artist.lower():
-                        exists = True
-                        break
-                
-                # Add if it's a new song
-                if not exists:
-                    songs.append({
-                        'Song': song,
-                        'Artist': artist,
-                        'YouTube_Link': ''
-                    })
-        
-        # Filter out any false positives (very short song names, etc.)
-        valid_songs = [s for s in songs if len(s['Song']) > 2 and len(s['Artist']) > 2]
-        
-        logger.info(f"Extracted {len(valid_songs)} songs from HTML content")
-        return valid_songs
-    
-    except Exception as e:
-        logger.error(f"Error extracting songs from HTML: {str(e)}")
-        return []
-
 def extract_spotify_link(html_content):
     """Extract Spotify playlist link from blog post content"""
     try:
         # Check for multiple possible Spotify link formats
         
         # 1. Try finding iframe embed first (most common in WordPress posts)
-        iframe_pattern = r'<iframe[^>]*src="(https://open\.spotify\.com/embed/playlist/[^"]+)"[^>]*>'
-        iframe_match = re.search(iframe_pattern, html_content)
+        iframe_match = SPOTIFY_IFRAME_PATTERN.search(html_content)
         if iframe_match:
             spotify_url = iframe_match.group(1)
             # Convert embed URL to regular URL if needed
@@ -96,14 +34,12 @@ def extract_spotify_link(html_content):
             return spotify_url
         
         # 2. Regular anchor link (fallback)
-        anchor_pattern = r'<a[^>]*href="(https://open\.spotify\.com/[^"]*)"[^>]*>'
-        match = re.search(anchor_pattern, html_content)
+        match = SPOTIFY_ANCHOR_PATTERN.search(html_content)
         if match:
             return match.group(1)
         
         # 3. Last resort: just look for URLs directly
-        url_pattern = r'(https://open\.spotify\.com/playlist/[a-zA-Z0-9]+)'
-        url_match = re.search(url_pattern, html_content)
+        url_match = SPOTIFY_URL_PATTERN.search(html_content)
         if url_match:
             return url_match.group(1)
             
@@ -126,8 +62,7 @@ def extract_spotify_playlist_id(spotify_url):
         # - https://open.spotify.com/playlist/37i9dQZF1DXdPec7aLTmlC
         # - https://open.spotify.com/playlist/37i9dQZF1DXdPec7aLTmlC?si=abc123
         # - spotify:playlist:37i9dQZF1DXdPec7aLTmlC
-        pattern = r'(?:spotify:playlist:|spotify\.com/playlist/)([a-zA-Z0-9]{22})'
-        match = re.search(pattern, spotify_url)
+        match = SPOTIFY_PLAYLIST_ID_PATTERN.search(spotify_url)
         
         if match:
             return match.group(1)
@@ -138,15 +73,203 @@ def extract_spotify_playlist_id(spotify_url):
         logger.error(f"Error extracting Spotify playlist ID: {str(e)}")
         return None
 
-def revamp_existing_blog(post_content, post_title, youtube_api=None, style_options=None, spotify_api=None):
+# Model used for revamping existing posts
+REVAMP_MODEL = "gpt-4o"
+
+# Default token budget for the whole revamp prompt (system + user message)
+DEFAULT_REVAMP_PROMPT_BUDGET = 3000
+
+# Upper bound for the original post text included as reference
+REVAMP_CONTENT_TOKEN_CAP = 750
+
+# Static prompt parts are kept byte-identical between calls and placed before any
+# post-specific text so provider-side prompt caching can reuse the shared prefix
+REVAMP_SYSTEM_PROMPT = """You are an expert wedding DJ and blog writer for Moments & Memories, a premium wedding DJ company.
+
+Your writing style has these key characteristics:
+- Professional yet conversational tone that speaks directly to engaged couples
+- Clear section headings that divide content into readable chunks
+- Expert insights about music selection for different wedding moments
+- Proper HTML formatting with h2, h3, p tags, and well-structured content
+- Engaging descriptions that evoke the atmosphere created by each music section
+- Thoughtful song selections with YouTube links for couples to preview
+- Clean, visually appealing formatting similar to existing blog posts
+
+Your task is to revamp an existing blog post to match the premium brand voice
+of Moments & Memories, which balances professional expertise with warm, personal engagement.
+Maintain the original intent and key songs, but enhance the structure, formatting, and phrasing."""
+
+REVAMP_INSTRUCTIONS = """Revamp the existing wedding blog post described below to match our new format and style.
+
+Please rewrite the blog post following these guidelines:
+
+1. Format and HTML Structure:
+- Main title: Already provided by WordPress (don't include an H1 tag)
+- Subtitle: Use an <h3> tag with the text "Your Perfect Soundtrack for Love, Laughter, and Celebration"
+- Introduction: Use proper <p> tags for an engaging opening about the playlist's mood and purpose (2-3 paragraphs)
+- 4-5 themed sections with catchy titles, each with:
+    * <h2> tag for section titles like "Find Great Vibes from Day One" or "Smooth Moves That Elevate the Fun"
+    * <p> tags for paragraphs explaining why these songs work well together
+    * List the extracted songs with <p> tags for each song, using the song markers
+- Conclusion: <h2> tag for "Why This Playlist Works for Your Wedding" with <p> tags for content
+- Call to action: <h2> tag for "Listen to the Complete Playlist" that includes the Spotify playlist link if available
+
+2. HTML Style Guidelines:
+- Use proper HTML tags: <h2> for section headers, <h3> for subtitles, <p> for paragraphs
+- Each song is listed with a marker such as [[SONG_1]]; write each song as its marker alone in a paragraph: <p>[[SONG_1]]</p>
+- Do not write song names, artist names or links for the listed songs yourself - the markers are replaced with linked song titles afterwards
+- Add proper spacing between sections using line breaks
+- If Spotify link exists, format as:
+  * First add text link: <p><strong>Listen to the full playlist: </strong><a href="SPOTIFY_LINK" target="_blank">Spotify Playlist</a></p>
+  * Then add embedded player: <iframe src="https://open.spotify.com/embed/playlist/PLAYLIST_ID" width="100%" height="380" frameborder="0" allowtransparency="true" allow="encrypted-media"></iframe>
+- Add a class to important elements: class="highlight-section" for key section headers
+- Make sure all HTML is properly structured and WordPress-compatible
+
+3. Content Style Guidelines:
+- Preserve the core theme and focus of the original post but enhance the wording and structure
+- Conversational and warm tone like an expert wedding DJ
+- Focus on creating atmosphere and emotional moments for each section
+- Blend practical details with romantic storytelling
+- Keep each section concise but meaningful (3-4 paragraphs max per section)
+- Use compelling descriptive language that evokes mood and setting
+
+IMPORTANT FORMATTING RULES:
+- DO NOT include opening or closing HTML tags like <html>, </html> or ```html
+- DO NOT wrap your response in quotation marks or any markdown code blocks
+- Start directly with the H3 subtitle and end with the final paragraph
+- Do not include any stray characters, quotes, or HTML comments"""
+
+# Songs are referenced in prompts by stable markers; links are swapped in after generation
+SONG_MARKER_PATTERN = re.compile(r'\[\[\s*SONG_(\d+)\s*\]\]')
+
+def song_marker(index):
+    """Return the placeholder used for the song at a 1-based index"""
+    return f"[[SONG_{index}]]"
+
+def format_songs_for_prompt(songs, start=1):
     """
-    Revamp an existing blog post to match current format and style
+    Format songs as prompt lines: "[[SONG_1]] Song – Artist"
+    No URLs are sent; inject_song_links() replaces the markers afterwards
+    """
+    return "\n".join(
+        f"{song_marker(i)} {s['Song']} – {s['Artist']}"
+        for i, s in enumerate(songs, start=start)
+    )
+
+def add_missing_song_markers(content, count):
+    """
+    Make sure every song marker appears in the generated content
+    
+    The LLM sometimes skips songs. Any marker it left out is added as its own
+    paragraph right after the paragraph holding the last marker it did write
+    (or at the end of the post if it wrote none), so no song is silently lost.
+    :param content: Generated HTML containing song markers
+    :param count: Number of songs that were listed in the prompt
+    :return: (content, missing) tuple; missing is the list of 1-based indices that were added
+    """
+    matches = [m for m in SONG_MARKER_PATTERN.finditer(content) if 1 <= int(m.group(1)) <= count]
+    seen = {int(m.group(1)) for m in matches}
+    missing = [index for index in range(1, count + 1) if index not in seen]
+    if not missing:
+        return content, missing
+    
+    logger.warning(f"Generated content is missing {len(missing)} of {count} songs "
+                   f"({', '.join(song_marker(i) for i in missing)}); adding them after the song list")
+    
+    if matches:
+        position = matches[-1].end()
+        paragraph_end = content.find('</p>', position)
+        if paragraph_end != -1:
+            position = paragraph_end + len('</p>')
+    else:
+        position = len(content)
+    
+    insert = "".join(f"\n<p>{song_marker(i)}</p>" for i in missing)
+    return content[:position] + insert + content[position:], missing
+
+def inject_song_links(content, songs):
+    """
+    Replace [[SONG_n]] markers with the song text, linked to its YouTube video when available
+    Songs whose markers the LLM left out are added after the last song that was written
+    :param content: Generated HTML containing song markers
+    :param songs: List of song dictionaries (Song, Artist, YouTube_Link) in marker order
+    :return: HTML with every marker replaced and every song present
+    """
+    def _replace(match):
+        index = int(match.group(1))
+        if index < 1 or index > len(songs):
+            logger.warning(f"Dropping unknown song marker: {match.group(0)}")
+            return ""
+        song = songs[index - 1]
+        label = html.escape(f"{song['Song']} – {song['Artist']}", quote=False)
+        youtube_link = str(song.get('YouTube_Link') or '').strip()
+        if is_youtube_url(youtube_link):
+            return f'<a href="{html.escape(youtube_link)}" target="_blank">{label}</a>'
+        return label
+    
+    content, _ = add_missing_song_markers(content, len(songs))
+    return SONG_MARKER_PATTERN.sub(_replace, content)
+
+def build_revamp_prompt(post_title, plain_content, songs, spotify_link=None, style_options=None,
+                        token_budget=DEFAULT_REVAMP_PROMPT_BUDGET, model=REVAMP_MODEL):
+    """
+    Build the user prompt for revamp_existing_blog within a token budget
+    
+    The static instructions come first, followed by the post-specific details.
+    Songs are always kept; the original post text is trimmed to whatever budget remains.
+    :param post_title: Title of the original post
+    :param plain_content: Plain-text version of the original post
+    :param songs: List of song dictionaries (Song, Artist, YouTube_Link)
+    :param spotify_link: Spotify playlist link, if known
+    :param style_options: Dictionary with tone, mood and audience
+    :param token_budget: Maximum tokens for the system prompt plus this user prompt
+    :param model: Model name used for token counting
+    :return: The user prompt string
+    """
+    style_options = style_options or {}
+    tone = style_options.get('tone', 'Professional')
+    mood = style_options.get('mood', 'Elegant')
+    audience = style_options.get('audience', 'Modern Couples')
+    
+    header = f"""{REVAMP_INSTRUCTIONS}
+
+Style Guidelines:
+- Tone: {tone}
+- Mood: {mood}
+- Target Audience: {audience}
+
+Original Post Title: {post_title}
+
+Spotify Link: {spotify_link or "Not found in original content"}
+
+Extracted Songs:
+"""
+    content_label = "\n\nOriginal Post Content (plain text for reference):\n"
+    
+    songs_text = format_songs_for_prompt(songs)
+    fixed_tokens = count_tokens(REVAMP_SYSTEM_PROMPT + header + content_label, model)
+    
+    remaining = token_budget - fixed_tokens - count_tokens(songs_text, model)
+    content_tokens = min(REVAMP_CONTENT_TOKEN_CAP, max(0, remaining))
+    reference_text = truncate_to_tokens(plain_content, content_tokens, model) if plain_content else ""
+    if not reference_text:
+        reference_text = "No plain text content available"
+    
+    prompt = f"{header}{songs_text}{content_label}{reference_text}"
+    
+    total_tokens = count_tokens(REVAMP_SYSTEM_PROMPT, model) + count_tokens(prompt, model)
+    logger.info(f"Revamp prompt: {total_tokens} tokens (budget {token_budget}, {len(songs)} songs)")
+    if total_tokens > token_budget:
+        logger.warning(f"Revamp prompt exceeds the token budget by {total_tokens - token_budget} tokens")
+    
+    return prompt
+
+def collect_revamp_songs(post_content, spotify_api=None):
+    """
+    Collect the songs and Spotify playlist for a post that is being revamped
     :param post_content: HTML content from WordPress post
-    :param post_title: Title of the blog post
-    :param youtube_api: Optional YouTube API client to fetch missing links
-    :param style_options: Dictionary of style options to customize the blog post (tone, mood, audience, etc.)
     :param spotify_api: Optional Spotify API client to fetch fresh playlist data
-    :return: Revamped blog post content in HTML format
+    :return: (songs, spotify_link, spotify_playlist_id) tuple
     """
     # Extract songs and Spotify link from the existing content
     extracted_songs = extract_songs_from_html(post_content)
@@ -191,6 +314,14 @@ def revamp_existing_blog(post_content, post_title, youtube_api=None, style_optio
                 logger.error(f"Error fetching Spotify playlist data: {str(e)}")
                 logger.info(f"Using {len(extracted_songs)} extracted songs as fallback")
     
+    return songs, spotify_link, spotify_playlist_id
+
+def extract_plain_text(post_content):
+    """
+    Reduce post HTML to plain text for the revamp prompt
+    :param post_content: HTML content from WordPress post
+    :return: Plain text content
+    """
     # Clean the content by removing HTML tags to get plain text for analysis
     try:
         # Check if post_content is a string
@@ -204,7 +335,6 @@ def revamp_existing_blog(post_content, post_title, youtube_api=None, style_optio
             # Fallback if trafilatura extraction fails
             # Use regex to strip HTML tags as a backup
             logger.info("Trafilatura extraction returned None or empty. Using regex fallback to clean HTML.")
-            import re
             plain_content = re.sub(r'<[^>]+>', ' ', post_content)
             # Remove extra whitespace
             plain_content = re.sub(r'\s+', ' ', plain_content).strip()
@@ -218,114 +348,83 @@ def revamp_existing_blog(post_content, post_title, youtube_api=None, style_optio
         # Failsafe - use the original content if extraction fails
         plain_content = post_content if isinstance(post_content, str) else str(post_content)
     
-    # Fetch YouTube links for songs if they're missing and YouTube API is provided
-    if youtube_api and songs:
-        logger.info(f"Found {len(songs)} songs, checking for missing YouTube links...")
-        songs_missing_links = [s for s in songs if not s['YouTube_Link']]
+    return plain_content
+
+def fill_youtube_links(songs, youtube_api):
+    """
+    Look up YouTube links for songs that don't have one yet (updates songs in place)
+    :param songs: List of song dictionaries with Song, Artist and YouTube_Link
+    :param youtube_api: YouTube API client
+    :return: True if the YouTube quota ran out before every song was looked up
+    """
+    if not youtube_api or not songs:
+        return False
+    
+    logger.info(f"Found {len(songs)} songs, checking for missing YouTube links...")
+    songs_missing_links = [s for s in songs if not s['YouTube_Link']]
+    
+    if songs_missing_links:
+        logger.info(f"Fetching YouTube links for {len(songs_missing_links)} songs...")
         
-        if songs_missing_links:
-            logger.info(f"Fetching YouTube links for {len(songs_missing_links)} songs...")
-            
-            for i, song in enumerate(songs_missing_links):
-                try:
-                    # Create a search query combining song and artist
-                    search_query = f"{song['Song']} - {song['Artist']}"
-                    
-                    # Get YouTube link with error handling
-                    youtube_link = youtube_api.get_video_link(search_query)
-                    
-                    # Update the link in the songs list
-                    if youtube_link:
-                        # Find this song in the original songs list and update it
-                        for s in songs:
-                            if s['Song'] == song['Song'] and s['Artist'] == song['Artist']:
-                                s['YouTube_Link'] = youtube_link
-                                break
-                        
-                        logger.info(f"Found YouTube link for '{search_query}': {youtube_link}")
-                    else:
-                        logger.warning(f"No YouTube link found for '{search_query}'")
-                        
-                except Exception as e:
-                    # Handle YouTube API errors gracefully
-                    if "quota" in str(e).lower():
-                        logger.warning("YouTube API quota exceeded. Stopping YouTube link fetching.")
-                        break
-                    else:
-                        query = f"{song['Song']} - {song['Artist']}"
-                        logger.warning(f"Could not fetch YouTube link for '{query}': {str(e)}")
+        # One search query per distinct song, even if the post lists it twice
+        groups = query_groups((song, song['Song'], song['Artist']) for song in songs_missing_links)
+        queries = [query for query, _ in groups.values()]
+        quota_hit = False
+        try:
+            # One batched lookup for all songs
+            links = youtube_api.get_video_links(queries)
+        except Exception as e:
+            # Handle YouTube API errors gracefully
+            if "quota" not in str(e).lower():
+                logger.warning(f"Could not fetch YouTube links: {str(e)}")
+                return False
+            logger.warning("YouTube API quota exceeded. Stopping YouTube link fetching.")
+            # Keep whatever was found before the quota ran out
+            links = getattr(e, 'results', {})
+            quota_hit = True
+        
+        for search_query, same_songs in groups.values():
+            youtube_link = links.get(search_query)
+            if youtube_link:
+                for song in same_songs:
+                    song['YouTube_Link'] = youtube_link
+                logger.info(f"Found YouTube link for '{search_query}': {youtube_link}")
+            elif not quota_hit:
+                logger.warning(f"No YouTube link found for '{search_query}'")
+        return quota_hit
     
+    return False
+
+def generate_revamped_content(post_title, plain_content, songs, spotify_link=None,
+                              spotify_playlist_id=None, style_options=None):
+    """
+    Ask the LLM for the revamped post and fill in song links and Spotify placeholders
+    :param post_title: Title of the blog post
+    :param plain_content: Plain text of the existing post
+    :param songs: List of song dictionaries with Song, Artist and YouTube_Link
+    :param spotify_link: Spotify playlist URL, if the post has one
+    :param spotify_playlist_id: Spotify playlist ID, if the post has one
+    :param style_options: Dictionary of style options to customize the blog post
+    :return: Revamped blog post content in HTML format
+    """
     # Initialize OpenAI client
     client = OpenAI(api_key=get_secret("OPENAI_API_KEY"))
     
-    # Prepare extracted song information in a readable format
-    songs_list = "\n".join([f"{s['Song']} – {s['Artist']} | YouTube Link: {s['YouTube_Link'] or 'None'}" for s in songs])
-    
     # Initialize default style options if not provided
     if style_options is None:
         style_options = {}
     
-    # Extract style parameters with defaults
-    tone = style_options.get('tone', 'Professional')
-    mood = style_options.get('mood', 'Elegant')
-    audience = style_options.get('audience', 'Modern Couples')
-    
-    prompt = f"""
-    Revamp this existing wedding blog post to match our new format and style.
-    
-    Original Post Title: {post_title}
-    
-    Original Post Content (plain text for reference):
-    {plain_content[:3000] if plain_content else "No plain text content available"}
-    
-    Extracted Songs:
-    {songs_list}
-    
-    Spotify Link: {spotify_link or "Not found in original content"}
-    
-    Style Guidelines:
-    - Tone: {tone}
-    - Mood: {mood}
-    - Target Audience: {audience}
-    
-    Please rewrite this blog post following these guidelines:
-    
-    1. Format and HTML Structure:
-    - Main title: Already provided by WordPress (don't include an H1 tag)
-    - Subtitle: Use an <h3> tag with the text "Your Perfect Soundtrack for Love, Laughter, and Celebration"
-    - Introduction: Use proper <p> tags for an engaging opening about the playlist's mood and purpose (2-3 paragraphs)
-    - 4-5 themed sections with catchy titles, each with:
-        * <h2> tag for section titles like "Find Great Vibes from Day One" or "Smooth Moves That Elevate the Fun" 
-        * <p> tags for paragraphs explaining why these songs work well together
-        * List the extracted songs with <p> tags for each song, including their YouTube links when available
-    - Conclusion: <h2> tag for "Why This Playlist Works for Your Wedding" with <p> tags for content
-    - Call to action: <h2> tag for "Listen to the Complete Playlist" that includes the Spotify playlist link if available
-    
-    2. HTML Style Guidelines:
-    - Use proper HTML tags: <h2> for section headers, <h3> for subtitles, <p> for paragraphs
-    - For song links, format as: <p><a href="YOUTUBE_LINK" target="_blank">SONG NAME – ARTIST NAME</a></p>
-    - Add proper spacing between sections using line breaks
-    - If Spotify link exists, format as: 
-      * First add text link: <p><strong>Listen to the full playlist: </strong><a href="SPOTIFY_LINK" target="_blank">Spotify Playlist</a></p>
-      * Then add embedded player: <iframe src="https://open.spotify.com/embed/playlist/PLAYLIST_ID" width="100%" height="380" frameborder="0" allowtransparency="true" allow="encrypted-media"></iframe>
-        (where PLAYLIST_ID is extracted from the Spotify link - it's the part after "playlist/" in the URL)
-    - Add a class to important elements: class="highlight-section" for key section headers
-    - Make sure all HTML is properly structured and WordPress-compatible
-    
-    3. Content Style Guidelines:
-    - Preserve the core theme and focus of the original post but enhance the wording and structure
-    - Conversational and warm tone like an expert wedding DJ
-    - Focus on creating atmosphere and emotional moments for each section
-    - Blend practical details with romantic storytelling
-    - Keep each section concise but meaningful (3-4 paragraphs max per section)
-    - Use compelling descriptive language that evokes mood and setting
-    
-    IMPORTANT FORMATTING RULES:
-    - DO NOT include opening or closing HTML tags like <html>, </html> or ```html
-    - DO NOT wrap your response in quotation marks or any markdown code blocks
-    - Start directly with the H3 subtitle and end with the final paragraph
-    - Do not include any stray characters, quotes, or HTML comments
-    """
+    # Assemble the prompt within the configured token budget
+    token_budget = style_options.get('prompt_token_budget', DEFAULT_REVAMP_PROMPT_BUDGET)
+    prompt = build_revamp_prompt(
+        post_title=post_title,
+        plain_content=plain_content,
+        songs=songs,
+        spotify_link=spotify_link,
+        style_options=style_options,
+        token_budget=token_budget,
+        model=REVAMP_MODEL
+    )
     
     try:
         # Debug API key (only showing if it exists, not the actual value)
@@ -339,25 +438,9 @@ def revamp_existing_blog(post_content, post_title, youtube_api=None, style_optio
         # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
         # do not change this unless explicitly requested by the user
         response = client.chat.completions.create(
-            model="gpt-4o",
+            model=REVAMP_MODEL,
             messages=[
-                {
-                    "role": "system",
-                    "content": """You are an expert wedding DJ and blog writer for Moments & Memories, a premium wedding DJ company.
-                    
-                    Your writing style has these key characteristics:
-                    - Professional yet conversational tone that speaks directly to engaged couples
-                    - Clear section headings that divide content into readable chunks
-                    - Expert insights about music selection for different wedding moments
-                    - Proper HTML formatting with h2, h3, p tags, and well-structured content
-                    - Engaging descriptions that evoke the atmosphere created by each music section
-                    - Thoughtful song selections with YouTube links for couples to preview
-                    - Clean, visually appealing formatting similar to existing blog posts
-                    
-                    Your task is to revamp an existing blog post to match the premium brand voice
-                    of Moments & Memories, which balances professional expertise with warm, personal engagement.
-                    Maintain the original intent and key songs, but enhance the structure, formatting, and phrasing."""
-                },
+                {"role": "system", "content": REVAMP_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             max_tokens=3000,
@@ -377,6 +460,9 @@ def revamp_existing_blog(post_content, post_title, youtube_api=None, style_optio
         # Remove any surrounding quotes but preserve HTML tags
         content = content.strip('"\'')
         
+        # Swap the song markers for linked song titles
+        content = inject_song_links(content, songs)
+        
         # Replace PLAYLIST_ID with actual Spotify playlist ID if available
         if spotify_playlist_id:
             # Replace the PLAYLIST_ID placeholder with the actual ID in the iframe
@@ -398,6 +484,31 @@ def revamp_existing_blog(post_content, post_title, youtube_api=None, style_optio
         logger.error(f"Error generating revamped content: {str(e)}")
         raise Exception(f"Failed to revamp blog post: {str(e)}")
 
+def revamp_existing_blog(post_content, post_title, youtube_api=None, style_options=None, spotify_api=None):
+    """
+    Revamp an existing blog post to match current format and style
+    :param post_content: HTML content from WordPress post
+    :param post_title: Title of the blog post
+    :param youtube_api: Optional YouTube API client to fetch missing links
+    :param style_options: Dictionary of style options to customize the blog post (tone, mood, audience, etc.)
+    :param spotify_api: Optional Spotify API client to fetch fresh playlist data
+    :return: Revamped blog post content in HTML format
+    """
+    songs, spotify_link, spotify_playlist_id = collect_revamp_songs(post_content, spotify_api)
+    plain_content = extract_plain_text(post_content)
+    
+    # Fetch YouTube links for songs if they're missing and YouTube API is provided
+    fill_youtube_links(songs, youtube_api)
+    
+    return generate_revamped_content(
+        post_title=post_title,
+        plain_content=plain_content,
+        songs=songs,
+        spotify_link=spotify_link,
+        spotify_playlist_id=spotify_playlist_id,
+        style_options=style_options
+    )
+
 def generate_blog_post(playlist_name, songs_df, spotify_link=None, 
                   style_options=None):
     """
@@ -424,31 +535,17 @@ def generate_blog_post(playlist_name, songs_df, spotify_link=None,
     total_songs = len(songs_df)
     songs_per_section = min(5, max(3, total_songs // 4))
 
-    # Prepare song sections - always use YouTube links for individual songs
-    sections = []
-    for i in range(0, total_songs, songs_per_section):
-        section_songs = songs_df.iloc[i:i + songs_per_section]
-        songs_list = []
-        
-        for _, row in section_songs.iterrows():
-            song = row['Song']
-            artist = row['Artist']
-            youtube_link = row['YouTube_Link']
-            
-            # Only use YouTube links (not Spotify) for individual songs
-            if youtube_link and str(youtube_link).strip():
-                # Check if YouTube link is valid and contains youtube.com
-                if 'youtube.com' in str(youtube_link) or 'youtu.be' in str(youtube_link):
-                    # Format using HTML for better WordPress compatibility
-                    songs_list.append(f'<p><a href="{youtube_link}" target="_blank">{song} – {artist}</a></p>')
-                else:
-                    songs_list.append(f'<p>{song} – {artist}</p>')
-            else:
-                songs_list.append(f'<p>{song} – {artist}</p>')
-                
-        sections.append("\n".join(songs_list))
+    # Prepare song sections - songs are referenced by markers, links are injected afterwards
+    songs = [
+        {'Song': row['Song'], 'Artist': row['Artist'], 'YouTube_Link': row['YouTube_Link']}
+        for _, row in songs_df.iterrows()
+    ]
+    sections = [
+        format_songs_for_prompt(songs[i:i + songs_per_section], start=i + 1)
+        for i in range(0, total_songs, songs_per_section)
+    ]
 
-    sections_text = "\n\n".join(f"Section {i+1} - Songs for the {['Opening', 'Middle', 'Peak', 'Wind-down', 'Finale'][i % 5]} Phase:\n{songs}" for i, songs in enumerate(sections))
+    sections_text = "\n\n".join(f"Section {i+1} - Songs for the {['Opening', 'Middle', 'Peak', 'Wind-down', 'Finale'][i % 5]} Phase:\n{section}" for i, section in enumerate(sections))
 
     prompt = f"""
     Create a wedding DJ blog post for the playlist "{clean_name}" following this exact structure and HTML format:
@@ -461,7 +558,7 @@ def generate_blog_post(playlist_name, songs_df, spotify_link=None,
     2. 3-5 Themed Sections:
     - For each section, create an <h2> heading with a catchy title describing the mood/theme
     - Write 1-2 paragraphs explaining why these songs work well together
-    - List the songs from each section including YouTube links when available
+    - List the songs from each section, each as its marker alone in a paragraph (e.g. <p>[[SONG_1]]</p>)
 
     3. Conclusion:
     - <h2> heading: "Why This Playlist Works for Your Wedding"
@@ -493,7 +590,7 @@ def generate_blog_post(playlist_name, songs_df, spotify_link=None,
     HTML Formatting Guidelines:
     - Start content directly with the H3 subtitle (no HTML or body tags)
     - Use <h3> for subtitle, <h2> for section headers, <p> for paragraphs
-    - For song links, format as: <p><a href="YouTube_Link" target="_blank">Song Name – Artist Name</a></p>
+    - Write each song only as its marker, e.g. <p>[[SONG_1]]</p> - do not write song names or links yourself, they are filled in afterwards
     - Add proper spacing between sections using empty lines
     - If Spotify link exists, format as: 
       <p><strong>Listen to the full playlist:</strong> <a href="{spotify_link}" target="_blank">Spotify Playlist</a></p>
@@ -567,6 +664,9 @@ def generate_blog_post(playlist_name, songs_df, spotify_link=None,
         # Remove any quotes that might be wrapping the content
         blog_post = blog_post.strip('"\'')
         
+        # Swap the song markers for linked song titles
+        blog_post = inject_song_links(blog_post, songs)
+        
         # If we have a Spotify playlist ID, replace any instances of PLAYLIST_ID in iframes
         if spotify_playlist_id:
             blog_post = blog_post.replace('PLAYLIST_ID', spotify_playlist_id)
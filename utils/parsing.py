@@ -0,0 +1,62 @@
+"""
+Shared URL and playlist name parsing.
+
+All patterns are compiled once at import time, and playlist name cleaning goes
+through a single memoized normalizer so every part of the app strips the
+numeric prefix the same way.
+"""
+import re
+from functools import lru_cache
+
+# Numeric prefix used for playlist headers in the catalog CSV ("001 The ...")
+NUMERIC_PREFIX_PATTERN = re.compile(r'^\d{3}\s+')
+
+# Full playlist header row in the catalog CSV, capturing the name after the prefix
+PLAYLIST_HEADER_PATTERN = re.compile(r'^\d{3}\s+(.+)$')
+
+# Suffix shared by all cocktail hour playlists
+PLAYLIST_SUFFIX = 'Wedding Cocktail Hour'
+
+# Spotify playlist embed iframe in post HTML
+SPOTIFY_IFRAME_PATTERN = re.compile(r'<iframe[^>]*src="(https://open\.spotify\.com/embed/playlist/[^"]+)"[^>]*>')
+
+# Any anchor pointing at open.spotify.com
+SPOTIFY_ANCHOR_PATTERN = re.compile(r'<a[^>]*href="(https://open\.spotify\.com/[^"]*)"[^>]*>')
+
+# Bare playlist URL anywhere in the text
+SPOTIFY_URL_PATTERN = re.compile(r'(https://open\.spotify\.com/playlist/[a-zA-Z0-9]+)')
+
+# Playlist ID from a playlist URL or a spotify:playlist: URI
+SPOTIFY_PLAYLIST_ID_PATTERN = re.compile(r'(?:spotify:playlist:|spotify\.com/playlist/)([a-zA-Z0-9]{22})')
+
+# YouTube watch, short and embed links
+YOUTUBE_URL_PATTERN = re.compile(r'youtube\.com|youtu\.be')
+
+
+@lru_cache(maxsize=4096)
+def normalize_playlist_name(playlist_name):
+    """
+    Remove the numeric prefix from a playlist name
+    Example: '006 The Smooth Sail Wedding Cocktail Hour' -> 'The Smooth Sail Wedding Cocktail Hour'
+    :param playlist_name: Playlist name as it appears in the catalog CSV
+    :return: Name without the prefix, or "" for None
+    """
+    if playlist_name is None:
+        return ""
+    return NUMERIC_PREFIX_PATTERN.sub('', str(playlist_name).strip()).strip()
+
+
+@lru_cache(maxsize=4096)
+def playlist_base_name(playlist_name):
+    """
+    Return the distinctive part of a playlist name, without prefix or suffix
+    Example: '006 The Smooth Sail Wedding Cocktail Hour' -> 'The Smooth Sail'
+    :param playlist_name: Playlist name as it appears in the catalog CSV
+    :return: Name with the numeric prefix and "Wedding Cocktail Hour" removed
+    """
+    return normalize_playlist_name(playlist_name).split(PLAYLIST_SUFFIX)[0].strip()
+
+
+def is_youtube_url(url):
+    """Return True if the URL points at YouTube"""
+    return bool(url) and YOUTUBE_URL_PATTERN.search(url) is not None
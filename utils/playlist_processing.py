@@ -0,0 +1,329 @@
+"""
+Playlist processing without Streamlit: YouTube links, Spotify playlist lookup
+and blog generation for playlists in the catalog DataFrame.
+
+PlaylistProcessor holds the DataFrame and API clients and reports progress
+through a ProgressReporter (see utils/progress.py), so the same code runs in
+the Streamlit script, in background jobs and from the command line.
+"""
+import glob
+import logging
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from utils.corrected_csv_handler import save_csv
+from utils.openai_api import generate_blog_post
+from utils.parsing import normalize_playlist_name, playlist_base_name
+from utils.progress import ProgressReporter
+from utils.song_identity import SongIndex, query_groups
+
+logger = logging.getLogger(__name__)
+
+# Operation names accepted by PlaylistProcessor.process
+OPERATIONS = ("YouTube", "Spotify", "Blog")
+
+# Playlists processed concurrently update the same catalog DataFrame in place;
+# this lock keeps their DataFrame.update() and CSV writes from interleaving
+CATALOG_LOCK = threading.Lock()
+
+# Songs looked up per YouTube batch request (and per progress update)
+YOUTUBE_CHUNK_SIZE = 50
+
+# The DJ's Spotify account, used when SPOTIFY_USER_ID is not set
+DEFAULT_SPOTIFY_USER_ID = "bm8eje5tcjj9eazftizqoikwm"
+
+
+def find_latest_csv():
+    """Find the most recently modified CSV file from previous sessions"""
+    # Look for processed CSV files
+    csv_files = glob.glob("processed_playlists_*.csv")
+    
+    if not csv_files:
+        return None
+    
+    # Get file with the latest modification time
+    latest_file = max(csv_files, key=os.path.getmtime)
+    return latest_file
+
+
+def save_processed_csv(df, operation_type):
+    """
+    Save CSV with timestamp and operation type
+    :return: Filename
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"processed_playlists_{operation_type}_{timestamp}.csv"
+    save_csv(df, filename)
+    return filename
+
+
+def save_blog_post(playlist_name, blog_content, title):
+    """Save blog post to a file for persistence between sessions"""
+    # Create blogs directory if it doesn't exist
+    if not os.path.exists("blogs"):
+        os.makedirs("blogs")
+    
+    # Clean the playlist name for use in filename (no "001 " prefix or suffix)
+    clean_name = playlist_base_name(playlist_name)
+    clean_name = "".join([c if c.isalnum() or c.isspace() else "_" for c in clean_name]).strip()
+    
+    # Create filename with timestamp
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"blogs/{clean_name}_{timestamp}.html"
+    
+    # Save blog as HTML with title
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(f"<h1>{title}</h1>\n\n{blog_content}")
+    
+    return filename
+
+
+def select_playlists(df, selectors):
+    """
+    Pick playlists from the catalog by full name or by numeric prefix
+    :param df: Catalog DataFrame
+    :param selectors: List like ['001', '002'] or full playlist names
+    :return: Matching playlist names in catalog order
+    """
+    playlists = list(df['Playlist'].unique())
+    if not selectors:
+        return playlists
+    selected = []
+    for playlist in playlists:
+        name = str(playlist)
+        for selector in selectors:
+            selector = selector.strip()
+            if name == selector or (selector.isdigit() and name.startswith(selector.zfill(3) + " ")):
+                selected.append(playlist)
+                break
+    return selected
+
+
+class PlaylistProcessor:
+    """
+    Fetches links and generates blog posts for playlists in the catalog DataFrame
+    """
+
+    def __init__(self, df, youtube_api=None, spotify_api=None, style_options=None, df_lock=None,
+                 spotify_user_id=None):
+        """
+        :param df: Catalog DataFrame, updated in place with new links
+        :param youtube_api: YouTubeAPI instance (optional)
+        :param spotify_api: SpotifyAPI instance (optional)
+        :param style_options: Blog style options
+        :param df_lock: Lock guarding df updates and CSV writes (default: CATALOG_LOCK)
+        :param spotify_user_id: Spotify account to search (default: SPOTIFY_USER_ID env var)
+        """
+        self.df = df
+        self.youtube_api = youtube_api
+        self.spotify_api = spotify_api
+        self.style_options = style_options or {}
+        self.df_lock = df_lock or CATALOG_LOCK
+        self.spotify_user_id = spotify_user_id or os.getenv("SPOTIFY_USER_ID", DEFAULT_SPOTIFY_USER_ID)
+
+    def _merge(self, playlist_df, operation_type=None):
+        """
+        Copy a playlist's rows back into the catalog, optionally saving a CSV
+        :return: Saved filename, or None
+        """
+        with self.df_lock:
+            self.df.update(playlist_df)
+            if operation_type:
+                return save_processed_csv(self.df, operation_type)
+        return None
+
+    def fetch_youtube_links(self, playlist_df, reporter):
+        """
+        Look up YouTube links for songs that don't have one
+        :param playlist_df: Copy of the playlist's rows, updated in place
+        :param reporter: ProgressReporter
+        :return: Number of songs that were missing a link (0 if nothing to do)
+        """
+        # Check if we need to fetch YouTube links
+        missing = (playlist_df['YouTube_Link'].isna()) | (playlist_df['YouTube_Link'] == '')
+        total_songs = int(missing.sum())
+        
+        if not total_songs:
+            reporter.info("ℹ️ All songs already have YouTube links")
+            return 0
+        
+        # Songs already linked in another playlist (under any spelling) need no search
+        with self.df_lock:
+            reused = SongIndex(self.df).propagate_youtube_links(playlist_df)
+        if reused:
+            reporter.info(f"♻️ Reused {reused} YouTube links from other playlists")
+        
+        missing_links = playlist_df[
+            (playlist_df['YouTube_Link'].isna()) | 
+            (playlist_df['YouTube_Link'] == '')
+        ]
+        if missing_links.empty:
+            return total_songs
+        
+        # One search per distinct song; its link goes to every row of that song
+        groups = query_groups(zip(missing_links.index, missing_links['Song'], missing_links['Artist']))
+        queries = list(groups.values())
+        total_queries = len(queries)
+        with reporter.stage('youtube', f"Fetching YouTube links for {total_queries} songs...", total=total_queries):
+            # Each chunk is looked up with one batch request
+            for start in range(0, total_queries, YOUTUBE_CHUNK_SIZE):
+                chunk = queries[start:start + YOUTUBE_CHUNK_SIZE]
+                quota_hit = False
+                try:
+                    links = self.youtube_api.get_video_links([query for query, _ in chunk])
+                except Exception as e:
+                    if "quota" not in str(e).lower():
+                        reporter.warning(f"⚠️ Could not fetch YouTube links: {str(e)}")
+                        continue
+                    # Keep whatever was found before the quota ran out
+                    links = getattr(e, 'results', {})
+                    quota_hit = True
+                
+                # Update the links in the dataframe (only where we got a valid link)
+                for query, indices in chunk:
+                    if links.get(query):
+                        playlist_df.loc[indices, 'YouTube_Link'] = links[query]
+                
+                if quota_hit:
+                    reporter.warning("⚠️ YouTube API quota exceeded. Please try again tomorrow.")
+                    break
+                reporter.advance(min(start + len(chunk), total_queries), total_queries)
+        return total_songs
+
+    def fetch_spotify_link(self, playlist, reporter):
+        """
+        Find the playlist on Spotify
+        :param playlist: Playlist name as it appears in the catalog
+        :param reporter: ProgressReporter
+        :return: Spotify playlist URL, or None
+        """
+        with reporter.stage('spotify', "🎧 Fetching Spotify playlist link..."):
+            try:
+                # Clean the playlist name for Spotify search - just use one cleaning method
+                # Don't clean it twice as that can cause too much difference from actual Spotify names
+                spotify_clean_name = normalize_playlist_name(playlist)
+                
+                reporter.info(f"Searching for Spotify playlist: '{spotify_clean_name}'")
+                return self.spotify_api.get_playlist_link(self.spotify_user_id, spotify_clean_name)
+            except Exception as e:
+                reporter.error(f"Error with Spotify API: {str(e)}")
+                return None
+
+    def generate_blog(self, playlist, playlist_df, spotify_link, reporter):
+        """
+        Generate and save a blog post for a playlist
+        :param playlist: Playlist name as it appears in the catalog
+        :param playlist_df: The playlist's rows
+        :param spotify_link: Spotify playlist URL (falls back to the link stored in the DataFrame)
+        :param reporter: ProgressReporter
+        :return: Dictionary with 'blog_post', 'blog_title' and 'blog_file'
+        """
+        with reporter.stage('blog', "✍️ Generating blog post..."):
+            # If we don't have a link from the API, check if there's one in the DataFrame
+            if not spotify_link and 'Spotify_Link' in playlist_df.columns:
+                # Get the first non-empty Spotify link
+                spotify_links = playlist_df[
+                    (playlist_df['Spotify_Link'].notna()) & 
+                    (playlist_df['Spotify_Link'] != '')
+                ]['Spotify_Link']
+                
+                if not spotify_links.empty:
+                    spotify_link = spotify_links.iloc[0]
+            
+            # Clean the playlist name for the blog post (remove numeric prefix)
+            clean_name = normalize_playlist_name(playlist)
+            
+            blog_post = generate_blog_post(
+                playlist_name=clean_name,
+                songs_df=playlist_df,
+                spotify_link=spotify_link,
+                style_options=self.style_options
+            )
+            
+            # Generate a default title for the blog post
+            title_base = playlist_base_name(clean_name)
+            default_title = f"The {title_base} Wedding Cocktail Hour"
+            
+            # Save the blog post to a file
+            saved_file = save_blog_post(
+                playlist_name=playlist,
+                blog_content=blog_post,
+                title=default_title
+            )
+        return {'blog_post': blog_post, 'blog_title': default_title, 'blog_file': saved_file}
+
+    def process(self, playlist, operations, reporter=None):
+        """
+        Process a single playlist with error handling and progress tracking
+        :param playlist: Playlist name as it appears in the catalog
+        :param operations: Any of "YouTube", "Spotify", "Blog"
+        :param reporter: ProgressReporter (default: reports nothing)
+        :return: (success, results dictionary)
+        """
+        reporter = reporter or ProgressReporter()
+        try:
+            # Filter dataframe to get only the songs for this playlist
+            with self.df_lock:
+                playlist_df = self.df[self.df['Playlist'] == playlist].copy()
+            results = {}
+            save_updates = False
+            
+            if "YouTube" in operations and self.youtube_api:
+                if self.fetch_youtube_links(playlist_df, reporter):
+                    results['youtube_file'] = self._merge(playlist_df, "youtube")
+                    save_updates = True
+                    reporter.success("✅ YouTube links fetched and saved")
+            
+            if "Spotify" in operations and self.spotify_api:
+                spotify_link = self.fetch_spotify_link(playlist, reporter)
+                if spotify_link:
+                    results['spotify_link'] = spotify_link
+                    
+                    # Save Spotify link to the DataFrame for all songs in this playlist
+                    playlist_df['Spotify_Link'] = spotify_link
+                    self._merge(playlist_df)
+                    save_updates = True
+                    reporter.success("✅ Spotify playlist found and saved to CSV")
+                else:
+                    reporter.warning("⚠️ Spotify playlist not found")
+            
+            # Save changes to CSV if we made updates
+            if save_updates:
+                with self.df_lock:
+                    results['updated_file'] = save_processed_csv(self.df, "updated")
+            
+            if "Blog" in operations:
+                results.update(self.generate_blog(playlist, playlist_df, results.get('spotify_link'), reporter))
+                reporter.success("✅ Blog post generated and saved")
+            
+            return True, results
+        
+        except Exception as e:
+            reporter.error(f"❌ Error processing playlist: {str(e)}")
+            reporter.error(traceback.format_exc())
+            return False, {}
+
+    def process_many(self, playlists, operations, reporter_factory=None, concurrency=1):
+        """
+        Process several playlists, concurrently when concurrency > 1
+        :param playlists: Playlist names
+        :param operations: Any of "YouTube", "Spotify", "Blog"
+        :param reporter_factory: Callable taking a playlist name and returning its ProgressReporter
+        :param concurrency: Number of playlists processed at the same time
+        :return: List of (playlist, success, results, seconds) in input order
+        """
+        def run_one(playlist):
+            reporter = reporter_factory(playlist) if reporter_factory else None
+            started = time.perf_counter()
+            success, results = self.process(playlist, operations, reporter)
+            return playlist, success, results, time.perf_counter() - started
+        
+        if concurrency <= 1:
+            return [run_one(playlist) for playlist in playlists]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(run_one, playlists))
+
@@ -0,0 +1,201 @@
+"""
+Progress reporters for processing code.
+
+Processing code (PlaylistProcessor, background jobs, the CLI) reports what it
+is doing through a ProgressReporter and never calls Streamlit directly. Each
+front end supplies its own reporter: StreamlitReporter draws widgets,
+ConsoleReporter prints lines, JobReporter records onto a background job and
+RecordingReporter keeps the events in a list.
+"""
+import sys
+import threading
+from contextlib import contextmanager
+
+# Message levels understood by every reporter
+LEVELS = ('info', 'success', 'warning', 'error')
+
+# Shared by all console reporters so lines from concurrent playlists don't interleave
+_console_lock = threading.Lock()
+
+
+class ProgressReporter:
+    """
+    Base reporter. Subclasses override the event methods they care about;
+    the defaults ignore everything, so this class doubles as a null reporter.
+
+    Events:
+        stage_started(stage, label, total)  a step such as 'youtube' begins
+        advance(done, total)                 done of total items in the current stage
+        stage_finished(stage)                the step ended (successfully or not)
+        message(level, text)                 a status line for the user
+    """
+
+    def stage_started(self, stage, label, total=None):
+        pass
+
+    def advance(self, done, total):
+        pass
+
+    def stage_finished(self, stage):
+        pass
+
+    def message(self, level, text):
+        pass
+
+    @contextmanager
+    def stage(self, stage, label, total=None):
+        """
+        Context manager that reports the start and end of a stage
+        :param stage: Stage key, e.g. 'youtube', 'spotify', 'blog'
+        :param label: Text shown to the user while the stage runs
+        :param total: Number of items, when the stage reports per-item progress
+        """
+        self.stage_started(stage, label, total)
+        try:
+            yield self
+        finally:
+            self.stage_finished(stage)
+
+    def info(self, text):
+        self.message('info', text)
+
+    def success(self, text):
+        self.message('success', text)
+
+    def warning(self, text):
+        self.message('warning', text)
+
+    def error(self, text):
+        self.message('error', text)
+
+
+class StreamlitReporter(ProgressReporter):
+    """
+    Draws messages, progress bars and spinners with Streamlit.
+    Only usable from the Streamlit script thread.
+    """
+
+    def __init__(self):
+        import streamlit as st
+        self.st = st
+        self._bar = None
+
+    @contextmanager
+    def stage(self, stage, label, total=None):
+        if total:
+            # Counted stages get a progress bar
+            with super().stage(stage, label, total):
+                yield self
+        else:
+            with self.st.spinner(label):
+                yield self
+
+    def stage_started(self, stage, label, total=None):
+        if total:
+            self.st.write(label)
+            self._bar = self.st.progress(0)
+
+    def advance(self, done, total):
+        if self._bar is not None and total:
+            self._bar.progress(min(1.0, done / total))
+
+    def stage_finished(self, stage):
+        self._bar = None
+
+    def message(self, level, text):
+        getattr(self.st, level if level in LEVELS else 'info')(text)
+
+
+class ConsoleReporter(ProgressReporter):
+    """
+    Prints to a stream, for the command line. Safe to share between threads.
+    """
+
+    def __init__(self, prefix="", stream=None):
+        """
+        :param prefix: Text put in front of every line (e.g. the playlist name)
+        :param stream: Output stream (default: stdout)
+        """
+        self.prefix = f"[{prefix}] " if prefix else ""
+        self.stream = stream or sys.stdout
+        self._last_step = -1
+
+    def _print(self, text):
+        with _console_lock:
+            self.stream.write(f"{self.prefix}{text}\n")
+            self.stream.flush()
+
+    def stage_started(self, stage, label, total=None):
+        self._last_step = -1
+        self._print(label)
+
+    def advance(self, done, total):
+        # Print at most every 10%
+        step = int(done * 10 / total) if total else 10
+        if step != self._last_step:
+            self._last_step = step
+            self._print(f"{done}/{total}")
+
+    def message(self, level, text):
+        if level in ('warning', 'error'):
+            text = f"{level.upper()}: {text}"
+        self._print(text)
+
+
+class JobReporter(ProgressReporter):
+    """
+    Records messages and progress on a background job (see utils/job_runner.py)
+    and stops the work when the job is cancelled.
+    """
+
+    def __init__(self, job):
+        """
+        :param job: job_runner.Job to report on
+        """
+        self.job = job
+
+    def stage_started(self, stage, label, total=None):
+        self.job.check_cancelled()
+        self.job.add_message('info', label)
+
+    def advance(self, done, total):
+        self.job.check_cancelled()
+        if total:
+            self.job.set_progress(done / total)
+
+    def message(self, level, text):
+        self.job.add_message(level, text)
+
+
+class RecordingReporter(ProgressReporter):
+    """
+    Keeps every event as a tuple in self.events, e.g. ('message', 'warning', text)
+    """
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def _record(self, *event):
+        with self._lock:
+            self.events.append(event)
+
+    def stage_started(self, stage, label, total=None):
+        self._record('stage_started', stage, label, total)
+
+    def advance(self, done, total):
+        self._record('advance', done, total)
+
+    def stage_finished(self, stage):
+        self._record('stage_finished', stage)
+
+    def message(self, level, text):
+        self._record('message', level, text)
+
+    def messages(self, level=None):
+        """
+        :param level: Only return messages of this level (optional)
+        :return: List of message texts
+        """
+        return [event[2] for event in self.events
+                if event[0] == 'message' and (level is None or event[1] == level)]
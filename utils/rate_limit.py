@@ -0,0 +1,161 @@
+"""
+Client-side rate limiting, retry backoff and circuit breaking for API clients.
+
+RateLimiter spaces out requests from every thread that shares it and can be
+paused as a whole when the server sends Retry-After. CircuitBreaker stops
+calls for a while after repeated failures, so a batch fails fast with a clear
+error while the service is degraded instead of retrying every item.
+"""
+import email.utils
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """
+    Exponential backoff with full jitter
+    :param attempt: Number of the failed attempt, starting at 0
+    :param base: Delay ceiling for the first retry, in seconds
+    :param cap: Largest delay ceiling, in seconds
+    :return: Seconds to wait before the next attempt
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header
+    :param value: Header value, either seconds or an HTTP date
+    :return: Seconds to wait, or None if the value is missing or invalid
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all threads using one API
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        :param rate: Requests per second allowed on average
+        :param burst: Requests allowed at once after a quiet period (default: rate)
+        """
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Hold back every caller, e.g. for the server's Retry-After
+        :param seconds: How long no request may be sent
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit breaker is open"""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"{name} is unavailable after repeated failures; retrying in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and rejects calls for
+    reset_timeout seconds. After that one trial call is let through: success
+    closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=60):
+        """
+        :param name: Service name used in errors and logs
+        :param failure_threshold: Consecutive failures that open the breaker
+        :param reset_timeout: Seconds to reject calls before trying again
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None
+
+    def before_call(self):
+        """
+        Check whether a call may go ahead
+        :raises CircuitOpenError: if the breaker is open
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            retry_in = self._opened_at + self.reset_timeout - time.monotonic()
+            if retry_in > 0 or self._trial_running:
+                raise CircuitOpenError(self.name, max(retry_in, 0))
+            self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"{self.name} recovered, closing circuit breaker")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def release_trial(self):
+        """End a trial call without counting it as a success or a failure"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or (self._opened_at is None and self._failures >= self.failure_threshold):
+                logger.warning(f"{self.name} failed {self._failures} times in a row, "
+                               f"pausing calls for {self.reset_timeout}s")
+                self._opened_at = time.monotonic()
+            self._trial_running = False
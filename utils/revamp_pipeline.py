@@ -0,0 +1,589 @@
+"""
+Headless batch revamp of existing WordPress posts.
+
+Each post moves through fetch -> extract -> enrich -> revamp -> update. Every
+stage has its own queue and a small pool of worker threads, so while one post
+waits on the LLM the next one is already being fetched. Posts that are waiting
+for the update stage together are written in one WordPress batch request
+(e.g. when a job is resumed after the revamp stage). Progress is written to
+a SQLite job store after every stage, so a crash or a YouTube quota stop can be
+resumed later without repeating finished work.
+
+Usage:
+    python -m utils.revamp_pipeline --posts 101 102 103
+    python -m utils.revamp_pipeline --category 5
+    python -m utils.revamp_pipeline --resume <job_id>
+"""
+import argparse
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils.openai_api import (collect_revamp_songs, extract_plain_text, fill_youtube_links,
+                              generate_revamped_content)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "revamp_jobs.sqlite"
+
+# Stages in the order every post passes through them
+STAGES = ['fetch', 'extract', 'enrich', 'revamp', 'update']
+
+# Worker threads per stage - YouTube lookups run one at a time to protect the quota
+DEFAULT_CONCURRENCY = {'fetch': 4, 'extract': 2, 'enrich': 1, 'revamp': 2, 'update': 2}
+
+# Most posts an update worker takes off its queue for one batch write
+UPDATE_BATCH_SIZE = 25
+
+# Post states stored in the job store
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class QuotaExceeded(Exception):
+    """Raised by a stage when an API quota runs out and the job should pause"""
+
+
+class RevampJobStore:
+    """
+    SQLite store for revamp jobs and the progress of each post
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        """
+        Open (and create if needed) the job database
+        :param db_path: Path to the SQLite file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    params TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_posts (
+                    job_id TEXT NOT NULL,
+                    post_id INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    stage TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    data TEXT NOT NULL DEFAULT '{}',
+                    error TEXT,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (job_id, post_id)
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation so worker threads never share one
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create_job(self, post_ids, params=None):
+        """
+        Register a new job for a list of posts
+        :param post_ids: WordPress post IDs to revamp
+        :param params: Dictionary of job options to remember for resuming
+        :return: The new job ID
+        """
+        job_id = uuid.uuid4().hex[:12]
+        now = datetime.now().isoformat()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, created_at, params) VALUES (?, ?, ?)",
+                (job_id, now, json.dumps(params or {}))
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO job_posts (job_id, post_id, position, stage, state, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(job_id, int(post_id), i, STAGES[0], PENDING, now) for i, post_id in enumerate(post_ids)]
+            )
+        logger.info(f"Created revamp job {job_id} with {len(post_ids)} posts")
+        return job_id
+
+    def get_job_params(self, job_id):
+        """Return the options a job was created with, or None if the job doesn't exist"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT params FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_jobs(self):
+        """Return all jobs, newest first, with per-state post counts"""
+        with self._connect() as conn:
+            jobs = conn.execute("SELECT job_id, created_at FROM jobs ORDER BY created_at DESC").fetchall()
+        return [{'job_id': job_id, 'created_at': created_at, 'counts': self.get_counts(job_id)}
+                for job_id, created_at in jobs]
+
+    def get_counts(self, job_id):
+        """Return a dictionary of state -> number of posts for a job"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT state, COUNT(*) FROM job_posts WHERE job_id = ? GROUP BY state", (job_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def get_posts(self, job_id, states=None):
+        """
+        Return the posts of a job in their original order
+        :param job_id: Job ID
+        :param states: Optional list of states to filter on
+        :return: List of dictionaries with post_id, stage, state, data and error
+        """
+        query = "SELECT post_id, stage, state, data, error FROM job_posts WHERE job_id = ?"
+        args = [job_id]
+        if states:
+            query += f" AND state IN ({', '.join('?' for _ in states)})"
+            args.extend(states)
+        query += " ORDER BY position"
+        with self._connect() as conn:
+            rows = conn.execute(query, args).fetchall()
+        return [
+            {'post_id': post_id, 'stage': stage, 'state': state, 'data': json.loads(data), 'error': error}
+            for post_id, stage, state, data, error in rows
+        ]
+
+    def save_post(self, job_id, post_id, stage, state, data=None, error=None):
+        """
+        Record the stage a post has reached
+        :param job_id: Job ID
+        :param post_id: WordPress post ID
+        :param stage: Stage the post will run next (or the last stage once done)
+        :param state: One of pending, running, done, failed
+        :param data: Intermediate results to keep, or None to leave them unchanged
+        :param error: Error message for failed posts
+        """
+        now = datetime.now().isoformat()
+        with self._lock, self._connect() as conn:
+            if data is None:
+                conn.execute(
+                    "UPDATE job_posts SET stage = ?, state = ?, error = ?, updated_at = ? "
+                    "WHERE job_id = ? AND post_id = ?",
+                    (stage, state, error, now, job_id, post_id)
+                )
+            else:
+                conn.execute(
+                    "UPDATE job_posts SET stage = ?, state = ?, data = ?, error = ?, updated_at = ? "
+                    "WHERE job_id = ? AND post_id = ?",
+                    (stage, state, json.dumps(data), error, now, job_id, post_id)
+                )
+
+    def reset_interrupted(self, job_id, retry_failed=False):
+        """
+        Make posts that were mid-stage when the process stopped runnable again
+        :param job_id: Job ID
+        :param retry_failed: Also retry posts that failed, from the stage that failed
+        """
+        states = [RUNNING, FAILED] if retry_failed else [RUNNING]
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"UPDATE job_posts SET state = ?, error = NULL WHERE job_id = ? "
+                f"AND state IN ({', '.join('?' for _ in states)})",
+                [PENDING, job_id] + states
+            )
+
+
+class RevampPipeline:
+    """
+    Runs revamp jobs through the staged pipeline
+    """
+
+    def __init__(self, wordpress_api, youtube_api=None, spotify_api=None, style_options=None,
+                 store=None, concurrency=None, post_status='draft', dry_run=False):
+        """
+        :param wordpress_api: WordPressAPI client used to fetch and update posts
+        :param youtube_api: Optional YouTube API client to fill in missing song links
+        :param spotify_api: Optional Spotify API client to refresh songs from the playlist
+        :param style_options: Dictionary of style options passed to the revamp prompt
+        :param store: RevampJobStore (default: one at DEFAULT_DB_PATH)
+        :param concurrency: Dictionary of stage -> worker threads, merged over DEFAULT_CONCURRENCY
+        :param post_status: Status to save revamped posts with (drafts by default, for review)
+        :param dry_run: Record a diff for each post instead of updating it
+        """
+        self.wordpress_api = wordpress_api
+        self.youtube_api = youtube_api
+        self.spotify_api = spotify_api
+        self.style_options = style_options or {}
+        self.store = store or RevampJobStore()
+        self.concurrency = dict(DEFAULT_CONCURRENCY)
+        self.concurrency.update(concurrency or {})
+        self.post_status = post_status
+        self.dry_run = dry_run
+
+        self._stage_functions = {
+            'fetch': self._fetch,
+            'extract': self._extract,
+            'enrich': self._enrich,
+            'revamp': self._revamp,
+            'update': self._update,
+        }
+
+    def find_category_posts(self, category, status='publish'):
+        """
+        Collect the IDs of every post in a category
+        :param category: WordPress category ID
+        :param status: Post status to include
+        :return: List of post IDs
+        """
+        post_ids = []
+        page = 1
+        while True:
+            result = self.wordpress_api.get_posts(category=category, per_page=100, page=page, status=status,
+                                                  fields=['id'])
+            post_ids.extend(post['id'] for post in result.get('posts', []))
+            if page >= result.get('pages', 0):
+                break
+            page += 1
+        logger.info(f"Found {len(post_ids)} posts in category {category}")
+        return post_ids
+
+    def create_job(self, post_ids=None, category=None):
+        """
+        Create a job from explicit post IDs and/or a category
+        :param post_ids: List of WordPress post IDs
+        :param category: WordPress category ID whose posts should be added
+        :return: The new job ID
+        """
+        ids = list(post_ids or [])
+        if category:
+            ids.extend(self.find_category_posts(category))
+        # Keep the first occurrence of each post
+        ids = list(dict.fromkeys(int(post_id) for post_id in ids))
+        return self.store.create_job(ids, params={
+            'category': category, 'post_status': self.post_status, 'dry_run': self.dry_run
+        })
+
+    # Stage functions take the post's stored data and return the updated data
+
+    def _fetch(self, post_id, data):
+        post = self.wordpress_api.get_post(post_id, context='edit')
+        if not post:
+            raise Exception(f"Could not fetch post {post_id}")
+        # Raw values, so the title written back is not the entity-encoded rendered one
+        data['title'] = post.get('title_raw', post.get('title', ''))
+        data['content'] = post.get('content_raw', post.get('content', ''))
+        return data
+
+    def _extract(self, post_id, data):
+        songs, spotify_link, spotify_playlist_id = collect_revamp_songs(data['content'], self.spotify_api)
+        data['songs'] = songs
+        data['spotify_link'] = spotify_link
+        data['spotify_playlist_id'] = spotify_playlist_id
+        data['plain_content'] = extract_plain_text(data['content'])
+        return data
+
+    def _enrich(self, post_id, data):
+        quota_hit = fill_youtube_links(data['songs'], self.youtube_api)
+        if quota_hit:
+            # Links found so far are kept; the remaining ones are looked up on resume
+            raise QuotaExceeded("YouTube API quota exceeded")
+        return data
+
+    def _revamp(self, post_id, data):
+        data['revamped_content'] = generate_revamped_content(
+            post_title=data['title'],
+            plain_content=data['plain_content'],
+            songs=data['songs'],
+            spotify_link=data.get('spotify_link'),
+            spotify_playlist_id=data.get('spotify_playlist_id'),
+            style_options=self.style_options
+        )
+        return data
+
+    def _update(self, post_id, data):
+        result = self.wordpress_api.update_post(
+            post_id=post_id,
+            title=data['title'],
+            content=data['revamped_content'],
+            status=self.post_status,
+            dry_run=self.dry_run
+        )
+        return self._apply_update_result(data, result)
+
+    def _update_many(self, posts):
+        """
+        Update several revamped posts with one WordPress batch request
+        :param posts: List of (post_id, data) tuples
+        :return: List with the updated data, or the Exception for posts that failed, in the same order
+        """
+        results = self.wordpress_api.update_posts_batch([
+            {'post_id': post_id, 'title': data['title'], 'content': data['revamped_content'],
+             'status': self.post_status}
+            for post_id, data in posts
+        ])
+        outcomes = []
+        for (post_id, data), result in zip(posts, results):
+            try:
+                outcomes.append(self._apply_update_result(data, result))
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes
+
+    def _apply_update_result(self, data, result):
+        if not result.get('success'):
+            raise Exception(result.get('error', 'Unknown error updating post'))
+        if result.get('dry_run'):
+            data['changed'] = result.get('changed')
+            data['diff'] = result.get('diff')
+            return data
+        data['skipped'] = bool(result.get('skipped'))
+        data['edit_url'] = result.get('edit_url')
+        # The original HTML is no longer needed once the post is updated
+        data.pop('content', None)
+        data.pop('plain_content', None)
+        return data
+
+    def run(self, job_id, retry_failed=False):
+        """
+        Run (or resume) a job until every post is done, has failed, or a quota stop occurs
+        :param job_id: Job ID returned by create_job
+        :param retry_failed: Retry posts that failed on a previous run
+        :return: Dictionary of state -> number of posts after the run
+        """
+        self.store.reset_interrupted(job_id, retry_failed=retry_failed)
+        posts = self.store.get_posts(job_id, states=[PENDING])
+        if not posts:
+            logger.info(f"Job {job_id} has no pending posts")
+            return self.store.get_counts(job_id)
+
+        logger.info(f"Running job {job_id}: {len(posts)} pending posts")
+        queues = {stage: queue.Queue() for stage in STAGES}
+        stop_event = threading.Event()
+        remaining = [len(posts)]
+        remaining_lock = threading.Lock()
+        finished = threading.Event()
+
+        def leave_pipeline():
+            with remaining_lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    finished.set()
+
+        def process(stage, next_stage, post_id, data):
+            """Run one post through a stage; return True once it has left the pipeline"""
+            if stop_event.is_set():
+                # Leave the post pending at this stage for the next run
+                return True
+
+            self.store.save_post(job_id, post_id, stage, RUNNING)
+            try:
+                data = self._stage_functions[stage](post_id, data)
+            except QuotaExceeded as e:
+                logger.warning(f"Post {post_id}: {str(e)} - pausing job {job_id}")
+                stop_event.set()
+                self.store.save_post(job_id, post_id, stage, PENDING, data=data, error=str(e))
+                return True
+            except Exception as e:
+                logger.error(f"Post {post_id} failed at {stage}: {str(e)}")
+                self.store.save_post(job_id, post_id, stage, FAILED, data=data, error=str(e))
+                return True
+
+            if next_stage:
+                self.store.save_post(job_id, post_id, next_stage, PENDING, data=data)
+                queues[next_stage].put((post_id, data))
+                return False
+            self.store.save_post(job_id, post_id, stage, DONE, data=data)
+            logger.info(f"Post {post_id} revamped and updated")
+            return True
+
+        def process_updates(posts):
+            """Run several posts through the update stage with one batch write"""
+            if stop_event.is_set():
+                return
+
+            for post_id, data in posts:
+                self.store.save_post(job_id, post_id, 'update', RUNNING)
+            try:
+                outcomes = self._update_many(posts)
+            except Exception as e:
+                outcomes = [e] * len(posts)
+
+            for (post_id, data), outcome in zip(posts, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.error(f"Post {post_id} failed at update: {str(outcome)}")
+                    self.store.save_post(job_id, post_id, 'update', FAILED, data=data, error=str(outcome))
+                else:
+                    self.store.save_post(job_id, post_id, 'update', DONE, data=outcome)
+                    logger.info(f"Post {post_id} revamped and updated")
+
+        def update_worker():
+            while not finished.is_set():
+                try:
+                    posts = [queues['update'].get(timeout=0.5)]
+                except queue.Empty:
+                    continue
+                # Take whatever else is already waiting, without holding up the first post
+                while len(posts) < UPDATE_BATCH_SIZE:
+                    try:
+                        posts.append(queues['update'].get_nowait())
+                    except queue.Empty:
+                        break
+
+                try:
+                    process_updates(posts)
+                except Exception as e:
+                    logger.error(f"Posts {[post_id for post_id, _ in posts]}: could not save progress at update: "
+                                 f"{str(e)}")
+                finally:
+                    # Update is the last stage, so every post leaves here whatever happened
+                    for _ in posts:
+                        leave_pipeline()
+
+        def worker(stage):
+            if stage == 'update' and not self.dry_run:
+                # Dry runs diff each post on its own; real updates are batched
+                return update_worker()
+
+            next_stage = STAGES[STAGES.index(stage) + 1] if stage != STAGES[-1] else None
+            while not finished.is_set():
+                try:
+                    post_id, data = queues[stage].get(timeout=0.5)
+                except queue.Empty:
+                    continue
+
+                left = True
+                try:
+                    left = process(stage, next_stage, post_id, data)
+                except Exception as e:
+                    # Recording progress failed (e.g. the job database is locked); the
+                    # post keeps its last saved state and is picked up again on resume
+                    logger.error(f"Post {post_id}: could not save progress at {stage}: {str(e)}")
+                finally:
+                    # Every post must leave exactly once, or run() waits forever
+                    if left:
+                        leave_pipeline()
+
+        threads = []
+        for stage in STAGES:
+            for i in range(max(1, self.concurrency.get(stage, 1))):
+                thread = threading.Thread(target=worker, args=(stage,), name=f"revamp-{stage}-{i}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        # Resumed posts re-enter at the stage they stopped at
+        for post in posts:
+            queues[post['stage']].put((post['post_id'], post['data']))
+
+        finished.wait()
+        for thread in threads:
+            thread.join()
+
+        counts = self.store.get_counts(job_id)
+        if stop_event.is_set():
+            logger.warning(f"Job {job_id} paused: {counts}. Resume with --resume {job_id}")
+        else:
+            logger.info(f"Job {job_id} finished: {counts}")
+        return counts
+
+
+def build_pipeline_from_env(store=None, concurrency=None, post_status='draft', dry_run=False):
+    """
+    Create a RevampPipeline using the same credentials as the Streamlit app
+    :return: RevampPipeline instance
+    """
+    from utils.secrets_manager import get_secret
+    from utils.fixed_wordpress_api import WordPressAPI
+    from utils.fixed_youtube_api import YouTubeAPI
+    from utils.spotify_api import SpotifyAPI
+
+    wordpress_api = WordPressAPI(
+        get_secret("WORDPRESS_API_URL"),
+        get_secret("WORDPRESS_USERNAME"),
+        get_secret("WORDPRESS_PASSWORD")
+    )
+
+    youtube_api = None
+    youtube_key = get_secret("YOUTUBE_API_KEY")
+    if youtube_key:
+        youtube_api = YouTubeAPI(youtube_key)
+
+    spotify_api = None
+    client_id = get_secret("SPOTIFY_CLIENT_ID")
+    client_secret = get_secret("SPOTIFY_CLIENT_SECRET")
+    if client_id and client_secret:
+        spotify_api = SpotifyAPI(client_id, client_secret)
+
+    return RevampPipeline(
+        wordpress_api,
+        youtube_api=youtube_api,
+        spotify_api=spotify_api,
+        store=store,
+        concurrency=concurrency,
+        post_status=post_status,
+        dry_run=dry_run
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Revamp existing WordPress posts in bulk")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--posts', type=int, nargs='+', help="Post IDs to revamp")
+    source.add_argument('--category', type=int, help="Revamp every published post in this category")
+    source.add_argument('--resume', metavar='JOB_ID', help="Resume an existing job")
+    source.add_argument('--list', action='store_true', help="List jobs and their progress")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="Job database path")
+    parser.add_argument('--status', default='draft', help="Status for updated posts (default: draft)")
+    parser.add_argument('--retry-failed', action='store_true', help="Retry failed posts when resuming")
+    parser.add_argument('--dry-run', action='store_true', help="Show a diff per post instead of updating")
+    for stage in STAGES:
+        parser.add_argument(f'--{stage}-workers', type=int, default=DEFAULT_CONCURRENCY[stage],
+                            help=f"Worker threads for the {stage} stage")
+    args = parser.parse_args(argv)
+
+    store = RevampJobStore(args.db)
+    if args.list:
+        for job in store.list_jobs():
+            print(f"{job['job_id']}  {job['created_at']}  {job['counts']}")
+        return 0
+
+    concurrency = {stage: getattr(args, f'{stage}_workers') for stage in STAGES}
+    post_status = args.status
+    dry_run = args.dry_run
+    if args.resume:
+        params = store.get_job_params(args.resume)
+        if params is None:
+            parser.error(f"Unknown job: {args.resume}")
+        post_status = params.get('post_status', post_status)
+        dry_run = params.get('dry_run', dry_run)
+
+    pipeline = build_pipeline_from_env(store=store, concurrency=concurrency, post_status=post_status,
+                                       dry_run=dry_run)
+    job_id = args.resume or pipeline.create_job(post_ids=args.posts, category=args.category)
+    counts = pipeline.run(job_id, retry_failed=args.retry_failed)
+
+    print(f"Job {job_id}: {counts}")
+    done_posts = store.get_posts(job_id, states=[DONE])
+    if dry_run:
+        for post in done_posts:
+            if post['data'].get('changed'):
+                print(f"\n--- post {post['post_id']}: {post['data'].get('title', '')}")
+                print(post['data'].get('diff') or "(title only)")
+        unchanged = sum(1 for post in done_posts if not post['data'].get('changed'))
+        print(f"\n{unchanged} posts would not change")
+    else:
+        skipped = sum(1 for post in done_posts if post['data'].get('skipped'))
+        print(f"{skipped} posts were already up to date and were not rewritten")
+    for post in store.get_posts(job_id, states=[FAILED]):
+        print(f"  failed {post['post_id']} at {post['stage']}: {post['error']}")
+    return 0 if not counts.get(FAILED) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
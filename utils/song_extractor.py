@@ -0,0 +1,208 @@
+"""
+Single-pass song extraction from blog post HTML.
+
+Walks <a>, <p> and <li> nodes once with html.parser instead of running a large
+backtracking regex over the whole document, so extraction time grows linearly
+with the size of the post.
+"""
+import logging
+import re
+from html.parser import HTMLParser
+
+from utils.parsing import is_youtube_url
+
+logger = logging.getLogger(__name__)
+
+# Block text longer than this is prose, not a song line - stop collecting it
+MAX_BLOCK_CHARS = 300
+
+# Longest song title or artist accepted from a plain "<p>Song – Artist</p>" line
+MAX_SONG_CHARS = 100
+
+# "<p>Song by Artist</p>" mentions, each part limited to 50 characters
+BY_PATTERN = re.compile(r'^(.{2,50}?)\s+by\s+(.{2,50})$', re.IGNORECASE | re.DOTALL)
+
+# Spaced hyphen used as a separator when there is no en dash in the text
+SPACED_HYPHEN = re.compile(r'\s+-\s+')
+
+# Entities are decoded by the parser, so &ndash;/&#8211; and &mdash;/&#8212;
+# arrive as the characters themselves
+DASHES = ('–', '—')
+
+# Some saved posts have anchors like <a href="..." target="_blankSong – Artist</a>:
+# the target value is never closed, so the parser would swallow the link text
+# into the attribute. Close it before parsing.
+UNCLOSED_TARGET_PATTERN = re.compile(r'(\btarget="_(?:blank|self|parent|top))(?!")>?', re.IGNORECASE)
+
+# ...and tags like <div class="highlight-section that end the line with the
+# attribute value still open, which would swallow everything up to the next quote
+UNCLOSED_LINE_TAG_PATTERN = re.compile(r'(<[a-zA-Z][^<>"\n]*="[^"<>\n]*)$', re.MULTILINE)
+
+
+def split_song_artist(text, allow_bare_hyphen=True):
+    """
+    Split "Song – Artist" text on the first dash variant
+    An en or em dash wins over a spaced hyphen, which wins over a bare hyphen,
+    so hyphenated titles and artists such as "Jay-Z" stay intact
+    :param text: Text containing a song and an artist
+    :param allow_bare_hyphen: Whether an unspaced hyphen may act as the separator
+    :return: (song, artist) tuple, or None if the text has no separator
+    """
+    positions = [position for position in (text.find(dash) for dash in DASHES) if position >= 0]
+    if positions:
+        position = min(positions)
+        song, artist = text[:position], text[position + 1:]
+    else:
+        match = SPACED_HYPHEN.search(text)
+        if match:
+            song, artist = text[:match.start()], text[match.end():]
+        elif allow_bare_hyphen and '-' in text:
+            song, _, artist = text.partition('-')
+        else:
+            return None
+    song, artist = song.strip(), artist.strip()
+    # Markup left in the text means the HTML was too broken to trust this line
+    if '<' in song or '<' in artist:
+        return None
+    return song, artist
+
+
+def repair_html(html_content):
+    """
+    Close the unterminated attribute values found in some saved posts
+    :param html_content: Post HTML
+    :return: HTML the parser can read song lines from
+    """
+    html_content = UNCLOSED_TARGET_PATTERN.sub(r'\1">', html_content)
+    return UNCLOSED_LINE_TAG_PATTERN.sub(r'\1">', html_content)
+
+
+class _SongHTMLParser(HTMLParser):
+    """Collects song lines from anchors and from <p>/<li> blocks in document order"""
+
+    BLOCK_TAGS = ('p', 'li')
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.dash_songs = []
+        self.by_songs = []
+        self._anchor = None
+        self._blocks = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self._anchor = {'href': (dict(attrs).get('href') or '').strip(), 'text': [], 'size': 0}
+            for block in self._blocks:
+                block['has_anchor'] = True
+        elif tag in self.BLOCK_TAGS:
+            # A new <p> implicitly closes an unclosed <p>
+            if tag == 'p' and self._blocks and self._blocks[-1]['tag'] == 'p':
+                self._close_block()
+            for block in self._blocks:
+                block['has_tags'] = True
+            self._blocks.append({'tag': tag, 'text': [], 'size': 0, 'has_anchor': False, 'has_tags': False})
+        elif self._blocks:
+            self._blocks[-1]['has_tags'] = True
+
+    def handle_startendtag(self, tag, attrs):
+        if self._blocks:
+            self._blocks[-1]['has_tags'] = True
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._anchor is not None:
+            self._close_anchor()
+        elif tag in self.BLOCK_TAGS:
+            # Close blocks up to the matching tag; ignore stray end tags
+            if any(block['tag'] == tag for block in self._blocks):
+                while self._blocks:
+                    if self._close_block() == tag:
+                        break
+        elif self._blocks:
+            self._blocks[-1]['has_tags'] = True
+
+    def handle_data(self, data):
+        if self._anchor is not None:
+            self._collect(self._anchor, data)
+        if self._blocks:
+            self._collect(self._blocks[-1], data)
+
+    @staticmethod
+    def _collect(node, data):
+        # Keep at most MAX_BLOCK_CHARS per node so work per node stays bounded
+        if node['size'] <= MAX_BLOCK_CHARS:
+            node['size'] += len(data)
+            node['text'].append(data)
+            if node['size'] > MAX_BLOCK_CHARS:
+                node['text'] = []
+
+    def close(self):
+        super().close()
+        if self._anchor is not None:
+            self._close_anchor()
+        while self._blocks:
+            self._close_block()
+
+    def _close_anchor(self):
+        anchor, self._anchor = self._anchor, None
+        if anchor['size'] > MAX_BLOCK_CHARS:
+            return
+        parts = split_song_artist(''.join(anchor['text']))
+        if not parts:
+            return
+        href = anchor['href']
+        self.dash_songs.append({
+            'Song': parts[0],
+            'Artist': parts[1],
+            'YouTube_Link': href if is_youtube_url(href) else ''
+        })
+
+    def _close_block(self):
+        block = self._blocks.pop()
+        # Blocks that contain links were already handled by their anchors
+        if block['has_anchor'] or block['size'] > MAX_BLOCK_CHARS:
+            return block['tag']
+        text = ''.join(block['text']).strip()
+        # Prose uses hyphenated words ("wind-down"), so plain lines need a real separator
+        parts = split_song_artist(text, allow_bare_hyphen=False)
+        if parts and len(parts[0]) <= MAX_SONG_CHARS and len(parts[1]) <= MAX_SONG_CHARS:
+            self.dash_songs.append({'Song': parts[0], 'Artist': parts[1], 'YouTube_Link': ''})
+        elif block['tag'] == 'p' and not block['has_tags']:
+            match = BY_PATTERN.match(text)
+            if match:
+                self.by_songs.append({
+                    'Song': match.group(1).strip(),
+                    'Artist': match.group(2).strip(),
+                    'YouTube_Link': ''
+                })
+        return block['tag']
+
+
+def extract_songs_from_html(html_content):
+    """
+    Extract song information from an existing blog post HTML content
+    Returns a list of dictionaries with song and artist information
+    """
+    try:
+        parser = _SongHTMLParser()
+        parser.feed(repair_html(html_content or ''))
+        parser.close()
+
+        songs = parser.dash_songs
+
+        # Add "song by artist" mentions that are not already in the list
+        seen = {(s['Song'].lower(), s['Artist'].lower()) for s in songs}
+        for song in parser.by_songs:
+            key = (song['Song'].lower(), song['Artist'].lower())
+            if key not in seen:
+                seen.add(key)
+                songs.append(song)
+
+        # Filter out any false positives (very short song names, etc.)
+        valid_songs = [s for s in songs if len(s['Song']) > 2 and len(s['Artist']) > 2]
+
+        logger.info(f"Extracted {len(valid_songs)} songs from HTML content")
+        return valid_songs
+
+    except Exception as e:
+        logger.error(f"Error extracting songs from HTML: {str(e)}")
+        return []
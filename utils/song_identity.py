@@ -0,0 +1,215 @@
+"""
+Canonical song identity for the catalog.
+
+The same recording shows up in many playlists under different spellings:
+"Don't Stop Me Now" by Queen in one, "Dont Stop Me Now - Remastered 2011" in
+another, or with the artists listed in a different order. song_key() reduces a
+song and artist to one key by folding accents, case and punctuation, dropping
+feat./remaster/live/edit qualifiers from the title, moving featured artists out
+of the way and sorting the remaining artists.
+
+SongIndex hashes every catalog row by that key, so duplicates can be reported
+and a YouTube link found once is copied to every equivalent row in one pass.
+"""
+import logging
+import re
+import unicodedata
+from functools import lru_cache
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# A whole title qualifier naming a version of the same recording: "feat. X",
+# "Remastered 2011", "2005 Remaster", "Live at Wembley", "Radio Edit", "Mono".
+# Only complete phrases count, so "(Liveliness)" or a named remix such as
+# "(Clean Bandit Remix)" stays part of the title and keeps its own key.
+_QUALIFIER = (
+    r"(?:feat\.?|ft\.?|featuring)\s.+"
+    r"|(?:\d{4}\s+)?(?:digital(?:ly)?\s+)?remaster(?:ed)?(?:\s+(?:version|\d{4}))*"
+    r"|live(?:\s+(?:at|from|in|on)\b.*|\s+version)?"
+    r"|radio\s+edit"
+    r"|(?:single|album|original|mono|stereo|explicit|clean)\s+version"
+    r"|mono|stereo|explicit"
+)
+
+# "(feat. X)", "[Remastered 2011]", "(Live at Wembley)"
+BRACKETED_QUALIFIER_PATTERN = re.compile(rf"\s*[(\[]\s*(?:{_QUALIFIER})\s*[)\]]", re.IGNORECASE)
+
+# "- Remastered 2011", "- Live", "— Radio Edit"
+DASH_QUALIFIER_PATTERN = re.compile(rf"\s+[-–—]\s+(?:{_QUALIFIER})\s*$", re.IGNORECASE)
+
+# "Song feat. X" without brackets
+TRAILING_FEATURE_PATTERN = re.compile(r"\s+(?:feat\.?|ft\.?|featuring)\s.*$", re.IGNORECASE)
+
+# Everything after "feat." in an artist credit is a featured artist
+ARTIST_FEATURE_PATTERN = re.compile(r"\s+(?:feat\.?|ft\.?|featuring)\s.*$", re.IGNORECASE)
+
+# Separators between credited artists
+ARTIST_SEPARATOR_PATTERN = re.compile(r"\s*(?:,|;|/|&|\+|\band\b)\s*", re.IGNORECASE)
+
+APOSTROPHE_PATTERN = re.compile(r"['’‘`´]")
+NON_WORD_PATTERN = re.compile(r"[^\w\s]+")
+
+
+def _fold(text):
+    """Lowercase words without accents, apostrophes or punctuation"""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+    text = APOSTROPHE_PATTERN.sub('', text)
+    text = NON_WORD_PATTERN.sub(' ', text)
+    return ' '.join(text.split())
+
+
+def _clean(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ''
+    return str(value).strip()
+
+
+def canonical_title(song):
+    """
+    Normalize a song title
+    Example: "Dont Stop Me Now - Remastered 2011" -> 'dont stop me now'
+    :param song: Song title
+    :return: Folded title without version qualifiers
+    """
+    song = _clean(song)
+    title = BRACKETED_QUALIFIER_PATTERN.sub('', song)
+    title = DASH_QUALIFIER_PATTERN.sub('', title)
+    title = TRAILING_FEATURE_PATTERN.sub('', title)
+    # Never reduce a title to nothing, e.g. a song actually called "Live"
+    return _fold(title) or _fold(song)
+
+
+def canonical_artists(artist):
+    """
+    Normalize an artist credit to its sorted main artists
+    Example: 'Rihanna & Calvin Harris' -> 'calvin harris|rihanna'; 'Ronettes, The' -> 'ronettes'
+    :param artist: Artist credit, e.g. "A, B" or "A feat. C"
+    :return: Folded artist names joined by '|'
+    """
+    artist = ARTIST_FEATURE_PATTERN.sub('', _clean(artist))
+    names = set()
+    for name in ARTIST_SEPARATOR_PATTERN.split(artist):
+        name = _fold(name)
+        if name.startswith('the '):
+            name = name[4:]
+        # A lone "the" is the inverted article of "Ronettes, The"
+        if name and name != 'the':
+            names.add(name)
+    return '|'.join(sorted(names))
+
+
+@lru_cache(maxsize=65536)
+def _song_key(song, artist):
+    return f"{canonical_title(song)}::{canonical_artists(artist)}"
+
+
+def song_key(song, artist):
+    """
+    Key shared by every spelling of the same song
+    Example: ("Don't Stop Me Now", 'Queen') and ('Dont Stop Me Now - Remastered 2011', 'Queen')
+             both give 'dont stop me now::queen'
+    :param song: Song title
+    :param artist: Artist credit
+    :return: Canonical key string
+    """
+    return _song_key(_clean(song), _clean(artist))
+
+
+def _has_link(links):
+    return links.fillna('').astype(str).str.strip() != ''
+
+
+class SongIndex:
+    """
+    Hash index of catalog rows by song_key()
+    """
+
+    def __init__(self, df):
+        """
+        :param df: Catalog DataFrame with Song, Artist and YouTube_Link columns
+        """
+        self.df = df
+        self.keys = pd.Series(
+            [song_key(song, artist) for song, artist in zip(df['Song'], df['Artist'])],
+            index=df.index, dtype=object
+        )
+        self._rows = self.keys.groupby(self.keys, sort=False).groups
+
+    def __len__(self):
+        """:return: Number of distinct songs"""
+        return len(self._rows)
+
+    def rows(self, song, artist):
+        """
+        :param song: Song title
+        :param artist: Artist credit
+        :return: Index labels of every catalog row for the same song
+        """
+        return list(self._rows.get(song_key(song, artist), []))
+
+    def resolved_links(self):
+        """
+        :return: Series of song key -> the first YouTube link found for that song
+        """
+        has_link = _has_link(self.df['YouTube_Link'])
+        links = self.df.loc[has_link, 'YouTube_Link'].astype(str).str.strip()
+        return links.groupby(self.keys[has_link], sort=False).first()
+
+    def duplicates(self):
+        """
+        Report songs that appear in the catalog more than once
+        :return: DataFrame with Key, Rows, Playlists, Spellings and YouTube_Link,
+                 most duplicated first
+        """
+        frame = pd.DataFrame({
+            'Key': self.keys,
+            'Playlist': self.df['Playlist'],
+            'Spelling': self.df['Song'].astype(str).str.strip() + " - " + self.df['Artist'].astype(str).str.strip()
+        })
+        grouped = frame.groupby('Key', sort=False)
+        report = pd.DataFrame({
+            'Rows': grouped.size(),
+            'Playlists': grouped['Playlist'].nunique(),
+            'Spellings': grouped['Spelling'].agg(lambda spellings: sorted(set(spellings)))
+        })
+        report = report[report['Rows'] > 1]
+        report['YouTube_Link'] = report.index.map(self.resolved_links()).fillna('')
+        report = report.sort_values('Rows', ascending=False, kind='stable')
+        return report.rename_axis('Key').reset_index()
+
+    def propagate_youtube_links(self, target_df=None):
+        """
+        Copy each song's resolved YouTube link to its rows that have none
+        :param target_df: DataFrame to fill (default: the indexed catalog); rows
+                          are matched to catalog songs by song key
+        :return: Number of rows that got a link
+        """
+        if target_df is None:
+            target_df, keys = self.df, self.keys
+        else:
+            keys = pd.Series(
+                [song_key(song, artist) for song, artist in zip(target_df['Song'], target_df['Artist'])],
+                index=target_df.index, dtype=object
+            )
+        fill = keys[~_has_link(target_df['YouTube_Link'])].map(self.resolved_links()).dropna()
+        if not fill.empty:
+            target_df.loc[fill.index, 'YouTube_Link'] = fill
+        return len(fill)
+
+
+def query_groups(songs):
+    """
+    Group songs by identity so each distinct song is searched once
+    :param songs: Iterable of (item, song, artist)
+    :return: Dictionary of song key -> (search query, [items]), in first-seen order
+    """
+    groups = {}
+    for item, song, artist in songs:
+        key = song_key(song, artist)
+        if key not in groups:
+            groups[key] = (f"{_clean(song)} - {_clean(artist)}", [])
+        groups[key][1].append(item)
+    return groups
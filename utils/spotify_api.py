@@ -1,43 +1,179 @@
+import logging
+import threading
+import time
+
+import requests
 import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-import re
+from spotipy.exceptions import SpotifyException
+from utils.fuzzy_match import FuzzyIndex
+from utils.rate_limit import CircuitBreaker, CircuitOpenError, RateLimiter, backoff_delay, parse_retry_after
+from utils.spotify_token_cache import CachedClientCredentials
+from utils.track_store import TrackStore
+from utils.parsing import normalize_playlist_name
+
+logger = logging.getLogger(__name__)
+
+# Spotify limits requests per app, so every client in the process shares these
+SPOTIFY_LIMITER = RateLimiter(rate=10, burst=10)
+SPOTIFY_BREAKER = CircuitBreaker("Spotify API", failure_threshold=5, reset_timeout=60)
+
+# Attempts per request before giving up (429s, 5xx responses and connection errors)
+MAX_ATTEMPTS = 4
+
+# A Retry-After longer than this is reported to the caller instead of waited out
+MAX_RETRY_AFTER = 60
+
+# Fuzzy playlist name matches scoring below this (0-100) are not accepted
+MIN_MATCH_SCORE = 85
+
+# Playlist name indexes are reused for this long before listing the playlists again
+PLAYLIST_INDEX_TTL = 600
+
+# On a miss the index is rebuilt if it is older than this, to find new playlists
+MIN_INDEX_REFRESH_AGE = 60
+
+# user_id -> (built at, FuzzyIndex), shared by every client in the process
+_playlist_indexes = {}
+_playlist_indexes_lock = threading.Lock()
+
+
+class SpotifyError(Exception):
+    """Spotify could not be reached; the request itself may be fine"""
+
+
+class SpotifyRateLimited(SpotifyError):
+    """Spotify kept answering 429 Too Many Requests"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SpotifyUnavailable(SpotifyError):
+    """Spotify is failing (5xx or connection errors) or the circuit breaker is open"""
+
 
 class SpotifyAPI:
-    def __init__(self, client_id, client_secret):
+    def __init__(self, client_id, client_secret, track_store=None):
+        """
+        :param client_id: Spotify client ID
+        :param client_secret: Spotify client secret
+        :param track_store: TrackStore for playlist tracks (default: .cache/spotify_tracks.sqlite)
+        """
         if not client_id or not client_secret:
             raise ValueError("Spotify client ID and secret are required")
 
-        auth_manager = SpotifyClientCredentials(
+        # Tokens are shared by every client in the process and persisted in .cache/
+        auth_manager = CachedClientCredentials(
             client_id=client_id,
             client_secret=client_secret
         )
-        self.spotify = spotipy.Spotify(auth_manager=auth_manager)
+        # A plain session: 429 and 5xx responses are retried by call(), which
+        # honours Retry-After, instead of spotipy's built-in urllib3 retries
+        self.spotify = spotipy.Spotify(auth_manager=auth_manager, requests_session=requests.Session())
+        self.track_store = track_store or TrackStore()
+
+    def call(self, method, *args, **kwargs):
+        """
+        Call a spotipy client method with rate limiting, retries and circuit breaking
+        :param method: Name of the spotipy.Spotify method, e.g. 'playlist_tracks'
+        :return: The method's result
+        :raises SpotifyRateLimited: if Spotify keeps answering 429
+        :raises SpotifyUnavailable: if Spotify keeps failing or the circuit breaker is open
+        :raises SpotifyException: for other errors (e.g. 404), which are not retried
+        """
+        func = getattr(self.spotify, method)
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                SPOTIFY_BREAKER.before_call()
+            except CircuitOpenError as e:
+                raise SpotifyUnavailable(str(e)) from e
+            SPOTIFY_LIMITER.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except SpotifyException as e:
+                if e.http_status is not None and e.http_status < 500:
+                    # Spotify answered (a 429 or a bad request), so as far as the
+                    # breaker is concerned it is up; this also ends a half-open trial
+                    SPOTIFY_BREAKER.record_success()
+                    if e.http_status != 429:
+                        raise
+                    retry_after = parse_retry_after((e.headers or {}).get('Retry-After'))
+                    if attempt == MAX_ATTEMPTS - 1 or (retry_after or 0) > MAX_RETRY_AFTER:
+                        raise SpotifyRateLimited(f"Spotify rate limit hit on {method}", retry_after) from e
+                    wait = retry_after if retry_after is not None else backoff_delay(attempt)
+                    logger.warning(f"Spotify rate limit hit on {method}, waiting {wait:.1f}s")
+                    # Everyone sharing the app's limit waits, not just this thread
+                    SPOTIFY_LIMITER.pause(wait)
+                    continue
+                error = e
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            except BaseException:
+                # Not a service failure, but a half-open trial must not stay claimed
+                SPOTIFY_BREAKER.release_trial()
+                raise
+            else:
+                SPOTIFY_BREAKER.record_success()
+                return result
+
+            SPOTIFY_BREAKER.record_failure()
+            if attempt == MAX_ATTEMPTS - 1:
+                raise SpotifyUnavailable(f"Spotify request {method} failed: {str(error)}") from error
+            wait = backoff_delay(attempt)
+            logger.warning(f"Spotify request {method} failed (attempt {attempt + 1}), "
+                           f"retrying in {wait:.1f}s: {str(error)}")
+            time.sleep(wait)
 
     def clean_playlist_name(self, playlist_name):
         """
         Clean playlist name by removing numeric prefix while preserving the full name
         Example: '006 The Smooth Sail Wedding Cocktail Hour' -> 'The Smooth Sail Wedding Cocktail Hour'
         """
-        if playlist_name is None:
-            return ""
-        # Remove numeric prefix and any leading spaces
-        cleaned_name = re.sub(r'^\d+\s*', '', str(playlist_name))
-        return cleaned_name.strip()
+        return normalize_playlist_name(playlist_name)
+
+    def get_playlist_snapshot_id(self, playlist_id):
+        """
+        Get a playlist's snapshot_id, which changes whenever the playlist is edited
+        :param playlist_id: Spotify playlist ID
+        :return: snapshot_id, or None if it could not be fetched
+        """
+        try:
+            return self.call('playlist', playlist_id, fields='snapshot_id').get('snapshot_id')
+        except SpotifyError:
+            raise
+        except Exception as e:
+            print(f"Error fetching playlist snapshot: {str(e)}")
+            return None
 
-    def get_playlist_tracks(self, playlist_id):
+    def get_playlist_tracks(self, playlist_id, snapshot_id=None):
         """
         Get all tracks from a Spotify playlist by playlist ID
+        Tracks are kept in the track store, so an unchanged playlist costs
+        one snapshot_id request instead of the full paginated download.
         :param playlist_id: Spotify playlist ID
+        :param snapshot_id: Current snapshot_id, if the caller already knows it
         :return: List of track objects with name and artist information
+        :raises SpotifyError: if Spotify is rate limiting or unavailable
         """
+        snapshot_id = snapshot_id or self.get_playlist_snapshot_id(playlist_id)
+        if snapshot_id:
+            try:
+                cached_tracks = self.track_store.get_tracks(playlist_id, snapshot_id)
+                if cached_tracks is not None:
+                    print(f"Playlist {playlist_id} unchanged, using {len(cached_tracks)} stored tracks")
+                    return cached_tracks
+            except Exception as e:
+                print(f"Error reading stored playlist tracks: {str(e)}")
+
         try:
             # Get the playlist tracks
-            results = self.spotify.playlist_tracks(playlist_id)
+            results = self.call('playlist_tracks', playlist_id)
             tracks = results['items']
             
             # Continue fetching if there are more tracks
             while results['next']:
-                results = self.spotify.next(results)
+                results = self.call('next', results)
                 tracks.extend(results['items'])
             
             # Extract track info
@@ -55,139 +191,93 @@ class SpotifyAPI:
                             'name': track_name,
                             'artists': artists
                         })
-            
-            return track_info
+        except SpotifyError:
+            raise
         except Exception as e:
             print(f"Error fetching playlist tracks: {str(e)}")
             return []
+
+        if snapshot_id:
+            try:
+                self.track_store.save_tracks(playlist_id, snapshot_id, track_info)
+            except Exception as e:
+                print(f"Error storing playlist tracks: {str(e)}")
+        return track_info
             
+    def get_playlist_index(self, user_id, max_age=PLAYLIST_INDEX_TTL):
+        """
+        Index of a user's playlist names for fuzzy lookups
+        The playlists are listed once and the index is shared by all clients
+        in the process until it is older than max_age.
+        :param user_id: Spotify user ID
+        :param max_age: Rebuild the index if it is older than this many seconds
+        :return: FuzzyIndex of playlist name -> playlist URL
+        """
+        with _playlist_indexes_lock:
+            cached = _playlist_indexes.get(user_id)
+        if cached and time.monotonic() - cached[0] < max_age:
+            return cached[1]
+
+        entries = []
+        playlists = self.call('user_playlists', user_id, limit=50)
+        while playlists:
+            for playlist in playlists.get('items') or []:
+                if not isinstance(playlist, dict):
+                    continue
+                spotify_name = (playlist.get('name') or '').strip()
+                url = (playlist.get('external_urls') or {}).get('spotify')
+                if spotify_name and url:
+                    entries.append((spotify_name, url))
+            playlists = self.call('next', playlists) if playlists.get('next') else None
+
+        index = FuzzyIndex(entries)
+        with _playlist_indexes_lock:
+            _playlist_indexes[user_id] = (time.monotonic(), index)
+        return index
+
+    @staticmethod
+    def _match_playlist(index, search_name):
+        """
+        Pick the playlist for a name from an index
+        :return: Playlist URL, or None if nothing scores at least MIN_MATCH_SCORE
+        """
+        exact = index.exact(search_name)
+        if exact:
+            print(f"Found exact match: '{exact[0]}'")
+            return exact[1]
+        matches = index.search(search_name, limit=3)
+        if matches:
+            print("Closest playlists: " + ", ".join(f"'{name}' ({score:.0f})" for name, score, _ in matches))
+        if matches and matches[0][1] >= MIN_MATCH_SCORE:
+            print(f"Found fuzzy match: '{matches[0][0]}'")
+            return matches[0][2]
+        return None
+
     def get_playlist_link(self, user_id, playlist_name):
         """
         Find and return the Spotify playlist link by name
+        Names are matched with FuzzyIndex, so "(Volume 2)" finds "Vol. 2".
+        :raises SpotifyError: if Spotify is rate limiting or unavailable, so callers
+                              don't mistake it for "playlist not found"
         """
         try:
-            # Clean the input playlist name
             search_name = playlist_name.strip()
             print(f"Looking for Spotify playlist: '{search_name}'")
             
-            # Try to get user playlists
             try:
-                playlists = self.spotify.user_playlists(user_id)
-                
-                # Store all playlist names for debugging
-                matching_names = []
-                
-                # First pass: Try exact match (case-insensitive)
-                max_iterations = 100  # Prevent infinite loops
-                iteration_count = 0
-                
-                while playlists and iteration_count < max_iterations:
-                    iteration_count += 1
-                    
-                    # Validate playlists structure
-                    if not isinstance(playlists, dict) or 'items' not in playlists:
-                        break
-                        
-                    for playlist in playlists.get('items', []):
-                        if not isinstance(playlist, dict):
-                            continue
-                            
-                        # Get the Spotify playlist name
-                        spotify_name = playlist.get('name', '').strip()
-                        if spotify_name:
-                            matching_names.append(spotify_name)
-                        
-                        # Compare names (case-insensitive)
-                        if spotify_name.lower() == search_name.lower():
-                            print(f"Found exact match: '{spotify_name}'")
-                            external_urls = playlist.get('external_urls', {})
-                            if isinstance(external_urls, dict) and 'spotify' in external_urls:
-                                return external_urls['spotify']
-    
-                    # Get the next page of results if available
-                    if playlists.get('next'):
-                        playlists = self.spotify.next(playlists)
-                    else:
-                        break
-                
-                # Reset for second pass
-                playlists = self.spotify.user_playlists(user_id)
-                
-                # Second pass: Try looking for the distinctive part of the name
-                # For example: "The Fresh Takes Wedding Cocktail Hour" might be "Fresh Takes"
-                base_name = search_name.split("Wedding Cocktail Hour")[0].strip()
-                
-                print(f"Trying with base name: '{base_name}'")
-                iteration_count = 0
-                
-                while playlists and base_name and iteration_count < max_iterations:
-                    iteration_count += 1
-                    
-                    # Validate playlists structure
-                    if not isinstance(playlists, dict) or 'items' not in playlists:
-                        break
-                        
-                    for playlist in playlists.get('items', []):
-                        if not isinstance(playlist, dict):
-                            continue
-                            
-                        spotify_name = playlist.get('name', '').strip()
-                        
-                        # Try partial matching
-                        if spotify_name and base_name.lower() in spotify_name.lower():
-                            print(f"Found partial match with base name: '{spotify_name}'")
-                            external_urls = playlist.get('external_urls', {})
-                            if isinstance(external_urls, dict) and 'spotify' in external_urls:
-                                return external_urls['spotify']
-                    
-                    # Get the next page of results if available
-                    if playlists.get('next'):
-                        playlists = self.spotify.next(playlists)
-                    else:
-                        break
-                
-                # Third pass: Try broader fuzzy matching for special cases
-                playlists = self.spotify.user_playlists(user_id)
-                
-                # Extract key terms from the playlist name (e.g., "Yacht Rock", "EDM", etc.)
-                # This will help with "The Yacht Rock Wedding Cocktail Hour"
-                key_terms = []
-                if "Volume" in search_name:
-                    volume_match = re.search(r'Volume\s+(\d+)', search_name)
-                    if volume_match:
-                        volume_num = volume_match.group(1)
-                        key_terms.append(f"Vol. {volume_num}")
-                        key_terms.append(f"Vol {volume_num}")
-                        key_terms.append(f"Volume {volume_num}")
-                
-                # Add other distinctive words
-                for word in search_name.split():
-                    if word.lower() not in ['the', 'wedding', 'cocktail', 'hour', 'volume', 'and', 'of']:
-                        key_terms.append(word)
-                
-                print(f"Trying with key terms: {key_terms}")
-                while playlists and key_terms:
-                    for playlist in playlists['items']:
-                        spotify_name = playlist['name'].strip()
-                        
-                        # Count how many key terms match
-                        match_count = 0
-                        for term in key_terms:
-                            if term.lower() in spotify_name.lower():
-                                match_count += 1
-                        
-                        # If more than half the terms match, consider it a good match
-                        if match_count >= len(key_terms) // 2 and match_count > 0:
-                            print(f"Found fuzzy match with key terms: '{spotify_name}'")
-                            return playlist['external_urls']['spotify']
-                    
-                    # Get the next page of results if available
-                    if playlists['next']:
-                        playlists = self.spotify.next(playlists)
-                    else:
-                        break
+                index = self.get_playlist_index(user_id)
+                link = self._match_playlist(index, search_name)
+                if link is None:
+                    # The playlist may have been created since the index was built
+                    refreshed = self.get_playlist_index(user_id, max_age=MIN_INDEX_REFRESH_AGE)
+                    if refreshed is not index:
+                        link = self._match_playlist(refreshed, search_name)
+                        index = refreshed
+                if link:
+                    return link
                 
                 # If we get here, no match was found
+                matching_names = index.names()
                 available_names = ", ".join(matching_names[:10])
                 if len(matching_names) > 10:
                     available_names += f" and {len(matching_names) - 10} more"
@@ -195,6 +285,8 @@ class SpotifyAPI:
                 print(f"Available playlists: {available_names}")
                 return None
                 
+            except SpotifyError:
+                raise
             except Exception as e:
                 print(f"Error accessing user playlists: {str(e)}")
                 
@@ -203,40 +295,27 @@ class SpotifyAPI:
                 print(f"Trying search with query: {query}")
                 
                 try:
-                    results = self.spotify.search(q=query, type='playlist', limit=10)
-                    playlists = results.get('playlists', {}).get('items', [])
+                    results = self.call('search', q=query, type='playlist', limit=10)
+                    playlists = [p for p in (results.get('playlists') or {}).get('items') or [] if isinstance(p, dict)]
                     
                     if playlists:
-                        # Try to find the most similar playlist
                         print(f"Found {len(playlists)} playlists in search results")
-                        best_match = None
-                        best_score = 0
-                        
-                        for playlist in playlists:
-                            spotify_name = playlist['name'].strip()
-                            score = 0
-                            
-                            # Calculate a similarity score
-                            if spotify_name.lower() == search_name.lower():
-                                score = 100  # Perfect match
-                            elif search_name.lower() in spotify_name.lower():
-                                score = 80  # Contains full name
-                            elif any(term.lower() in spotify_name.lower() for term in search_name.split()):
-                                score = 50  # Contains some words
-                            
-                            if score > best_score:
-                                best_score = score
-                                best_match = playlist
-                        
-                        if best_match and best_score >= 50:
-                            print(f"Found search match: '{best_match['name']}' with score {best_score}")
-                            return best_match['external_urls']['spotify']
+                        search_index = FuzzyIndex(
+                            (playlist.get('name', '').strip(), playlist['external_urls']['spotify'])
+                            for playlist in playlists
+                            if playlist.get('name') and (playlist.get('external_urls') or {}).get('spotify')
+                        )
+                        return self._match_playlist(search_index, search_name)
+                except SpotifyError:
+                    raise
                 except Exception as search_error:
                     print(f"Search failed: {str(search_error)}")
                 
                 # If all attempts fail, return None
                 return None
 
+        except SpotifyError:
+            raise
         except Exception as e:
             print(f"Error in Spotify playlist lookup: {str(e)}")
-            return None
\ No newline at end of file
+            return None
@@ -0,0 +1,128 @@
+"""
+Shared cache for Spotify client-credentials access tokens.
+
+spotipy's default CacheFileHandler writes to a file called ".cache", which is a
+directory in this project, so tokens were never reused and every SpotifyAPI
+(one per Streamlit rerun) fetched a new one. SharedTokenCache keeps tokens in
+memory for the whole process and in a private JSON file, so later processes
+reuse a token until it is about to expire.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+from spotipy.cache_handler import CacheHandler
+from spotipy.oauth2 import SpotifyClientCredentials
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_CACHE_PATH = os.path.join(".cache", "spotify_tokens.json")
+
+# Tokens closer than this to expiry are replaced before they are used
+REFRESH_MARGIN = 300  # seconds
+
+# Tokens for the whole process: (path, client_id) -> token_info
+_tokens = {}
+_token_lock = threading.RLock()
+
+
+class SharedTokenCache(CacheHandler):
+    """
+    spotipy cache handler backed by process memory and a JSON file (mode 0600)
+    """
+
+    def __init__(self, client_id, path=DEFAULT_TOKEN_CACHE_PATH):
+        """
+        :param client_id: Spotify client ID the tokens belong to
+        :param path: Path of the JSON file (shared by all clients, keyed by client ID),
+                     or None to keep tokens in memory only
+        """
+        self.client_id = client_id
+        self.path = path
+
+    @property
+    def _key(self):
+        return (self.path, self.client_id)
+
+    def _read_file(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Could not read Spotify token cache {self.path}: {str(e)}")
+            return {}
+
+    def _write_file(self, tokens):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write to a private temp file first so a crash never leaves a truncated cache
+        tmp_path = f"{self.path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(tokens, f)
+        os.replace(tmp_path, self.path)
+
+    def get_cached_token(self):
+        """
+        :return: Cached token_info dictionary, or None
+        """
+        with _token_lock:
+            token_info = _tokens.get(self._key)
+            if token_info is None and self.path:
+                token_info = self._read_file().get(self.client_id)
+                if token_info:
+                    _tokens[self._key] = token_info
+            return token_info
+
+    def save_token_to_cache(self, token_info):
+        """
+        :param token_info: Token dictionary from spotipy (includes expires_at)
+        """
+        with _token_lock:
+            _tokens[self._key] = token_info
+            if not self.path:
+                return
+            try:
+                tokens = self._read_file()
+                now = time.time()
+                # Drop other clients' expired tokens while we're rewriting the file
+                tokens = {client_id: token for client_id, token in tokens.items()
+                          if token.get('expires_at', 0) > now}
+                tokens[self.client_id] = token_info
+                self._write_file(tokens)
+            except OSError as e:
+                logger.warning(f"Could not write Spotify token cache {self.path}: {str(e)}")
+
+
+class CachedClientCredentials(SpotifyClientCredentials):
+    """
+    Client-credentials auth that uses SharedTokenCache and renews tokens
+    REFRESH_MARGIN seconds before they expire. Token requests are serialized,
+    so threads that find an expired token fetch a single new one between them.
+    """
+
+    def __init__(self, client_id, client_secret, cache_path=DEFAULT_TOKEN_CACHE_PATH, **kwargs):
+        """
+        :param client_id: Spotify client ID
+        :param client_secret: Spotify client secret
+        :param cache_path: Token file (see SharedTokenCache), or None for memory only
+        """
+        super().__init__(
+            client_id=client_id,
+            client_secret=client_secret,
+            cache_handler=SharedTokenCache(client_id, path=cache_path),
+            **kwargs
+        )
+
+    @staticmethod
+    def is_token_expired(token_info):
+        return token_info['expires_at'] - int(time.time()) < REFRESH_MARGIN
+
+    def get_access_token(self, as_dict=True, check_cache=True):
+        with _token_lock:
+            return super().get_access_token(as_dict=as_dict, check_cache=check_cache)
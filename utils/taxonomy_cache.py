@@ -0,0 +1,177 @@
+"""
+Disk-backed cache of WordPress categories and tags.
+
+Terms are fetched page by page and each page keeps its ETag / Last-Modified
+validators, so a refresh sends conditional requests and only re-downloads pages
+that changed. The cache also keeps a name -> id map so posts can be created with
+category and tag names.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TAXONOMY_CACHE_PATH = os.path.join(".cache", "taxonomies.json")
+
+# Terms younger than this are used without revalidating
+DEFAULT_MAX_AGE = 3600
+
+
+class TaxonomyCache:
+    """
+    Categories and tags for one WordPress site, persisted to a JSON file
+    """
+
+    def __init__(self, wordpress_api, path=DEFAULT_TAXONOMY_CACHE_PATH, max_age=DEFAULT_MAX_AGE):
+        """
+        :param wordpress_api: WordPressAPI instance used for fetching
+        :param path: Path of the JSON file (shared by all sites, keyed by base URL)
+        :param max_age: Seconds before cached terms are revalidated
+        """
+        self.wordpress_api = wordpress_api
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._sites = None
+        self._name_maps = {}
+
+    @property
+    def _site_key(self):
+        return self.wordpress_api.base_url
+
+    def _load(self):
+        if self._sites is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._sites = json.load(f)
+            except FileNotFoundError:
+                self._sites = {}
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning(f"Could not read taxonomy cache {self.path}: {str(e)}")
+                self._sites = {}
+        return self._sites.setdefault(self._site_key, {})
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write to a temp file first so a crash never leaves a truncated cache
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._sites, f)
+        os.replace(tmp_path, self.path)
+
+    def _revalidate(self, taxonomy, entry):
+        """
+        Fetch all pages of a taxonomy, reusing cached pages the server reports as unchanged
+        :return: New cache entry, or None if the fetch failed
+        """
+        cached_pages = entry.get('pages', []) if entry else []
+        pages = []
+        total_pages = max(1, len(cached_pages))
+        page = 1
+        while page <= total_pages:
+            cached = cached_pages[page - 1] if page <= len(cached_pages) else None
+            result = self.wordpress_api.get_terms_page(
+                taxonomy, page=page,
+                etag=cached.get('etag') if cached else None,
+                last_modified=cached.get('last_modified') if cached else None
+            )
+            if result is None:
+                return None
+            if result.get('past_end'):
+                # Terms were deleted since the last fetch, so there are fewer pages now
+                break
+            if result.get('not_modified') and cached:
+                pages.append(cached)
+            elif result.get('not_modified'):
+                # The server sent 304 for a page we never cached
+                return None
+            else:
+                pages.append({
+                    'terms': result['terms'],
+                    'etag': result.get('etag'),
+                    'last_modified': result.get('last_modified')
+                })
+                total_pages = result.get('total_pages') or total_pages
+            page += 1
+
+        return {'pages': pages, 'fetched_at': time.time()}
+
+    def get_terms(self, taxonomy, refresh=False, allow_stale=False):
+        """
+        Return all terms of a taxonomy
+        :param taxonomy: 'categories' or 'tags'
+        :param refresh: Revalidate with the server even if the cache is fresh
+        :param allow_stale: Return cached terms of any age without a network call
+        :return: List of term dictionaries (id, name, slug, count, parent)
+        """
+        with self._lock:
+            site = self._load()
+            entry = site.get(taxonomy)
+            if entry and not refresh:
+                age = time.time() - entry.get('fetched_at', 0)
+                if allow_stale or age < self.max_age:
+                    return [term for page in entry['pages'] for term in page['terms']]
+
+            new_entry = self._revalidate(taxonomy, entry)
+            if new_entry is None:
+                logger.warning(f"Could not refresh WordPress {taxonomy}, using cached terms")
+                return [term for page in entry['pages'] for term in page['terms']] if entry else []
+
+            site[taxonomy] = new_entry
+            self._name_maps.pop(taxonomy, None)
+            try:
+                self._save()
+            except OSError as e:
+                logger.warning(f"Could not write taxonomy cache {self.path}: {str(e)}")
+
+            terms = [term for page in new_entry['pages'] for term in page['terms']]
+            logger.info(f"Loaded {len(terms)} {taxonomy}")
+            return terms
+
+    def _name_map(self, taxonomy, refresh=False):
+        if refresh or taxonomy not in self._name_maps:
+            name_map = {}
+            for term in self.get_terms(taxonomy, refresh=refresh, allow_stale=not refresh):
+                for key in (term.get('name'), term.get('slug')):
+                    if key:
+                        name_map.setdefault(str(key).strip().lower(), term.get('id'))
+            self._name_maps[taxonomy] = name_map
+        return self._name_maps[taxonomy]
+
+    def lookup_id(self, taxonomy, name):
+        """
+        Find a term ID by name or slug (case-insensitive)
+        Refreshes the cache once if the name is not found.
+        :param taxonomy: 'categories' or 'tags'
+        :param name: Term name or slug
+        :return: Term ID, or None if no such term exists
+        """
+        key = str(name).strip().lower()
+        term_id = self._name_map(taxonomy).get(key)
+        if term_id is None:
+            term_id = self._name_map(taxonomy, refresh=True).get(key)
+        return term_id
+
+    def resolve_ids(self, taxonomy, values):
+        """
+        Convert a mix of term IDs and names to IDs
+        :param taxonomy: 'categories' or 'tags'
+        :param values: List of IDs (int or numeric string) and/or names
+        :return: List of term IDs; unknown names are logged and dropped
+        """
+        ids = []
+        for value in values or []:
+            if isinstance(value, int) or (isinstance(value, str) and value.strip().isdigit()):
+                ids.append(int(value))
+                continue
+            term_id = self.lookup_id(taxonomy, value)
+            if term_id is None:
+                logger.warning(f"Unknown WordPress {taxonomy} term: {value}")
+            elif term_id not in ids:
+                ids.append(term_id)
+        return ids
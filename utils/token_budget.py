@@ -0,0 +1,63 @@
+"""
+Token counting helpers for keeping OpenAI prompts inside a fixed budget.
+Uses tiktoken (declared in pyproject.toml) and falls back to a character estimate
+when it is not installed.
+"""
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is a dependency, but budgets still work (roughly) without it
+    tiktoken = None
+
+# Rough average for English prose, used when tiktoken is not available
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model):
+    """Return the tiktoken encoding for a model, or None if tiktoken is unavailable"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Newer models (e.g. gpt-4.1) may be unknown to older tiktoken releases
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text, model="gpt-4o"):
+    """
+    Count the tokens in a piece of text for the given model
+    :param text: Text to measure
+    :param model: OpenAI model name used to pick the encoding
+    :return: Number of tokens (estimated if tiktoken is not installed)
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text))
+
+
+def truncate_to_tokens(text, max_tokens, model="gpt-4o"):
+    """
+    Truncate text so that it fits within max_tokens
+    :param text: Text to truncate
+    :param max_tokens: Maximum number of tokens to keep
+    :param model: OpenAI model name used to pick the encoding
+    :return: The (possibly shortened) text
+    """
+    if not text or max_tokens <= 0:
+        return ""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
@@ -0,0 +1,113 @@
+"""
+Local store of Spotify playlist track lists.
+
+Each playlist's tracks are saved together with the playlist's snapshot_id.
+Spotify changes the snapshot_id whenever a playlist is edited, so a cheap
+playlist(fields='snapshot_id') call tells whether the stored tracks are still
+current and the full, paginated track download can be skipped.
+
+The same database remembers which snapshot of each playlist was last merged
+into the catalog CSV (see utils/catalog_sync.py).
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACK_STORE_PATH = os.path.join(".cache", "spotify_tracks.sqlite")
+
+
+class TrackStore:
+    """
+    SQLite store holding the latest known track list of each playlist
+    """
+
+    def __init__(self, db_path=DEFAULT_TRACK_STORE_PATH):
+        """
+        Open (and create if needed) the track database
+        :param db_path: Path to the SQLite file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS playlist_tracks (
+                    playlist_id TEXT PRIMARY KEY,
+                    snapshot_id TEXT NOT NULL,
+                    tracks TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS catalog_sync (
+                    playlist_id TEXT PRIMARY KEY,
+                    snapshot_id TEXT NOT NULL,
+                    synced_at TEXT NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation so threads never share one
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_tracks(self, playlist_id, snapshot_id):
+        """
+        Return the stored tracks of a playlist if they match its current snapshot
+        :param playlist_id: Spotify playlist ID
+        :param snapshot_id: The playlist's current snapshot_id
+        :return: List of track dictionaries, or None if nothing current is stored
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT tracks FROM playlist_tracks WHERE playlist_id = ? AND snapshot_id = ?",
+                (playlist_id, snapshot_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_tracks(self, playlist_id, snapshot_id, tracks):
+        """
+        Store a playlist's tracks, replacing any older snapshot
+        :param playlist_id: Spotify playlist ID
+        :param snapshot_id: snapshot_id the tracks were fetched at
+        :param tracks: List of track dictionaries
+        """
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO playlist_tracks (playlist_id, snapshot_id, tracks, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (playlist_id, snapshot_id, json.dumps(tracks), datetime.now().isoformat())
+            )
+
+    def get_synced_snapshots(self):
+        """
+        :return: Dictionary of playlist ID -> snapshot_id last merged into the catalog
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT playlist_id, snapshot_id FROM catalog_sync").fetchall()
+        return dict(rows)
+
+    def mark_synced(self, snapshots):
+        """
+        Record that playlists were merged into the catalog
+        :param snapshots: Dictionary of playlist ID -> snapshot_id
+        """
+        now = datetime.now().isoformat()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO catalog_sync (playlist_id, snapshot_id, synced_at) VALUES (?, ?, ?)",
+                [(playlist_id, snapshot_id, now) for playlist_id, snapshot_id in snapshots.items()]
+            )